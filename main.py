@@ -13,6 +13,7 @@ from src.db.database import DatabaseManager
 from src.db.models import Question
 from src.ui.main_window import MainWindow
 from src.utils.data_manager import get_data_manager
+from src.utils.answer_journal import get_answer_journal
 
 # バージョン情報
 __version__ = "1.1.0"
@@ -88,6 +89,9 @@ def main():
     app.setApplicationVersion(version)
     app.setApplicationName("ITパスポート試験学習ツール")
     
+    # 終了時に未書き込みの回答を DB へ反映（atexit でも実行されるが、DB が使える時点で確実に行う）
+    app.aboutToQuit.connect(get_answer_journal().close)
+    
     window = MainWindow()
     window.show()
     
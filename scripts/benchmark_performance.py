@@ -0,0 +1,514 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+パフォーマンスベンチマーク
+大規模な合成データベースで回答記録・統計クエリのレイテンシを計測する
+
+使い方:
+    python scripts/benchmark_performance.py
+    python scripts/benchmark_performance.py --questions 10000 --answers 1000000
+"""
+
+import sys
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import logging
+logging.disable(logging.WARNING)
+
+from src.db.database import DatabaseManager, DEFAULT_SQLITE_PRAGMAS
+from src.utils.data_manager import DataManager
+from src.utils.answer_journal import AnswerJournal
+from src.core.statistics import StatisticsEngine
+from src.core.mock_test import MockTestAssembler
+from src.utils.irt import estimate_ability
+
+CATEGORIES = ["ストラテジ", "マネジメント", "テクノロジ"]
+
+# 復習出題ベンチマークの問題数・回答数（--questions に関係なくこの規模で計測）
+REVIEW_BENCH_QUESTIONS = 50000
+REVIEW_BENCH_ANSWERS = 500000
+
+# 適応型出題ベンチマークの問題数・回答数
+ADAPTIVE_BENCH_QUESTIONS = 50000
+ADAPTIVE_BENCH_ANSWERS = 500000
+
+# 重み付き出題ベンチマークの問題数・回答数
+WEIGHTED_BENCH_QUESTIONS = 100000
+WEIGHTED_BENCH_ANSWERS = 300000
+
+
+def build_synthetic_db(db_path: str, num_questions: int, num_answers: int, seed: int = 0):
+    """合成データベースを作成（問題 + 回答履歴）"""
+    rng = random.Random(seed)
+    db = DatabaseManager(db_path)
+    db.init_db()
+    
+    dm = DataManager()
+    dm.db = db
+    dm.bulk_import_questions([
+        {
+            "year": 2016 + (i % 10),
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "question_number": i,
+            "text": f"合成問題 {i}",
+            "choices": [f"選択肢{c}" for c in "ABCD"],
+            "correct_answer": 1 + (i % 4),
+            "difficulty": 1 + (i % 5),
+        }
+        for i in range(num_questions)
+    ])
+    
+    session = db.get_session()
+    try:
+        conn = session.connection()
+        choice_rows = conn.exec_driver_sql(
+            "SELECT id, question_id, is_correct FROM choices"
+        ).fetchall()
+        choices_by_question = {}
+        for choice_id, question_id, is_correct in choice_rows:
+            choices_by_question.setdefault(question_id, []).append((choice_id, is_correct))
+        question_ids = list(choices_by_question)
+        
+        start = datetime.utcnow() - timedelta(days=365)
+        batch = []
+        for i in range(num_answers):
+            question_id = rng.choice(question_ids)
+            choice_id, is_correct = rng.choice(choices_by_question[question_id])
+            answered_at = start + timedelta(seconds=i * 365 * 86400 // max(num_answers, 1))
+            batch.append((
+                question_id, choice_id, is_correct,
+                answered_at.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                rng.randint(5, 120), f"bench-{i // 20}"
+            ))
+            if len(batch) >= 50000:
+                _insert_answers(conn, batch)
+                batch = []
+        if batch:
+            _insert_answers(conn, batch)
+        # 回答履歴に対応する終了済みの学習セッション
+        conn.exec_driver_sql(
+            "INSERT INTO study_sessions (session_id, mode, total_questions, correct_count, "
+            "start_time, end_time) "
+            "SELECT session_id, 'random', COUNT(*), SUM(is_correct), MIN(answered_at), MAX(answered_at) "
+            "FROM user_answers GROUP BY session_id"
+        )
+        session.commit()
+    finally:
+        db.close_session(session)
+    
+    # 直接挿入した回答履歴からロールアップを作成
+    dm.rebuild_rollups()
+    db.engine.dispose()
+
+
+def _insert_answers(conn, rows):
+    conn.exec_driver_sql(
+        "INSERT INTO user_answers (question_id, selected_choice_id, is_correct, "
+        "answered_at, time_spent_seconds, session_id) VALUES (?, ?, ?, ?, ?, ?)",
+        rows
+    )
+
+
+def measure(func, repeat: int) -> dict:
+    """関数の実行時間を計測（ミリ秒）"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean": statistics.mean(samples),
+        "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def open_managers(db_path: str, pragmas: dict):
+    """指定した PRAGMA 設定で DataManager / StatisticsEngine を生成"""
+    db = DatabaseManager(db_path, pragmas=pragmas)
+    dm = DataManager()
+    dm.db = db
+    stats = StatisticsEngine()
+    stats.db = db
+    return db, dm, stats
+
+
+def bench_pragmas(db_path: str, repeat: int):
+    """PRAGMA 設定の有無で回答記録・統計クエリを比較"""
+    print("\n[SQLite PRAGMA プロファイル]")
+    print("-" * 70)
+    
+    profiles = [
+        ("既定 (rollback journal)", {"journal_mode": "DELETE", "synchronous": "FULL"}),
+        ("パフォーマンス (WAL)", DEFAULT_SQLITE_PRAGMAS),
+    ]
+    for label, pragmas in profiles:
+        db, dm, stats = open_managers(db_path, pragmas)
+        session = db.get_session()
+        question_id, choice_id = session.connection().exec_driver_sql(
+            "SELECT question_id, id FROM choices LIMIT 1"
+        ).one()
+        db.close_session(session)
+        
+        record = measure(
+            lambda: dm.record_answer(question_id, choice_id, "bench-record", 10),
+            repeat
+        )
+        overall = measure(stats.get_overall_stats, max(1, repeat // 20))
+        print(f"{label}")
+        print(f"  record_answer     : 平均 {record['mean']:8.2f} ms / p95 {record['p95']:8.2f} ms")
+        print(f"  get_overall_stats : 平均 {overall['mean']:8.2f} ms / p95 {overall['p95']:8.2f} ms")
+        db.engine.dispose()
+
+
+def bench_weak_points(db_path: str, repeat: int):
+    """get_weak_points の集計クエリを計測し、従来ロジックと結果を照合"""
+    print("\n[弱点抽出 get_weak_points]")
+    print("-" * 70)
+    
+    db, dm, stats = open_managers(db_path, DEFAULT_SQLITE_PRAGMAS)
+    
+    # 従来ロジック（全回答を Python で集計）による参照結果
+    session = db.get_session()
+    try:
+        conn = session.connection()
+        texts = dict(conn.exec_driver_sql(
+            "SELECT q.id, c.name FROM questions q JOIN categories c ON c.id = q.category_id"
+        ).fetchall())
+        totals = {}
+        for question_id, is_correct in conn.exec_driver_sql(
+            "SELECT question_id, is_correct FROM user_answers"
+        ):
+            total, correct = totals.get(question_id, (0, 0))
+            totals[question_id] = (total + 1, correct + (1 if is_correct == True else 0))
+    finally:
+        db.close_session(session)
+    
+    expected = []
+    for question_id in sorted(texts):
+        if question_id not in totals:
+            continue
+        total, correct = totals[question_id]
+        rate = (correct / total * 100) if total > 0 else 0
+        if rate < 60.0:
+            expected.append((rate, question_id, texts[question_id], total, correct))
+    expected.sort(key=lambda x: x[0])
+    expected = [(qid, cat, rate, total, correct) for rate, qid, cat, total, correct in expected[:10]]
+    
+    actual = [
+        (p["question_id"], p["category"], p["correct_rate"], p["attempt_count"], p["correct_count"])
+        for p in stats.get_weak_points()
+    ]
+    print(f"  従来ロジックとの一致: {'OK' if actual == expected else 'NG'}")
+    
+    result = measure(stats.get_weak_points, max(1, repeat // 10))
+    print(f"  get_weak_points   : 平均 {result['mean']:8.2f} ms / p95 {result['p95']:8.2f} ms")
+    db.engine.dispose()
+
+
+def bench_statistics(db_path: str, repeat: int):
+    """統計画面で使う集計クエリを計測"""
+    print("\n[統計集計 StatisticsEngine]")
+    print("-" * 70)
+    
+    db, dm, stats = open_managers(db_path, DEFAULT_SQLITE_PRAGMAS)
+    targets = [
+        ("calculate_category_stats", stats.calculate_category_stats),
+        ("get_overall_stats", stats.get_overall_stats),
+        ("get_learning_trend(30)", lambda: stats.get_learning_trend(30)),
+        ("get_study_calendar(365)", lambda: stats.get_study_calendar(365)),
+    ]
+    for label, func in targets:
+        result = measure(func, max(1, repeat // 10))
+        print(f"  {label:<24}: 平均 {result['mean']:8.2f} ms / p95 {result['p95']:8.2f} ms")
+    db.engine.dispose()
+
+
+def bench_sampling(db_path: str, repeat: int):
+    """ランダム出題（模擬試験100問）の抽出を計測"""
+    print("\n[ランダム出題 get_random_questions]")
+    print("-" * 70)
+    
+    db, dm, stats = open_managers(db_path, DEFAULT_SQLITE_PRAGMAS)
+    
+    def cold():
+        dm._invalidate_question_caches()
+        dm.get_random_questions(100)
+    
+    targets = [
+        ("100問 (候補キャッシュなし)", cold),
+        ("100問 (候補キャッシュあり)", lambda: dm.get_random_questions(100)),
+    ]
+    for label, func in targets:
+        result = measure(func, max(1, repeat // 10))
+        print(f"  {label:<24}: 平均 {result['mean']:8.2f} ms / p95 {result['p95']:8.2f} ms")
+    db.engine.dispose()
+
+
+def bench_journal(db_path: str, repeat: int):
+    """回答記録: 1回答1コミットと回答ジャーナル（write-behind）を比較"""
+    print("\n[回答記録 record_answer / AnswerJournal]")
+    print("-" * 70)
+    
+    db, dm, stats = open_managers(db_path, DEFAULT_SQLITE_PRAGMAS)
+    session = db.get_session()
+    question_id, choice_id = session.connection().exec_driver_sql(
+        "SELECT question_id, id FROM choices LIMIT 1"
+    ).one()
+    db.close_session(session)
+    
+    journal = AnswerJournal(dm, journal_path=str(Path(db_path).parent / "bench_journal.jsonl"))
+    
+    def append():
+        journal.append(dm.prepare_answer(question_id, choice_id, "bench-journal", 10))
+    
+    targets = [
+        ("record_answer (同期)", lambda: dm.record_answer(question_id, choice_id, "bench-sync", 10)),
+        ("journal.append", append),
+    ]
+    for label, func in targets:
+        result = measure(func, repeat)
+        print(f"  {label:<24}: 平均 {result['mean']:8.2f} ms / p95 {result['p95']:8.2f} ms")
+    
+    start = time.perf_counter()
+    journal.close()
+    print(f"  close (残り書き込み)      : {(time.perf_counter() - start) * 1000:8.2f} ms")
+    db.engine.dispose()
+
+
+def bench_review(db_path: str, repeat: int):
+    """復習出題（SM-2 の due_at 範囲検索）を5万問規模で計測し、回答履歴の走査と比較"""
+    print(f"\n[復習出題 get_review_question_ids（問題 {REVIEW_BENCH_QUESTIONS}件）]")
+    print("-" * 70)
+    
+    review_db_path = str(Path(db_path).parent / "bench_review.db")
+    build_synthetic_db(review_db_path, REVIEW_BENCH_QUESTIONS, REVIEW_BENCH_ANSWERS)
+    db, dm, stats = open_managers(review_db_path, DEFAULT_SQLITE_PRAGMAS)
+    
+    def scan_history():
+        # 従来方式: 回答履歴を問題ごとに集計して正答率の低い順に並べる
+        session = db.get_session()
+        try:
+            session.connection().exec_driver_sql(
+                "SELECT question_id FROM user_answers GROUP BY question_id "
+                "ORDER BY AVG(CASE WHEN is_correct = 1 THEN 1.0 ELSE 0 END) LIMIT 100"
+            ).fetchall()
+        finally:
+            db.close_session(session)
+    
+    now = datetime.utcnow()
+    targets = [
+        ("回答履歴の集計 100問", scan_history),
+        ("期限切れ 100問", lambda: dm.get_review_question_ids(100, due_before=now)),
+        ("期限順 100問 (分野指定)", lambda: dm.get_review_question_ids(100, category_ids=[1])),
+        ("期限順 100問 (難易度指定)", lambda: dm.get_review_question_ids(
+            100, difficulty_range=(4, 5)
+        )),
+    ]
+    for label, func in targets:
+        result = measure(func, max(1, repeat // 10))
+        print(f"  {label:<24}: 平均 {result['mean']:8.2f} ms / p95 {result['p95']:8.2f} ms")
+    db.engine.dispose()
+
+
+def bench_weighted(db_path: str, repeat: int):
+    """弱点重み付き出題（エイリアス法）を10万問規模で計測"""
+    print(f"\n[弱点重み付き出題 get_weighted_question_ids（問題 {WEIGHTED_BENCH_QUESTIONS}件）]")
+    print("-" * 70)
+    
+    weighted_db_path = str(Path(db_path).parent / "bench_weighted.db")
+    build_synthetic_db(weighted_db_path, WEIGHTED_BENCH_QUESTIONS, WEIGHTED_BENCH_ANSWERS)
+    db, dm, stats = open_managers(weighted_db_path, DEFAULT_SQLITE_PRAGMAS)
+    session = db.get_session()
+    question_id, choice_id = session.connection().exec_driver_sql(
+        "SELECT question_id, id FROM choices LIMIT 1"
+    ).one()
+    db.close_session(session)
+    
+    def cold():
+        dm._invalidate_question_caches()
+        dm.get_weighted_question_ids(100)
+    
+    def after_answer():
+        # 回答反映後はエイリアス表のみ作り直す
+        dm._weighted_sampler.apply_answers([
+            dm.prepare_answer(question_id, choice_id, "bench-weighted", 10)
+        ])
+        dm.get_weighted_question_ids(100)
+    
+    dm.get_weighted_question_ids(100)
+    targets = [
+        ("100問 (初回読み込み)", cold),
+        ("100問 (回答反映直後)", after_answer),
+        ("100問", lambda: dm.get_weighted_question_ids(100)),
+        ("100問 (分野指定)", lambda: dm.get_weighted_question_ids(100, category_ids=[1])),
+    ]
+    for label, func in targets:
+        if label != targets[0][0]:
+            func()  # ウォームアップ
+        result = measure(func, max(1, repeat // 10))
+        print(f"  {label:<24}: 平均 {result['mean']:8.2f} ms / p95 {result['p95']:8.2f} ms")
+    db.engine.dispose()
+
+
+def bench_mock_test(db_path: str, repeat: int):
+    """模擬試験の組み立て（分野別出題数・難易度分散）と事前生成セットの取り出しを計測"""
+    print("\n[模擬試験 MockTestAssembler]")
+    print("-" * 70)
+    
+    db, dm, stats = open_managers(db_path, DEFAULT_SQLITE_PRAGMAS)
+    assembler = MockTestAssembler(dm, forms_path=str(Path(db_path).parent / "bench_forms.json"))
+    
+    def cold():
+        dm._invalidate_question_caches()
+        assembler.assemble()
+    
+    assembler.pregenerate(max(1, repeat // 10) + 1)
+    targets = [
+        ("組み立て (プール読み込み)", cold),
+        ("組み立て", assembler.assemble),
+        ("事前生成セット取り出し", assembler.take_form),
+    ]
+    for label, func in targets:
+        result = measure(func, max(1, repeat // 10))
+        print(f"  {label:<24}: 平均 {result['mean']:8.2f} ms / p95 {result['p95']:8.2f} ms")
+    db.engine.dispose()
+
+
+def bench_adaptive(db_path: str, repeat: int):
+    """適応型出題（IRT）の較正・能力推定・次問題選択を5万問規模で計測"""
+    print(f"\n[適応型出題 IRT（問題 {ADAPTIVE_BENCH_QUESTIONS}件）]")
+    print("-" * 70)
+    
+    adaptive_db_path = str(Path(db_path).parent / "bench_adaptive.db")
+    build_synthetic_db(adaptive_db_path, ADAPTIVE_BENCH_QUESTIONS, ADAPTIVE_BENCH_ANSWERS)
+    db, dm, stats = open_managers(adaptive_db_path, DEFAULT_SQLITE_PRAGMAS)
+    
+    start = time.perf_counter()
+    result = dm.calibrate_item_parameters()
+    print(
+        f"  較正 (回答 {result['responses']}件)      : "
+        f"{(time.perf_counter() - start) * 1000:8.2f} ms"
+    )
+    
+    bank = dm.get_item_bank()
+    rng = random.Random(0)
+    answered = rng.sample(bank.question_ids.tolist(), 50)
+    a, b = bank.parameters(answered)
+    responses = [rng.random() < 0.6 for _ in answered]
+    
+    targets = [
+        ("能力推定 (50問回答済み)", lambda: estimate_ability(a, b, responses)),
+        ("次の問題選択", lambda: dm.get_adaptive_question_id(0.5, answered)),
+        ("次の問題選択 (分野指定)", lambda: dm.get_adaptive_question_id(
+            0.5, answered, category_ids=[1]
+        )),
+    ]
+    for label, func in targets:
+        func()  # ウォームアップ
+        result = measure(func, max(1, repeat // 10))
+        print(f"  {label:<24}: 平均 {result['mean']:8.2f} ms / p95 {result['p95']:8.2f} ms")
+    db.engine.dispose()
+
+
+def bench_iteration(db_path: str, repeat: int):
+    """全問題の走査（一括読み込み・キーセット方式・yield_per ストリーミング）の時間とピークメモリを比較"""
+    print("\n[全問題の走査]")
+    print("-" * 70)
+    
+    db, dm, stats = open_managers(db_path, DEFAULT_SQLITE_PRAGMAS)
+    targets = [
+        ("get_questions (全件一括)", lambda: len(dm.get_questions(limit=-1))),
+        ("iter_questions (選択肢込み)", lambda: sum(1 for _ in dm.iter_questions())),
+        ("stream_question_rows", lambda: sum(1 for _ in dm.stream_question_rows())),
+    ]
+    for label, func in targets:
+        # ピークメモリは時間計測とは別の1回で測る（tracemalloc 自体が処理を遅くするため）
+        result = measure(func, max(1, repeat // 100))
+        tracemalloc.start()
+        count = func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(
+            f"  {label:<24}: {count}件 平均 {result['mean']:8.2f} ms / "
+            f"ピーク {peak / 1024 / 1024:6.1f} MB"
+        )
+    db.engine.dispose()
+
+
+def bench_search(db_path: str, repeat: int):
+    """キーワード検索（FTS5 trigram）を一致件数の異なる語で計測"""
+    print("\n[キーワード検索 DataManager.search]")
+    print("-" * 70)
+    
+    db, dm, stats = open_managers(db_path, DEFAULT_SQLITE_PRAGMAS)
+    # 合成問題の問題文は「合成問題 {番号}」のため、「合成問題」は全問題に一致する
+    targets = [
+        ("一致1件 (番号)", lambda: dm.search("合成問題 1234")),
+        ("全問題に一致", lambda: dm.search("合成問題")),
+        ("全問題に一致 (分野指定)", lambda: dm.search("合成問題", category_ids=[1])),
+        ("2文字の語 (索引なし)", lambda: dm.search("問題")),
+        ("一致なし", lambda: dm.search("該当なしの語句")),
+    ]
+    for label, func in targets:
+        func()  # ウォームアップ
+        result = measure(func, max(1, repeat // 10))
+        print(f"  {label:<24}: 平均 {result['mean']:8.2f} ms / p95 {result['p95']:8.2f} ms")
+    db.engine.dispose()
+
+
+BENCHMARKS = {
+    "pragmas": bench_pragmas,
+    "weak_points": bench_weak_points,
+    "statistics": bench_statistics,
+    "sampling": bench_sampling,
+    "journal": bench_journal,
+    "review": bench_review,
+    "weighted": bench_weighted,
+    "mock_test": bench_mock_test,
+    "adaptive": bench_adaptive,
+    "iteration": bench_iteration,
+    "search": bench_search,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="パフォーマンスベンチマーク")
+    parser.add_argument("--questions", type=int, default=10000, help="合成問題数")
+    parser.add_argument("--answers", type=int, default=200000, help="合成回答数")
+    parser.add_argument("--repeat", type=int, default=200, help="計測回数")
+    parser.add_argument(
+        "--only", choices=sorted(BENCHMARKS), action="append",
+        help="実行するベンチマーク（複数指定可、省略時は全て）"
+    )
+    args = parser.parse_args()
+    
+    work_dir = tempfile.mkdtemp(prefix="itpass_bench_")
+    db_path = str(Path(work_dir) / "bench.db")
+    try:
+        print("=" * 70)
+        print(f"合成DB作成: 問題 {args.questions}件 / 回答 {args.answers}件")
+        start = time.perf_counter()
+        build_synthetic_db(db_path, args.questions, args.answers)
+        print(f"作成完了: {time.perf_counter() - start:.1f}秒")
+        print("=" * 70)
+        
+        for name in args.only or BENCHMARKS:
+            BENCHMARKS[name](db_path, args.repeat)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
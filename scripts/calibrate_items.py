@@ -0,0 +1,26 @@
+"""
+IRT 項目パラメータ較正スクリプト
+回答履歴から問題ごとの困難度を推定し、適応型出題で使う item_parameters を更新する
+"""
+
+import logging
+from pathlib import Path
+import sys
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.db import init_database
+from src.utils.data_manager import get_data_manager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+if __name__ == "__main__":
+    init_database()
+    
+    result = get_data_manager().calibrate_item_parameters()
+    logger.info("===== 項目パラメータ較正完了 =====")
+    for key, value in result.items():
+        logger.info(f"{key}: {value}")
@@ -0,0 +1,36 @@
+"""
+模擬試験問題セット事前生成スクリプト
+分野別出題数に合わせた問題セットを作成して保存し、模擬試験の開始時に組み立てを省く
+"""
+
+import argparse
+import logging
+from pathlib import Path
+import sys
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.db import init_database
+from src.core.mock_test import MockTestAssembler, MOCK_TEST_TOTAL_QUESTIONS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="模擬試験問題セット事前生成")
+    parser.add_argument("--forms", type=int, default=5, help="生成する問題セット数")
+    parser.add_argument("--difficulty-min", type=int, default=1, help="難易度の最小値")
+    parser.add_argument("--difficulty-max", type=int, default=5, help="難易度の最大値")
+    parser.add_argument(
+        "--questions", type=int, default=MOCK_TEST_TOTAL_QUESTIONS, help="1セットの問題数"
+    )
+    args = parser.parse_args()
+    
+    init_database()
+    
+    assembler = MockTestAssembler()
+    difficulty_range = (args.difficulty_min, args.difficulty_max)
+    pending = assembler.pregenerate(args.forms, difficulty_range, total=args.questions)
+    logger.info(f"問題セット生成完了: {args.forms}件 (保存済み: {pending}件, 難易度 {difficulty_range})")
@@ -0,0 +1,29 @@
+"""
+集計ロールアップ再計算スクリプト
+集計ロールアップ・復習スケジュールを回答履歴から作り直し、増分更新との不一致を報告する
+"""
+
+import logging
+from pathlib import Path
+import sys
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.db import init_database
+from src.utils.data_manager import get_data_manager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+if __name__ == "__main__":
+    init_database()
+    
+    result = get_data_manager().rebuild_rollups()
+    logger.info("===== ロールアップ再計算完了 =====")
+    for key, value in result.items():
+        logger.info(f"{key}: {value}")
+    
+    # 不一致があった場合は終了コードで通知（検証用）
+    sys.exit(1 if result["mismatches"] else 0)
@@ -3,5 +3,6 @@ core モジュール初期化
 """
 
 from src.core.quiz_engine import QuizEngine, QuizMode, get_quiz_engine
+from src.core.question_views import QuestionView, ChoiceView
 
-__all__ = ['QuizEngine', 'QuizMode', 'get_quiz_engine']
+__all__ = ['QuizEngine', 'QuizMode', 'get_quiz_engine', 'QuestionView', 'ChoiceView']
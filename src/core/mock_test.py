@@ -0,0 +1,311 @@
+"""
+模擬試験の組み立て
+本試験の分野別出題数に合わせて問題を選び、難易度の偏りと直近に回答した問題を避ける
+"""
+
+import json
+import logging
+import os
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.utils.data_manager import DataManager, get_data_manager
+
+logger = logging.getLogger(__name__)
+
+# 模擬試験の問題数
+MOCK_TEST_TOTAL_QUESTIONS = 100
+
+# 本試験の分野別出題数（100問中）
+MOCK_TEST_CATEGORY_QUOTAS = {
+    "ストラテジ": 35,
+    "マネジメント": 20,
+    "テクノロジ": 45,
+}
+
+# この日数以内に回答した問題は、他に候補がない場合のみ出題
+MOCK_TEST_RECENT_DAYS = 14
+
+# 事前生成した問題セットの保存先（DB と同じディレクトリ）と有効期間
+MOCK_TEST_FORMS_FILENAME = "mock_test_forms.json"
+MOCK_TEST_FORM_MAX_AGE_DAYS = 7
+
+# ファイル形式のバージョン（互換性のない変更時に上げる）
+MOCK_TEST_FORM_FORMAT_VERSION = 1
+
+
+def allocate_evenly(total: int, capacities: Dict, rng: random.Random) -> Dict:
+    """
+    total 件をキーごとにできるだけ均等に割り当てる（各キーの上限は capacities）
+    
+    上限に達したキーの不足分は残りのキーへ回す。端数を受け取るキーは乱数で決める。
+    """
+    allocation = dict.fromkeys(capacities, 0)
+    remaining = min(total, sum(capacities.values()))
+    while remaining > 0:
+        open_keys = [key for key in capacities if allocation[key] < capacities[key]]
+        share, extra = divmod(remaining, len(open_keys))
+        lucky = set(rng.sample(open_keys, extra))
+        for key in open_keys:
+            amount = min(share + (1 if key in lucky else 0), capacities[key] - allocation[key])
+            allocation[key] += amount
+            remaining -= amount
+    return allocation
+
+
+class MockTestAssembler:
+    """
+    模擬試験の問題セット組み立て
+    
+    DataManager がキャッシュする (分野, 難易度) 別の問題IDプールから選ぶため、
+    組み立て時に questions テーブルを走査しない。
+    事前生成した問題セットは JSON ファイルに保存し、試験開始時に取り出す。
+    """
+    
+    def __init__(
+        self,
+        data_manager: DataManager = None,
+        forms_path: str = None,
+        category_quotas: Dict[str, int] = None
+    ):
+        self.dm = data_manager or get_data_manager()
+        if forms_path is None:
+            forms_path = str(Path(self.dm.db.db_path).parent / MOCK_TEST_FORMS_FILENAME)
+        self.forms_path = Path(forms_path)
+        self.category_quotas = category_quotas or MOCK_TEST_CATEGORY_QUOTAS
+    
+    # ========================
+    # 公開 API
+    # ========================
+    
+    def assemble(
+        self,
+        difficulty_range: Tuple[int, int] = (1, 5),
+        total: int = MOCK_TEST_TOTAL_QUESTIONS,
+        seed: Optional[int] = None
+    ) -> List[int]:
+        """
+        問題セットを組み立てる
+        
+        Args:
+            difficulty_range: 難易度範囲 (最小, 最大)
+            total: 問題数
+            seed: 乱数シード
+        
+        Returns:
+            出題順の問題ID（分野ごとにまとめ、分野内はランダム順）
+        """
+        rng = random.Random(seed)
+        low, high = difficulty_range or (1, 5)
+        pools = {
+            key: ids for key, ids in self.dm.get_question_pools().items()
+            if key[1] is not None and low <= key[1] <= high
+        }
+        recent = self.dm.get_recently_answered_ids(
+            datetime.utcnow() - timedelta(days=MOCK_TEST_RECENT_DAYS)
+        )
+        
+        pools_by_category: Dict[int, Dict[int, List[int]]] = {}
+        for (category_id, difficulty), ids in pools.items():
+            pools_by_category.setdefault(category_id, {})[difficulty] = ids
+        
+        names = {category.id: category.name for category in self.dm.get_categories()}
+        chosen: Dict[int, List[int]] = {}
+        used: Set[int] = set()
+        quotas = self._category_quotas(pools_by_category, names, total)
+        for category_id, quota in quotas.items():
+            by_difficulty = pools_by_category[category_id]
+            allocation = allocate_evenly(
+                quota, {d: len(ids) for d, ids in by_difficulty.items()}, rng
+            )
+            chosen[category_id] = []
+            for difficulty, count in sorted(allocation.items()):
+                picked = self._pick(by_difficulty[difficulty], count, recent, used, rng)
+                chosen[category_id].extend(picked)
+        
+        # 分野の問題が足りない場合は他の分野から補充
+        shortage = total - sum(len(ids) for ids in chosen.values())
+        if shortage > 0:
+            category_of = {qid: key[0] for key, ids in pools.items() for qid in ids}
+            leftovers = [qid for qid in category_of if qid not in used]
+            for qid in self._pick(leftovers, shortage, recent, used, rng):
+                chosen.setdefault(category_of[qid], []).append(qid)
+        
+        form = []
+        for category_id in self._category_order(chosen, names):
+            ids = chosen[category_id]
+            rng.shuffle(ids)
+            form.extend(ids)
+        return form
+    
+    def pregenerate(
+        self,
+        count: int,
+        difficulty_range: Tuple[int, int] = (1, 5),
+        total: int = MOCK_TEST_TOTAL_QUESTIONS
+    ) -> int:
+        """
+        問題セットを count 件事前生成して保存
+        
+        Returns:
+            保存後の該当条件の問題セット数
+        """
+        forms = self._load_forms()
+        now = datetime.utcnow().isoformat()
+        for _ in range(count):
+            forms.append({
+                "difficulty_range": list(difficulty_range),
+                "total": total,
+                "question_ids": self.assemble(difficulty_range, total),
+                "created_at": now,
+            })
+        self._save_forms(forms)
+        return sum(1 for form in forms if self._matches(form, difficulty_range, total))
+    
+    def take_form(
+        self,
+        difficulty_range: Tuple[int, int] = (1, 5),
+        total: int = MOCK_TEST_TOTAL_QUESTIONS
+    ) -> List[int]:
+        """
+        事前生成した問題セットを取り出す（ない場合・無効な場合はその場で組み立て）
+        
+        無効化された問題を含むセットや有効期間を過ぎたセットは破棄する。
+        """
+        forms = self._load_forms()
+        if forms:
+            active_ids = {qid for ids in self.dm.get_question_pools().values() for qid in ids}
+            expires = datetime.utcnow() - timedelta(days=MOCK_TEST_FORM_MAX_AGE_DAYS)
+            kept = []
+            form_ids = None
+            for form in forms:
+                if datetime.fromisoformat(form["created_at"]) < expires:
+                    continue
+                if not all(qid in active_ids for qid in form["question_ids"]):
+                    continue
+                if form_ids is None and self._matches(form, difficulty_range, total):
+                    form_ids = form["question_ids"]
+                    continue
+                kept.append(form)
+            if len(kept) != len(forms):
+                self._save_forms(kept)
+            if form_ids is not None:
+                return form_ids
+        return self.assemble(difficulty_range, total)
+    
+    def pending_forms(
+        self,
+        difficulty_range: Tuple[int, int] = (1, 5),
+        total: int = MOCK_TEST_TOTAL_QUESTIONS
+    ) -> int:
+        """保存済みの該当条件の問題セット数"""
+        return sum(
+            1 for form in self._load_forms()
+            if self._matches(form, difficulty_range, total)
+        )
+    
+    # ========================
+    # 内部処理
+    # ========================
+    
+    def _category_quotas(
+        self,
+        pools_by_category: Dict,
+        names: Dict[int, str],
+        total: int
+    ) -> Dict[int, int]:
+        """
+        分野ID ごとの出題数
+        
+        本試験の分野名に一致する分野は規定の比率で、一致しない場合は問題数の比率で割り当てる。
+        各分野の上限は難易度範囲内の問題数。
+        """
+        capacities = {
+            category_id: sum(len(ids) for ids in by_difficulty.values())
+            for category_id, by_difficulty in pools_by_category.items()
+        }
+        weights = {
+            category_id: self.category_quotas.get(names.get(category_id), 0)
+            for category_id in capacities
+        }
+        if not any(weights.values()):
+            weights = capacities
+        
+        # 最大剰余法で比率を total 件に換算
+        weight_total = sum(weights.values()) or 1
+        exact = {key: total * weight / weight_total for key, weight in weights.items()}
+        quotas = {key: int(value) for key, value in exact.items()}
+        by_remainder = sorted(exact, key=lambda key: exact[key] - quotas[key], reverse=True)
+        for key in by_remainder[:total - sum(quotas.values())]:
+            quotas[key] += 1
+        return {key: min(quota, capacities[key]) for key, quota in quotas.items() if quota}
+    
+    def _category_order(self, chosen: Dict[int, List[int]], names: Dict[int, str]) -> List[int]:
+        """出題順（本試験と同じく ストラテジ → マネジメント → テクノロジ）"""
+        order = list(self.category_quotas)
+        return sorted(
+            chosen,
+            key=lambda category_id: (
+                order.index(names[category_id]) if names.get(category_id) in order else len(order),
+                category_id
+            )
+        )
+    
+    @staticmethod
+    def _pick(
+        pool: List[int],
+        count: int,
+        recent: Set[int],
+        used: Set[int],
+        rng: random.Random
+    ) -> List[int]:
+        """プールから count 件を選ぶ（直近に回答した問題は不足時のみ使う）"""
+        if count <= 0:
+            return []
+        
+        # 直近の回答が少なければ少数の抽出で足りるため、まず小さく抽出して除外する
+        sample = rng.sample(pool, min(len(pool), count * 2 + 8))
+        fresh = [qid for qid in sample if qid not in recent and qid not in used]
+        if len(fresh) < count and len(sample) < len(pool):
+            fresh = [qid for qid in pool if qid not in recent and qid not in used]
+            fresh = rng.sample(fresh, min(count, len(fresh)))
+        picked = fresh[:count]
+        
+        if len(picked) < count:
+            seen = [qid for qid in pool if qid in recent and qid not in used]
+            picked += rng.sample(seen, min(count - len(picked), len(seen)))
+        used.update(picked)
+        return picked
+    
+    @staticmethod
+    def _matches(form: Dict, difficulty_range: Tuple[int, int], total: int) -> bool:
+        return tuple(form["difficulty_range"]) == tuple(difficulty_range) and form["total"] == total
+    
+    def _load_forms(self) -> List[Dict]:
+        """保存済みの問題セットを読み込み（存在しない・破損している場合は空）"""
+        try:
+            with open(self.forms_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            logger.warning(f"模擬試験セット読み込みエラー: {e}")
+            return []
+        if data.get("version") != MOCK_TEST_FORM_FORMAT_VERSION:
+            return []
+        return data["forms"]
+    
+    def _save_forms(self, forms: List[Dict]):
+        """一時ファイルに書き出し、os.replace で置き換え"""
+        temp_path = self.forms_path.with_name(self.forms_path.name + ".tmp")
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"version": MOCK_TEST_FORM_FORMAT_VERSION, "forms": forms},
+                    f, separators=(",", ":")
+                )
+            os.replace(temp_path, self.forms_path)
+        except OSError as e:
+            logger.error(f"模擬試験セット保存エラー: {e}")
@@ -0,0 +1,111 @@
+"""
+出題セットの先読み
+よく使う出題条件の問題セットをワーカースレッドで用意し、セッション開始時に DB を待たずに取り出す
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 先読みしておく出題条件の数
+PREFETCH_MAX_ENTRIES = 4
+
+# 先読みしたセットの有効期間（復習期限・重みが時間で変わるため）
+PREFETCH_MAX_AGE_SECONDS = 600
+
+
+class QuestionSetPrefetcher:
+    """
+    出題条件ごとの問題セットの先読み
+    
+    構築は1本のワーカーで順に行う。条件は最近要求された max_entries 件のみ保持し、
+    押し出された条件の構築は開始前に取り消す（設定ダイアログの操作中に要求が積み上がらない）。
+    invalidate() より前に開始した構築の結果は世代番号で判別して捨てる。
+    取り出したセットは1回のセッションでのみ使う（同じ条件の次回分は改めて要求する）。
+    """
+    
+    def __init__(
+        self,
+        build: Callable[[Hashable], Any],
+        executor: ThreadPoolExecutor = None,
+        max_entries: int = PREFETCH_MAX_ENTRIES,
+        max_age_seconds: float = PREFETCH_MAX_AGE_SECONDS
+    ):
+        """
+        Args:
+            build: 条件キーから問題セットを作る関数（ワーカースレッドで呼ばれる）
+            executor: 使用するワーカー（None の場合は専用に作成）
+            max_entries: 保持する条件の数
+            max_age_seconds: 先読みしたセットの有効期間（秒）
+        """
+        self._build = build
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="QuestionPrefetch"
+        )
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._entries: "OrderedDict[Hashable, Future]" = OrderedDict()
+    
+    def request(self, key: Hashable):
+        """条件 key の問題セットの構築を予約（構築済み・構築中の場合は何もしない）"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = self._executor.submit(self._run, key, self._generation)
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                evicted.cancel()
+    
+    def take(self, key: Hashable) -> Optional[Any]:
+        """
+        構築済みの問題セットを取り出す（待たない）
+        
+        Returns:
+            問題セット（未要求・構築中・失敗・期限切れの場合 None）
+        """
+        with self._lock:
+            future = self._entries.get(key)
+            if future is None or not future.done():
+                return None
+            del self._entries[key]
+        
+        try:
+            prepared = future.result()
+        except CancelledError:
+            return None
+        except Exception as e:
+            logger.warning(f"出題セット先読みエラー: {e}")
+            return None
+        if prepared is None:
+            return None
+        built_at, question_set = prepared
+        if time.monotonic() - built_at > self.max_age_seconds:
+            return None
+        return question_set
+    
+    def invalidate(self):
+        """先読みしたセットをすべて破棄（問題の追加・削除、回答の記録後に呼び出す）"""
+        with self._lock:
+            self._generation += 1
+            for future in self._entries.values():
+                future.cancel()
+            self._entries.clear()
+    
+    def _run(self, key: Hashable, generation: int):
+        """ワーカースレッドで問題セットを構築（破棄・押し出し済みの場合は None）"""
+        with self._lock:
+            if generation != self._generation or key not in self._entries:
+                return None
+        question_set = self._build(key)
+        with self._lock:
+            if generation != self._generation:
+                return None
+        return time.monotonic(), question_set
@@ -0,0 +1,81 @@
+"""
+出題用の問題ビュー
+セッション終了後も DB にアクセスせずに参照できる、読み取り専用の問題・選択肢オブジェクト
+"""
+
+from typing import Optional
+
+from src.db import Question, Choice
+
+
+class _FrozenSlots:
+    """__slots__ ベースの不変オブジェクト（生成後の属性変更を禁止）"""
+    __slots__ = ()
+    
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values.get(name))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} は変更できません")
+    
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} は変更できません")
+
+
+class ChoiceView(_FrozenSlots):
+    """選択肢ビュー"""
+    __slots__ = ("id", "question_id", "choice_number", "text", "is_correct")
+    
+    @classmethod
+    def from_choice(cls, choice: Choice) -> "ChoiceView":
+        return cls(
+            id=choice.id,
+            question_id=choice.question_id,
+            choice_number=choice.choice_number,
+            text=choice.text,
+            is_correct=choice.is_correct
+        )
+    
+    def __repr__(self):
+        return f"<ChoiceView id={self.id} number={self.choice_number}>"
+
+
+class QuestionView(_FrozenSlots):
+    """
+    問題ビュー
+    
+    選択肢（choice_number 順）・分野名・年度を保持する。
+    元の Question は selectinload / joinedload で読み込み済みであること。
+    """
+    __slots__ = (
+        "id", "question_number", "text", "explanation", "difficulty",
+        "category_id", "category_name", "year_id", "year", "season", "choices"
+    )
+    
+    @classmethod
+    def from_question(cls, question: Question) -> "QuestionView":
+        category = question.category
+        year = question.year
+        choices = sorted(question.choices, key=lambda c: (c.choice_number or 0, c.id))
+        return cls(
+            id=question.id,
+            question_number=question.question_number,
+            text=question.text,
+            explanation=question.explanation,
+            difficulty=question.difficulty,
+            category_id=question.category_id,
+            category_name=category.name if category else None,
+            year_id=question.year_id,
+            year=year.year if year else None,
+            season=year.season if year else None,
+            choices=tuple(ChoiceView.from_choice(c) for c in choices)
+        )
+    
+    @property
+    def correct_choice(self) -> Optional[ChoiceView]:
+        """正解の選択肢"""
+        return next((c for c in self.choices if c.is_correct), None)
+    
+    def __repr__(self):
+        return f"<QuestionView id={self.id} number={self.question_number}>"
@@ -2,7 +2,10 @@
 出題エンジン - 各種出題モードの実装
 """
 
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import Enum
 import random
 import uuid
@@ -10,7 +13,13 @@ from datetime import datetime
 import logging
 
 from src.utils.data_manager import get_data_manager
+from src.utils.answer_journal import get_answer_journal
 from src.db import Question, StudySession, UserAnswer
+from src.core.question_views import QuestionView
+from src.core.session_checkpoint import SessionCheckpointStore, CHECKPOINT_DIRNAME
+from src.core.mock_test import MockTestAssembler
+from src.core.prefetch import QuestionSetPrefetcher, PREFETCH_MAX_ENTRIES
+from src.utils.irt import estimate_ability, ABILITY_PRIOR_MEAN
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +31,8 @@ class QuizMode(Enum):
     BY_CATEGORY = "by_category"  # 分野別
     REVIEW = "review"          # 復習モード
     MOCK_TEST = "mock_test"    # 模擬試験
+    WEAKNESS = "weakness"      # 弱点強化（誤答率などで重み付け）
+    ADAPTIVE = "adaptive"      # 適応型（IRT で能力値に合わせて出題）
 
 
 class QuizEngine:
@@ -32,9 +43,28 @@ class QuizEngine:
     
     def __init__(self):
         self.dm = get_data_manager()
+        self.journal = get_answer_journal()
+        self.checkpoints = SessionCheckpointStore(
+            str(Path(self.dm.db.db_path).parent / CHECKPOINT_DIRNAME)
+        )
+        self.mock_tests = MockTestAssembler(self.dm)
         self.current_session_id = None
-        self.current_questions: List[Question] = []
+        self.current_mode: Optional[QuizMode] = None
+        self.current_questions: List[QuestionView] = []
         self.current_question_index = 0
+        self.current_answers: Dict[int, int] = {}  # 問題ID → 選択肢ID
+        self.elapsed_seconds = 0  # 画面側のタイマーが更新
+        self.target_question_count = 0  # 適応型では出題しながら問題を追加する
+        self.current_filters: Dict = {}  # 出題条件（適応型の追加出題・再開用）
+        self.ability = ABILITY_PRIOR_MEAN  # 適応型の能力値推定
+        
+        # 出題セットの先読みと学習セッションの記録は1本のワーカーで順に行う
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="QuizEngine")
+        self.prefetcher = QuestionSetPrefetcher(self._build_question_set, self._worker)
+        self._recent_configs: "OrderedDict[tuple, None]" = OrderedDict()
+        self._session_record: Optional[Future] = None
+        self.closed = False
+        self.dm.add_invalidation_listener(self._on_questions_changed)
     
     def start_session(
         self,
@@ -43,10 +73,13 @@ class QuizEngine:
         category_ids: List[int] = None,
         year_ids: List[int] = None,
         difficulty_range: Tuple[int, int] = (1, 5)
-    ) -> Tuple[str, List[Question]]:
+    ) -> Tuple[str, List[QuestionView]]:
         """
         学習セッション開始
         
+        先読み済みの問題セットがあれば DB にアクセスせずに開始する。
+        学習セッションの記録はワーカースレッドで行う。
+        
         Args:
             mode: 出題モード
             question_count: 出題数（Noneの場合はモードのデフォルト値）
@@ -57,53 +90,166 @@ class QuizEngine:
         Returns:
             (session_id, questions)
         """
+        # 前のセッションの記録が終わっていない場合は待つ
+        self._wait_for_session_record()
+        
         # セッションID生成
         self.current_session_id = str(uuid.uuid4())
         
-        # 出題数決定
+        # 先読み済みのセットがなければその場で問題を選ぶ
+        config = self._config_key(mode, question_count, category_ids, year_ids, difficulty_range)
+        prepared = self.prefetcher.take(config)
+        if prepared is None:
+            prepared = self._build_question_set(config)
+        questions, self.target_question_count = prepared
+        self._remember_config(config)
+        
+        self.current_questions = list(questions)
+        self.current_filters = {
+            "category_ids": category_ids,
+            "year_ids": year_ids,
+            "difficulty_range": list(difficulty_range) if difficulty_range else None
+        }
+        self.ability = ABILITY_PRIOR_MEAN
+        
+        # セッション情報をDBに記録（finish_session で完了を待つ）
+        self._session_record = self._worker.submit(
+            self._create_study_session,
+            self.current_session_id, mode, category_ids, year_ids, self.get_question_count()
+        )
+        
+        self.current_mode = mode
+        self.current_question_index = 0
+        self.current_answers = {}
+        self.elapsed_seconds = 0
+        self._save_checkpoint()
+        logger.info(
+            f"セッション開始: {self.current_session_id} "
+            f"(モード: {mode.value}, 問題数: {len(self.current_questions)})"
+        )
+        
+        return self.current_session_id, self.current_questions
+    
+    # ========================
+    # 出題セットの選択・先読み
+    # ========================
+    
+    def prefetch(
+        self,
+        mode: QuizMode,
+        question_count: int = None,
+        category_ids: List[int] = None,
+        year_ids: List[int] = None,
+        difficulty_range: Tuple[int, int] = (1, 5)
+    ):
+        """
+        出題条件の問題セットをワーカースレッドで先読み（設定ダイアログの表示中などに呼び出す）
+        
+        引数は start_session と同じ。
+        """
+        self.prefetcher.request(
+            self._config_key(mode, question_count, category_ids, year_ids, difficulty_range)
+        )
+    
+    def _config_key(
+        self,
+        mode: QuizMode,
+        question_count: Optional[int],
+        category_ids: Optional[List[int]],
+        year_ids: Optional[List[int]],
+        difficulty_range: Optional[Tuple[int, int]]
+    ) -> tuple:
+        """出題条件を正規化したキー (モード, 出題数, 分野ID, 年度ID, 難易度範囲)"""
         if question_count is None:
             question_count = (
                 self.MOCK_TEST_QUESTION_COUNT
                 if mode == QuizMode.MOCK_TEST
                 else self.DEFAULT_QUESTION_COUNT
             )
+        return (
+            mode,
+            question_count,
+            tuple(sorted(category_ids)) if category_ids is not None else None,
+            tuple(sorted(year_ids)) if year_ids is not None else None,
+            tuple(difficulty_range) if difficulty_range else None
+        )
+    
+    def _remember_config(self, config: tuple):
+        """開始したセッションの出題条件を記録（セッション終了後に先読みする）"""
+        self._recent_configs.pop(config, None)
+        self._recent_configs[config] = None
+        while len(self._recent_configs) > PREFETCH_MAX_ENTRIES:
+            self._recent_configs.pop(next(iter(self._recent_configs)))
+    
+    def _refresh_prefetch(self):
+        """
+        先読み済みのセットを破棄し、最近使った出題条件を先読みし直す
+        
+        回答の記録で復習期限・弱点の重みが変わるため、セッション終了時に呼び出す。
+        """
+        self.prefetcher.invalidate()
+        for config in reversed(self._recent_configs):
+            self.prefetcher.request(config)
+    
+    def _on_questions_changed(self):
+        """問題の追加・削除時（先読み済みのセットに無効な問題が含まれうるため破棄）"""
+        self.prefetcher.invalidate()
+    
+    def _build_question_set(self, config: tuple) -> Tuple[List[QuestionView], int]:
+        """
+        出題条件から問題を選ぶ（先読みのワーカースレッドからも呼ばれるため、エンジンの状態は変更しない）
+        
+        Returns:
+            (出題する問題, 総問題数)
+        """
+        mode, question_count, category_ids, year_ids, difficulty_range = config
+        category_ids = list(category_ids) if category_ids is not None else None
+        year_ids = list(year_ids) if year_ids is not None else None
         
         # モードに応じて問題取得
+        questions = []
         if mode == QuizMode.RANDOM:
-            self.current_questions = self._get_random_questions(
+            questions = self._get_random_questions(
                 question_count, category_ids, year_ids, difficulty_range
             )
         
         elif mode == QuizMode.BY_YEAR:
-            self.current_questions = self._get_questions_by_year(
+            questions = self._get_questions_by_year(
                 question_count, year_ids, difficulty_range
             )
         
         elif mode == QuizMode.BY_CATEGORY:
-            self.current_questions = self._get_questions_by_category(
+            questions = self._get_questions_by_category(
                 question_count, category_ids, difficulty_range
             )
         
         elif mode == QuizMode.REVIEW:
-            self.current_questions = self._get_review_questions(
+            questions = self._get_review_questions(
                 question_count, category_ids, difficulty_range
             )
         
         elif mode == QuizMode.MOCK_TEST:
-            self.current_questions = self._get_mock_test_questions(
+            questions = self._get_mock_test_questions(
                 difficulty_range
             )
         
-        # セッション情報をDBに記録
-        self._create_study_session(mode, category_ids, year_ids)
+        elif mode == QuizMode.WEAKNESS:
+            questions = self._get_weighted_questions(
+                question_count, category_ids, year_ids, difficulty_range
+            )
         
-        self.current_question_index = 0
-        logger.info(
-            f"セッション開始: {self.current_session_id} "
-            f"(モード: {mode.value}, 問題数: {len(self.current_questions)})"
-        )
+        elif mode == QuizMode.ADAPTIVE:
+            # 1問目のみ選び（能力値は事前分布の平均）、以降は回答ごとに能力値に合わせて追加する
+            questions = self._get_adaptive_questions(
+                ABILITY_PRIOR_MEAN, [], category_ids, year_ids, difficulty_range
+            )
+            question_count = min(question_count, self.dm.count_candidate_questions(
+                category_ids, year_ids, difficulty_range
+            ))
         
-        return self.current_session_id, self.current_questions
+        # 選択肢まで読み込み済みの不変ビューに変換（出題中は DB にアクセスしない）
+        views = [QuestionView.from_question(q) for q in questions]
+        return views, question_count if mode == QuizMode.ADAPTIVE else len(views)
     
     def _get_random_questions(
         self,
@@ -116,7 +262,8 @@ class QuizEngine:
         return self.dm.get_random_questions(
             count=count,
             category_ids=category_ids,
-            year_ids=year_ids
+            year_ids=year_ids,
+            difficulty_range=difficulty_range
         )
     
     def _get_questions_by_year(
@@ -128,7 +275,8 @@ class QuizEngine:
         """年度別出題"""
         return self.dm.get_random_questions(
             count=count,
-            year_ids=year_ids
+            year_ids=year_ids,
+            difficulty_range=difficulty_range
         )
     
     def _get_questions_by_category(
@@ -140,7 +288,8 @@ class QuizEngine:
         """分野別出題"""
         return self.dm.get_random_questions(
             count=count,
-            category_ids=category_ids
+            category_ids=category_ids,
+            difficulty_range=difficulty_range
         )
     
     def _get_review_questions(
@@ -150,41 +299,123 @@ class QuizEngine:
         difficulty_range: Tuple[int, int]
     ) -> List[Question]:
         """
-        復習モード - 正答率が低い問題を優先出題
+        復習モード - 復習期限（SM-2）の近い問題を優先出題
         
-        実装方針:
-        1. ユーザーが回答した問題を取得
-        2. 正答率が低い順にソート
-        3. 下位N件を復習問題として出題
+        期限切れの問題から順に選び、足りない分は期限が近い問題で補う。
+        回答履歴がない場合はランダムに出題する。
         """
-        # TODO: 実装予定
-        # 暫定的にランダムで返す
-        return self.dm.get_random_questions(count=count)
+        question_ids = self.dm.get_review_question_ids(
+            count=count,
+            category_ids=category_ids,
+            difficulty_range=difficulty_range
+        )
+        if not question_ids:
+            return self.dm.get_random_questions(
+                count=count,
+                category_ids=category_ids,
+                difficulty_range=difficulty_range
+            )
+        return self.dm.get_questions_by_ids(question_ids)
+    
+    def _get_weighted_questions(
+        self,
+        count: int,
+        category_ids: List[int],
+        year_ids: List[int],
+        difficulty_range: Tuple[int, int]
+    ) -> List[Question]:
+        """弱点強化モード - 苦手な問題を中心に、未回答の問題も混ぜて出題"""
+        question_ids = self.dm.get_weighted_question_ids(
+            count=count,
+            category_ids=category_ids,
+            year_ids=year_ids,
+            difficulty_range=difficulty_range
+        )
+        return self.dm.get_questions_by_ids(question_ids)
+    
+    def _get_adaptive_questions(
+        self,
+        ability: float,
+        exclude_ids: List[int],
+        category_ids: List[int],
+        year_ids: List[int],
+        difficulty_range: Tuple[int, int]
+    ) -> List[Question]:
+        """適応型 - 現在の能力値で項目情報量が最大の問題を1問選ぶ"""
+        question_id = self.dm.get_adaptive_question_id(
+            ability,
+            exclude_ids,
+            category_ids=category_ids,
+            year_ids=year_ids,
+            difficulty_range=difficulty_range
+        )
+        if question_id is None:
+            return []
+        return self.dm.get_questions_by_ids([question_id])
+    
+    def _append_adaptive_question(self) -> bool:
+        """適応型で次の問題を追加（候補がない場合 False）"""
+        questions = self._get_adaptive_questions(
+            self.ability,
+            [q.id for q in self.current_questions],
+            self.current_filters.get("category_ids"),
+            self.current_filters.get("year_ids"),
+            self.current_filters.get("difficulty_range")
+        )
+        if not questions:
+            return False
+        self.current_questions.append(QuestionView.from_question(questions[0]))
+        return True
+    
+    def _update_ability(self):
+        """回答済みの問題の正誤から能力値を再推定"""
+        responses = []
+        question_ids = []
+        for question in self.current_questions:
+            choice_id = self.current_answers.get(question.id)
+            if choice_id is None:
+                continue
+            correct = question.correct_choice
+            question_ids.append(question.id)
+            responses.append(1.0 if correct is not None and correct.id == choice_id else 0.0)
+        if not question_ids:
+            self.ability = ABILITY_PRIOR_MEAN
+            return
+        a, b = self.dm.get_item_bank().parameters(question_ids)
+        self.ability = estimate_ability(a, b, responses, theta=self.ability)
     
     def _get_mock_test_questions(
         self,
         difficulty_range: Tuple[int, int]
     ) -> List[Question]:
-        """模擬試験形式（100問）"""
-        return self.dm.get_random_questions(
-            count=self.MOCK_TEST_QUESTION_COUNT
+        """
+        模擬試験形式（100問）
+        
+        本試験の分野別出題数・難易度の分散に合わせた問題セットを使う。
+        事前生成済みのセットがあればそれを取り出す。
+        """
+        question_ids = self.mock_tests.take_form(
+            difficulty_range, total=self.MOCK_TEST_QUESTION_COUNT
         )
+        return self.dm.get_questions_by_ids(question_ids)
     
     def _create_study_session(
         self,
+        session_id: str,
         mode: QuizMode,
         category_ids: List[int],
-        year_ids: List[int]
+        year_ids: List[int],
+        total_questions: int
     ):
-        """学習セッション情報を DB に記録"""
+        """学習セッション情報を DB に記録（ワーカースレッドで実行）"""
         session = self.dm.db.get_session()
         try:
             study_session = StudySession(
-                session_id=self.current_session_id,
+                session_id=session_id,
                 mode=mode.value,
                 category_id=category_ids[0] if category_ids else None,
                 year_id=year_ids[0] if year_ids else None,
-                total_questions=len(self.current_questions),
+                total_questions=total_questions,
                 start_time=datetime.utcnow()
             )
             session.add(study_session)
@@ -195,34 +426,178 @@ class QuizEngine:
         finally:
             self.dm.db.close_session(session)
     
-    def get_current_question(self) -> Optional[Question]:
+    def _wait_for_session_record(self):
+        """ワーカースレッドでの学習セッションの記録を待つ"""
+        if self._session_record is not None:
+            self._session_record.result()
+            self._session_record = None
+    
+    def get_current_question(self) -> Optional[QuestionView]:
         """現在の問題を取得"""
         if self.current_question_index < len(self.current_questions):
             return self.current_questions[self.current_question_index]
         return None
     
     def get_question_count(self) -> int:
-        """総問題数"""
-        return len(self.current_questions)
+        """総問題数（適応型では出題予定の問題数）"""
+        return max(self.target_question_count, len(self.current_questions))
     
     def get_current_index(self) -> int:
         """現在の問題番号（0ベース）"""
         return self.current_question_index
     
+    def get_selected_choice_id(self) -> Optional[int]:
+        """現在の問題で選択済みの選択肢ID（未回答の場合 None）"""
+        question = self.get_current_question()
+        if not question:
+            return None
+        return self.current_answers.get(question.id)
+    
     def next_question(self) -> bool:
         """次の問題へ（成功時 True）"""
-        if self.current_question_index < len(self.current_questions) - 1:
-            self.current_question_index += 1
-            return True
-        return False
+        at_end = self.current_question_index >= len(self.current_questions) - 1
+        if at_end and (
+            self.current_mode != QuizMode.ADAPTIVE
+            or len(self.current_questions) >= self.target_question_count
+            or not self._append_adaptive_question()
+        ):
+            return False
+        self.current_question_index += 1
+        self._save_checkpoint()
+        return True
     
     def previous_question(self) -> bool:
         """前の問題へ（成功時 True）"""
         if self.current_question_index > 0:
             self.current_question_index -= 1
+            self._save_checkpoint()
             return True
         return False
     
+    # ========================
+    # チェックポイント・再開
+    # ========================
+    
+    def get_resumable_session(self) -> Optional[dict]:
+        """
+        再開可能な中断セッションを取得
+        
+        Returns:
+            {"session_id", "mode", "total_questions", "answered_count",
+             "current_index", "elapsed_seconds", "updated_at"}（ない場合 None）
+        """
+        state = self.checkpoints.latest()
+        if state is None:
+            return None
+        return {
+            "session_id": state["session_id"],
+            "mode": state["mode"],
+            "total_questions": state["options"].get("total_questions", len(state["question_ids"])),
+            "answered_count": len(state["answers"]),
+            "current_index": state["current_index"],
+            "elapsed_seconds": state["elapsed_seconds"],
+            "updated_at": state["updated_at"]
+        }
+    
+    def resume_session(self, session_id: str = None) -> Optional[Tuple[str, List[QuestionView]]]:
+        """
+        チェックポイントからセッションを再開（問題は再抽出せず、保存時の順序で読み込む）
+        
+        回答済みの内容は回答ジャーナル経由で記録済みのため、再送しない。
+        
+        Args:
+            session_id: 再開するセッションID（None の場合は最後に中断したセッション）
+        
+        Returns:
+            (session_id, questions)（チェックポイントがない場合 None）
+        """
+        state = (
+            self.checkpoints.load(session_id) if session_id
+            else self.checkpoints.latest()
+        )
+        if state is None:
+            return None
+        
+        questions = self.dm.get_questions_by_ids(state["question_ids"])
+        if not questions:
+            self.checkpoints.delete(state["session_id"])
+            return None
+        
+        self.current_session_id = state["session_id"]
+        self.current_mode = QuizMode(state["mode"])
+        self.current_questions = [QuestionView.from_question(q) for q in questions]
+        self.current_question_index = min(state["current_index"], len(questions) - 1)
+        self.current_answers = state["answers"]
+        self.elapsed_seconds = state["elapsed_seconds"]
+        options = state["options"]
+        self.target_question_count = options.get("total_questions", len(self.current_questions))
+        self.current_filters = options.get("filters", {})
+        self.ability = ABILITY_PRIOR_MEAN
+        if self.current_mode == QuizMode.ADAPTIVE:
+            self._update_ability()
+        
+        logger.info(
+            f"セッション再開: {self.current_session_id} "
+            f"(問題 {self.current_question_index + 1}/{len(self.current_questions)})"
+        )
+        return self.current_session_id, self.current_questions
+    
+    def close(self):
+        """
+        ワーカーを停止し、DataManager への通知登録を解除
+        
+        記録中の学習セッションは待ち、未着手の先読みは取り消す。
+        閉じたエンジンは使わず、get_quiz_engine() で新しいものを取得する。
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.dm.remove_invalidation_listener(self._on_questions_changed)
+        try:
+            self._wait_for_session_record()
+        except Exception as e:
+            logger.error(f"学習セッション記録エラー: {e}")
+        self._worker.shutdown(wait=False, cancel_futures=True)
+    
+    def has_unsaved_answers(self, session_id: str = None) -> bool:
+        """DB に未反映の回答（書き込み待ち・退避中）が残っているか（省略時は現在のセッション）"""
+        session_id = session_id or self.current_session_id
+        if not session_id:
+            return False
+        return bool(
+            self.journal.pending_answers(session_id) or self.journal.failed_answers(session_id)
+        )
+    
+    def discard_session(self, session_id: str = None):
+        """
+        セッションのチェックポイントを破棄
+        
+        Args:
+            session_id: 破棄するセッションID（None の場合は現在のセッションを中止）
+        """
+        if session_id is None:
+            session_id = self.current_session_id
+            self.current_session_id = None
+        if session_id:
+            self.checkpoints.delete(session_id)
+    
+    def _save_checkpoint(self):
+        """現在のセッション状態をチェックポイントに保存"""
+        if not self.current_session_id:
+            return
+        self.checkpoints.save(
+            self.current_session_id,
+            self.current_mode.value if self.current_mode else None,
+            [q.id for q in self.current_questions],
+            self.current_question_index,
+            self.current_answers,
+            self.elapsed_seconds,
+            options={
+                "total_questions": self.target_question_count,
+                "filters": self.current_filters
+            }
+        )
+    
     def submit_answer(
         self,
         choice_id: int,
@@ -231,6 +606,8 @@ class QuizEngine:
         """
         回答を提出
         
+        回答はジャーナルに追加され、DB へはバックグラウンドでまとめて書き込まれる。
+        
         Args:
             choice_id: 選択した選択肢ID
             time_spent_seconds: 回答に費やした時間（秒）
@@ -246,12 +623,21 @@ class QuizEngine:
             logger.error("問題が見つかりません")
             return False
         
-        return self.dm.record_answer(
+        answer = self.dm.prepare_answer(
             question.id,
             choice_id,
             self.current_session_id,
             time_spent_seconds
         )
+        if answer is None:
+            return False
+        
+        self.journal.append(answer)
+        self.current_answers[question.id] = choice_id
+        if self.current_mode == QuizMode.ADAPTIVE:
+            self._update_ability()
+        self._save_checkpoint()
+        return True
     
     def finish_session(self) -> dict:
         """
@@ -269,6 +655,14 @@ class QuizEngine:
         if not self.current_session_id:
             return {}
         
+        # 学習セッションの記録とジャーナルに残っている回答の書き込みを先に済ませる
+        # （書き込みが完了しない場合はチェックポイントを残し、次回再開できるようにする）
+        self._wait_for_session_record()
+        if not self.journal.flush_session(self.current_session_id):
+            logger.error(f"回答の書き込みが完了しないためセッションを終了できません: {self.current_session_id}")
+            return {}
+        self.checkpoints.delete(self.current_session_id)
+        
         # 回答情報を集計
         session = self.dm.db.get_session()
         try:
@@ -288,13 +682,17 @@ class QuizEngine:
                 session_id=self.current_session_id
             ).first()
             
+            # 終了済みセッションは統計へ加算しない（二重加算防止）
+            already_finished = False
             if study_session:
+                already_finished = study_session.end_time is not None
                 study_session.correct_count = correct_count
                 study_session.end_time = datetime.utcnow()
                 session.commit()
             
             # 統計を更新
-            self.dm.update_statistics(self.current_session_id)
+            if not already_finished:
+                self.dm.update_statistics(self.current_session_id)
             
             return {
                 "session_id": self.current_session_id,
@@ -309,6 +707,8 @@ class QuizEngine:
             return {}
         finally:
             self.dm.db.close_session(session)
+            # 結果表示中に次のセッション用の問題セットを用意する
+            self._refresh_prefetch()
 
 
 # グローバルインスタンス
@@ -318,6 +718,6 @@ _quiz_engine = None
 def get_quiz_engine() -> QuizEngine:
     """グローバル出題エンジン取得"""
     global _quiz_engine
-    if _quiz_engine is None:
+    if _quiz_engine is None or _quiz_engine.closed:
         _quiz_engine = QuizEngine()
     return _quiz_engine
@@ -0,0 +1,119 @@
+"""
+学習セッションのチェックポイント
+出題中のセッション状態を小さな JSON ファイルに保存し、異常終了後に再開できるようにする
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# チェックポイント保存ディレクトリ名（DB と同じディレクトリ配下）
+CHECKPOINT_DIRNAME = "checkpoints"
+
+# ファイル形式のバージョン（互換性のない変更時に上げる）
+CHECKPOINT_FORMAT_VERSION = 1
+
+
+class SessionCheckpointStore:
+    """
+    セッションごとのチェックポイントファイル管理
+    
+    保存は一時ファイルへの書き込み後に os.replace で置き換えるため、
+    書き込み途中で終了しても直前の内容が残る。
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+    
+    def save(
+        self,
+        session_id: str,
+        mode: str,
+        question_ids: List[int],
+        current_index: int,
+        answers: Dict[int, int],
+        elapsed_seconds: int,
+        options: Dict = None
+    ):
+        """
+        チェックポイントを保存
+        
+        Args:
+            session_id: セッションID
+            mode: 出題モード（QuizMode の値）
+            question_ids: 出題順の問題ID
+            current_index: 現在の問題番号（0ベース）
+            answers: 問題ID → 選択した選択肢ID
+            elapsed_seconds: 経過時間（秒）
+            options: 再開時に必要な出題条件（総問題数・絞り込み条件など）
+        """
+        state = {
+            "version": CHECKPOINT_FORMAT_VERSION,
+            "session_id": session_id,
+            "mode": mode,
+            "question_ids": question_ids,
+            "current_index": current_index,
+            "answers": {str(qid): cid for qid, cid in answers.items()},
+            "elapsed_seconds": elapsed_seconds,
+            "options": options or {},
+            "updated_at": datetime.utcnow().isoformat()
+        }
+        path = self._path(session_id)
+        temp_path = path.with_name(path.name + ".tmp")
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, separators=(",", ":"))
+                # 置き換え後に中身が空のファイルが残らないよう、ディスクへ書き出してから差し替える
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.error(f"チェックポイント保存エラー: {e}")
+    
+    def load(self, session_id: str) -> Optional[Dict]:
+        """チェックポイントを読み込み（存在しない・破損している場合 None）"""
+        path = self._path(session_id)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"チェックポイント読み込みエラー: {path.name} ({e})")
+            return None
+        
+        if state.get("version") != CHECKPOINT_FORMAT_VERSION:
+            logger.warning(f"未対応のチェックポイント形式: {path.name}")
+            return None
+        state["answers"] = {int(qid): cid for qid, cid in state["answers"].items()}
+        state.setdefault("options", {})
+        return state
+    
+    def latest(self) -> Optional[Dict]:
+        """最後に更新されたチェックポイントを読み込み"""
+        paths = sorted(
+            self.directory.glob("*.json"),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True
+        )
+        for path in paths:
+            state = self.load(path.stem)
+            if state is not None:
+                return state
+        return None
+    
+    def delete(self, session_id: str):
+        """チェックポイントを削除"""
+        try:
+            self._path(session_id).unlink(missing_ok=True)
+        except OSError as e:
+            logger.error(f"チェックポイント削除エラー: {e}")
+    
+    def _path(self, session_id: str) -> Path:
+        return self.directory / f"{session_id}.json"
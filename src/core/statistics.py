@@ -4,11 +4,16 @@
 """
 
 from typing import Dict, List, Tuple
+from sqlalchemy import func, cast, Float
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+import math
 import logging
 
-from src.db import get_db_manager, UserAnswer, Question, Category
+from src.db import (
+    get_db_manager, UserAnswer, Question, Category, QuestionStat, CategoryStat, DailyActivity,
+    StudySession
+)
 
 logger = logging.getLogger(__name__)
 
@@ -78,38 +83,27 @@ class StatisticsEngine:
         """
         session = self.db.get_session()
         try:
-            query = session.query(UserAnswer).join(Question)
+            query = session.query(
+                Category.name,
+                CategoryStat.attempts,
+                CategoryStat.correct
+            ).join(
+                Category, Category.id == CategoryStat.category_id
+            ).filter(CategoryStat.attempts > 0)
             
             if category_id:
-                query = query.filter(Question.category_id == category_id)
-            
-            answers = query.all()
-            
-            if not answers:
-                return {}
+                query = query.filter(CategoryStat.category_id == category_id)
             
             stats_by_category = {}
             
-            for answer in answers:
-                cat_name = answer.question.category.name
-                
-                if cat_name not in stats_by_category:
-                    stats_by_category[cat_name] = {
-                        "category_name": cat_name,
-                        "total_questions": 0,
-                        "correct_count": 0,
-                        "attempt_count": 0
-                    }
-                
-                stats_by_category[cat_name]["total_questions"] += 1
-                if answer.is_correct:
-                    stats_by_category[cat_name]["correct_count"] += 1
-            
-            # 正答率を計算
-            for cat_stats in stats_by_category.values():
-                total = cat_stats["total_questions"]
-                correct = cat_stats["correct_count"]
-                cat_stats["correct_rate"] = (correct / total * 100) if total > 0 else 0
+            for cat_name, total, correct in query:
+                stats_by_category[cat_name] = {
+                    "category_name": cat_name,
+                    "total_questions": total,
+                    "correct_count": correct,
+                    "attempt_count": 0,
+                    "correct_rate": (correct / total * 100) if total > 0 else 0
+                }
             
             return stats_by_category
         
@@ -120,9 +114,21 @@ class StatisticsEngine:
         """全体統計を取得"""
         session = self.db.get_session()
         try:
-            answers = session.query(UserAnswer).all()
+            total, correct, total_time = session.query(
+                func.sum(CategoryStat.attempts),
+                func.sum(CategoryStat.correct),
+                func.sum(CategoryStat.total_time_seconds)
+            ).one()
             
-            if not answers:
+            # セッション数は学習セッションごとに回答の有無をセッションIDインデックスで確かめて数える
+            # （回答履歴全体は走査しない）
+            sessions = session.query(func.count(StudySession.id)).filter(
+                session.query(UserAnswer.id).filter(
+                    UserAnswer.session_id == StudySession.session_id
+                ).exists()
+            ).scalar()
+            
+            if not total:
                 return {
                     "total_questions_answered": 0,
                     "total_correct": 0,
@@ -131,29 +137,32 @@ class StatisticsEngine:
                     "study_sessions": 0
                 }
             
-            total = len(answers)
-            correct = sum(1 for a in answers if a.is_correct == True)
-            total_time = sum(a.time_spent_seconds or 0 for a in answers)
-            
-            # セッション数
-            sessions = set(a.session_id for a in answers if a.session_id)
-            
             return {
                 "total_questions_answered": total,
                 "total_correct": correct,
                 "correct_rate": (correct / total * 100) if total > 0 else 0,
                 "total_study_time": total_time,
-                "study_sessions": len(sessions)
+                "study_sessions": sessions
             }
         finally:
             self.db.close_session(session)
     
-    def get_weak_points(self, threshold_rate: float = 60.0) -> List[Dict]:
+    def get_weak_points(
+        self,
+        threshold_rate: float = 60.0,
+        limit: int = 10,
+        min_attempts: int = 1
+    ) -> List[Dict]:
         """
         弱点を取得（正答率が低い問題）
         
+        問題別ロールアップ（question_stats）から、
+        閾値判定・並べ替え・件数制限まで DB 側で行う。
+        
         Args:
-            threshold_rate: この正答率以下の問題を弱点と判定（%）
+            threshold_rate: この正答率未満の問題を弱点と判定（%）
+            limit: 取得件数
+            min_attempts: 弱点と判定する最小回答数
         
         Returns:
             [
@@ -163,36 +172,37 @@ class StatisticsEngine:
         """
         session = self.db.get_session()
         try:
-            # 問題ごとの正答率を計算
-            questions = session.query(Question).all()
-            weak_points = []
-            
-            for question in questions:
-                answers = session.query(UserAnswer).filter_by(
-                    question_id=question.id
-                ).all()
-                
-                if not answers:
-                    continue
-                
-                total = len(answers)
-                correct = sum(1 for a in answers if a.is_correct == True)
-                correct_rate = (correct / total * 100) if total > 0 else 0
-                
-                if correct_rate < threshold_rate:
-                    weak_points.append({
-                        "question_id": question.id,
-                        "text": question.text[:50],  # 最初の50文字
-                        "category": question.category.name,
-                        "correct_rate": correct_rate,
-                        "attempt_count": total,
-                        "correct_count": correct
-                    })
+            # Python 側の correct / total * 100 と同じ演算順序で計算
+            correct_rate = cast(QuestionStat.correct, Float) / QuestionStat.attempts * 100
             
-            # 正答率でソート（低い順）
-            weak_points.sort(key=lambda x: x['correct_rate'])
+            rows = session.query(
+                Question.id,
+                Question.text,
+                Category.name,
+                QuestionStat.attempts,
+                QuestionStat.correct
+            ).join(
+                QuestionStat, QuestionStat.question_id == Question.id
+            ).join(
+                Category, Category.id == Question.category_id
+            ).filter(
+                QuestionStat.attempts >= max(min_attempts, 1),
+                correct_rate < threshold_rate
+            ).order_by(
+                correct_rate, Question.id
+            ).limit(limit).all()
             
-            return weak_points[:10]  # 上位10問の弱点
+            return [
+                {
+                    "question_id": question_id,
+                    "text": text[:50],  # 最初の50文字
+                    "category": category_name,
+                    "correct_rate": correct / total * 100,
+                    "attempt_count": total,
+                    "correct_count": correct
+                }
+                for question_id, text, category_name, total, correct in rows
+            ]
         
         finally:
             self.db.close_session(session)
@@ -210,49 +220,104 @@ class StatisticsEngine:
                 ...
             ]
         """
+        today = date.today()
+        activity = self.get_daily_activity(
+            today - timedelta(days=days), today, fill_missing=False
+        )
+        return [
+            {
+                "date": day["date"],
+                "correct_rate": day["correct_rate"],
+                "questions": day["questions"]
+            }
+            for day in activity
+        ]
+    
+    def get_daily_activity(
+        self,
+        start_date: date,
+        end_date: date,
+        fill_missing: bool = True
+    ) -> List[Dict]:
+        """
+        期間内の日別学習量を取得
+        
+        日別ロールアップ（daily_activity）を読むため、回答履歴の件数によらず日数分のコストで済む。
+        
+        Args:
+            start_date: 開始日（ローカル日付、この日を含む）
+            end_date: 終了日（ローカル日付、この日を含む）
+            fill_missing: True の場合、回答のない日も 0 件として含める
+        
+        Returns:
+            [
+                {"date": "2026-02-12", "questions": 10, "correct_count": 8,
+                 "correct_rate": 80.0, "study_time": 600, "sessions": 1},
+                ...
+            ]
+        """
         session = self.db.get_session()
         try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
-            answers = session.query(UserAnswer).filter(
-                UserAnswer.answered_at >= cutoff_date
-            ).all()
-            
-            if not answers:
-                return []
-            
-            # 日付ごとにグループ化
-            trend_by_date = {}
-            
-            for answer in answers:
-                date_str = answer.answered_at.strftime("%Y-%m-%d")
-                
-                if date_str not in trend_by_date:
-                    trend_by_date[date_str] = {
-                        "date": date_str,
-                        "total": 0,
-                        "correct": 0
-                    }
-                
-                trend_by_date[date_str]["total"] += 1
-                if answer.is_correct:
-                    trend_by_date[date_str]["correct"] += 1
-            
-            # 正答率を計算
-            trend = []
-            for date_str in sorted(trend_by_date.keys()):
-                stats = trend_by_date[date_str]
-                correct_rate = (stats["correct"] / stats["total"] * 100) if stats["total"] > 0 else 0
-                
-                trend.append({
-                    "date": date_str,
-                    "correct_rate": correct_rate,
-                    "questions": stats["total"]
-                })
-            
-            return trend
-        
+            rows = session.query(
+                DailyActivity.activity_date,
+                DailyActivity.answers,
+                DailyActivity.correct,
+                DailyActivity.seconds_spent,
+                DailyActivity.sessions
+            ).filter(
+                DailyActivity.activity_date >= start_date.isoformat(),
+                DailyActivity.activity_date <= end_date.isoformat()
+            ).order_by(DailyActivity.activity_date).all()
         finally:
             self.db.close_session(session)
+        
+        by_date = {
+            date_str: {
+                "date": date_str,
+                "questions": total,
+                "correct_count": correct,
+                "correct_rate": (correct / total * 100) if total > 0 else 0,
+                "study_time": seconds,
+                "sessions": sessions
+            }
+            for date_str, total, correct, seconds, sessions in rows
+        }
+        if not fill_missing:
+            return list(by_date.values())
+        
+        result = []
+        for offset in range((end_date - start_date).days + 1):
+            date_str = (start_date + timedelta(days=offset)).isoformat()
+            result.append(by_date.get(date_str) or {
+                "date": date_str,
+                "questions": 0,
+                "correct_count": 0,
+                "correct_rate": 0,
+                "study_time": 0,
+                "sessions": 0
+            })
+        return result
+    
+    def get_study_calendar(self, days: int = 365, end_date: date = None) -> List[Dict]:
+        """
+        学習カレンダー（ヒートマップ）用の日別系列を取得
+        
+        Args:
+            days: 表示日数（end_date を含む過去N日）
+            end_date: 最終日（None の場合は今日）
+        
+        Returns:
+            get_daily_activity の各要素に濃淡レベル "level"（0〜4、最多日が 4）を加えたリスト
+        """
+        end_date = end_date or date.today()
+        activity = self.get_daily_activity(end_date - timedelta(days=days - 1), end_date)
+        
+        max_questions = max((day["questions"] for day in activity), default=0)
+        for day in activity:
+            day["level"] = (
+                math.ceil(day["questions"] / max_questions * 4) if max_questions else 0
+            )
+        return activity
 
 
 # グローバルインスタンス
@@ -4,7 +4,9 @@ db モジュール初期化
 
 from src.db.database import get_db_manager, init_database
 from src.db.models import (
-    Base, Category, Year, Question, Choice, UserAnswer, Statistics, StudySession
+    Base, Category, Year, Question, Choice, UserAnswer, Statistics, StudySession,
+    SchemaVersion, QuestionStat, CategoryStat, DailyActivity, ReviewState,
+    ItemParameter
 )
 
 __all__ = [
@@ -17,5 +19,11 @@ __all__ = [
     'Choice',
     'UserAnswer',
     'Statistics',
-    'StudySession'
+    'StudySession',
+    'SchemaVersion',
+    'QuestionStat',
+    'CategoryStat',
+    'DailyActivity',
+    'ReviewState',
+    'ItemParameter'
 ]
@@ -4,12 +4,25 @@
 
 import os
 import sys
-from sqlalchemy import create_engine
+from typing import Dict
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from src.db.models import Base
+from src.db.migrations import run_migrations
 from pathlib import Path
 
 
+# SQLite パフォーマンス設定（新規接続ごとに適用）
+DEFAULT_SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",        # 読み取りが書き込みコミットをブロックしない
+    "synchronous": "NORMAL",      # WAL ではコミットごとの fsync を省略しても安全
+    "cache_size": -65536,         # ページキャッシュ 64MB（負値は KiB 指定）
+    "mmap_size": 268435456,       # メモリマップ I/O 256MB
+    "temp_store": "MEMORY",       # 一時テーブル・ソートをメモリ上で実行
+    "busy_timeout": 5000,         # ロック待ち（ミリ秒）
+}
+
+
 def get_app_data_dir() -> Path:
     """アプリケーションデータディレクトリを取得（PyInstaller対応）"""
     # ユーザーのAppDataディレクトリにデータを保存
@@ -22,17 +35,20 @@ def get_app_data_dir() -> Path:
 class DatabaseManager:
     """データベース管理クラス"""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, pragmas: Dict = None):
         """
         Args:
             db_path: SQLiteデータベースファイルパス
                     デフォルト: プロジェクトルート/data/app.db
+            pragmas: 接続ごとに適用する PRAGMA 設定
+                    デフォルト: DEFAULT_SQLITE_PRAGMAS（{} で SQLite 既定値のまま）
         """
         if db_path is None:
             data_dir = get_app_data_dir()
             db_path = str(data_dir / "app.db")
         
         self.db_path = db_path
+        self.pragmas = dict(DEFAULT_SQLITE_PRAGMAS if pragmas is None else pragmas)
         self.engine = None
         self.SessionLocal = None
         self._initialize()
@@ -45,12 +61,22 @@ class DatabaseManager:
             connect_args={"check_same_thread": False},
             echo=False  # Trueでデバッグログ出力
         )
+        event.listen(self.engine, "connect", self._apply_pragmas)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
     
+    def _apply_pragmas(self, dbapi_connection, connection_record):
+        """接続確立時に PRAGMA を適用"""
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+    
     def init_db(self):
-        """テーブル作成（初回実行時）"""
-        Base.metadata.create_all(bind=self.engine)
-        print(f"[OK] Database initialized: {self.db_path}")
+        """テーブル作成・スキーママイグレーション（起動時実行）"""
+        version = run_migrations(self.engine, self.db_path)
+        print(f"[OK] Database initialized: {self.db_path} (schema v{version})")
     
     def get_session(self) -> Session:
         """セッション取得"""
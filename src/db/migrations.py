@@ -0,0 +1,197 @@
+"""
+スキーママイグレーション
+既存の app.db にバージョン管理されたマイグレーションを順番に適用する
+
+新しいテーブル・カラム・インデックスを追加する場合は、
+@migration でバージョン番号を1つ進めたステップを末尾に追加する。
+各ステップは新規DB（create_all 済み）でも既存DBでも安全に実行できること。
+"""
+
+import logging
+import shutil
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+from src.db.models import (
+    Base, SchemaVersion, QuestionStat, CategoryStat, DailyActivity, ReviewState, ItemParameter
+)
+from src.db.rollups import rebuild_answer_rollups, reconcile_statistics
+from src.db.spaced_repetition import rebuild_review_schedule
+from src.db.search_index import (
+    create_search_index, rebuild_search_index, search_index_supported
+)
+
+logger = logging.getLogger(__name__)
+
+# このサイズ以上のDBはマイグレーション前にバックアップを作成
+BACKUP_THRESHOLD_BYTES = 1 * 1024 * 1024
+
+# バックアップ時に1ステップでコピーするページ数（ロック保持時間を短く保つ）
+BACKUP_PAGES_PER_STEP = 1024
+
+_MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = []
+
+
+def migration(version: int, description: str):
+    """マイグレーションステップ登録デコレータ"""
+    def decorator(func: Callable[[Connection], None]):
+        _MIGRATIONS.append((version, description, func))
+        _MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+    return decorator
+
+
+def get_latest_version() -> int:
+    """定義済みマイグレーションの最新バージョン"""
+    return _MIGRATIONS[-1][0] if _MIGRATIONS else 0
+
+
+def get_schema_version(conn: Connection) -> int:
+    """DBに適用済みのスキーマバージョンを取得（未管理のDBは 0）"""
+    try:
+        version = conn.exec_driver_sql("SELECT MAX(version) FROM schema_version").scalar()
+    except OperationalError:
+        return 0
+    return version or 0
+
+
+def backup_database(db_path: str, suffix: str = "pre-migration") -> Optional[Path]:
+    """
+    SQLite オンラインバックアップ API でDBを複製
+    
+    ページ単位で段階的にコピーするため、大きなDBでも書き込みロックを長時間保持しない。
+    
+    Returns:
+        バックアップファイルパス（失敗時 None）
+    """
+    source_path = Path(db_path)
+    backup_path = source_path.with_name(f"{source_path.name}.{suffix}.bak")
+    temp_path = backup_path.with_name(backup_path.name + ".tmp")
+    try:
+        source = sqlite3.connect(str(source_path))
+        target = sqlite3.connect(str(temp_path))
+        try:
+            source.backup(target, pages=BACKUP_PAGES_PER_STEP)
+        finally:
+            target.close()
+            source.close()
+        # 完了したバックアップのみを置き換え（途中で失敗しても既存バックアップは残る）
+        shutil.move(str(temp_path), str(backup_path))
+        logger.info(f"DBバックアップ作成: {backup_path}")
+        return backup_path
+    except Exception as e:
+        logger.error(f"DBバックアップエラー: {e}")
+        temp_path.unlink(missing_ok=True)
+        return None
+
+
+def run_migrations(engine: Engine, db_path: str = None) -> int:
+    """
+    未適用のマイグレーションを1トランザクションで適用
+    
+    適用済みの場合はバージョンを1回読むだけで終了する。
+    
+    Args:
+        engine: 対象DBのエンジン
+        db_path: DBファイルパス（指定時、大きなDBはバックアップを作成）
+    
+    Returns:
+        適用後のスキーマバージョン
+    """
+    latest = get_latest_version()
+    with engine.connect() as conn:
+        current = get_schema_version(conn)
+    if current >= latest:
+        return current
+    
+    pending = [m for m in _MIGRATIONS if m[0] > current]
+    
+    if db_path and Path(db_path).exists() and Path(db_path).stat().st_size >= BACKUP_THRESHOLD_BYTES:
+        if backup_database(db_path, suffix=f"v{current}") is None:
+            raise RuntimeError("マイグレーション前のバックアップに失敗しました")
+    
+    with engine.connect() as conn:
+        # pysqlite は DDL の前に BEGIN を発行しないため、明示的にトランザクションを制御する
+        dbapi_conn = conn.connection.driver_connection
+        isolation_level = dbapi_conn.isolation_level
+        dbapi_conn.isolation_level = None
+        try:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                SchemaVersion.__table__.create(bind=conn, checkfirst=True)
+                for version, description, upgrade in pending:
+                    logger.info(f"マイグレーション適用: v{version} {description}")
+                    upgrade(conn)
+                    conn.execute(SchemaVersion.__table__.insert().values(
+                        version=version,
+                        description=description,
+                        applied_at=datetime.utcnow()
+                    ))
+                conn.exec_driver_sql("COMMIT")
+            except Exception:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+        finally:
+            dbapi_conn.isolation_level = isolation_level
+    
+    logger.info(f"スキーマバージョン: v{current} → v{latest}")
+    return latest
+
+
+# ========================
+# マイグレーションステップ
+# ========================
+
+@migration(1, "全テーブルとホットパス用インデックスを作成")
+def _create_tables_and_indexes(conn: Connection):
+    # create_all は既存テーブルのインデックスを追加しないため個別に作成する
+    Base.metadata.create_all(bind=conn)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
+@migration(2, "問題別・分野別ロールアップを作成し回答履歴から集計")
+def _create_answer_rollups(conn: Connection):
+    Base.metadata.create_all(
+        bind=conn, tables=[QuestionStat.__table__, CategoryStat.__table__]
+    )
+    rebuild_answer_rollups(conn, tables=["question_stats", "category_stats"])
+
+
+@migration(3, "日別学習量ロールアップを作成し回答履歴から集計")
+def _create_daily_activity(conn: Connection):
+    Base.metadata.create_all(bind=conn, tables=[DailyActivity.__table__])
+    rebuild_answer_rollups(conn, tables=["daily_activity"])
+
+
+@migration(4, "グローバル統計カウンタを回答履歴から修正")
+def _reconcile_statistics(conn: Connection):
+    # 旧実装は直近セッションの値で上書きしていたため、終了済みセッションの累計で置き換える
+    reconcile_statistics(conn, repair=True)
+
+
+@migration(5, "復習スケジュール（SM-2）を作成し回答履歴から計算")
+def _create_review_schedule(conn: Connection):
+    Base.metadata.create_all(bind=conn, tables=[ReviewState.__table__])
+    rebuild_review_schedule(conn)
+
+
+@migration(6, "IRT 項目パラメータテーブルを作成（較正は scripts/calibrate_items.py で実行）")
+def _create_item_parameters(conn: Connection):
+    Base.metadata.create_all(bind=conn, tables=[ItemParameter.__table__])
+
+
+@migration(7, "問題文・解説・選択肢の全文検索インデックス（FTS5 trigram）と同期トリガーを作成")
+def _create_search_index(conn: Connection):
+    # 非対応の SQLite では作成せず、検索は LIKE で行う
+    if not search_index_supported(conn):
+        logger.warning("SQLite が FTS5 trigram に対応していないため全文検索インデックスを作成しません")
+        return
+    create_search_index(conn)
+    rebuild_search_index(conn)
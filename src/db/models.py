@@ -3,7 +3,9 @@ SQLAlchemy ORM モデル定義
 ITパスポート試験データベーススキーマ
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float, Enum
+from sqlalchemy import (
+    Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float, Enum, Index
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -65,6 +67,24 @@ class Question(Base):
     choices = relationship("Choice", back_populates="question", cascade="all, delete-orphan")
     user_answers = relationship("UserAnswer", back_populates="question", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        # 重複チェック（add_question / 一括インポート）
+        Index("ix_questions_duplicate_key", "category_id", "year_id", "question_number"),
+        # 出題対象（is_active=1）の絞り込み用部分インデックス
+        Index(
+            "ix_questions_active_category", "category_id", "difficulty",
+            sqlite_where=is_active == True
+        ),
+        Index(
+            "ix_questions_active_year", "year_id", "difficulty",
+            sqlite_where=is_active == True
+        ),
+        Index(
+            "ix_questions_active_difficulty", "difficulty",
+            sqlite_where=is_active == True
+        ),
+    )
+    
     def __repr__(self):
         return f"<Question id={self.id} number={self.question_number} year={self.year_id}>"
 
@@ -83,6 +103,10 @@ class Choice(Base):
     # リレーション
     question = relationship("Question", back_populates="choices")
     
+    __table_args__ = (
+        Index("ix_choices_question_id", "question_id"),
+    )
+    
     def __repr__(self):
         return f"<Choice id={self.id} choice_number={self.choice_number} correct={self.is_correct}>"
 
@@ -102,6 +126,15 @@ class UserAnswer(Base):
     # リレーション
     question = relationship("Question", back_populates="user_answers")
     
+    __table_args__ = (
+        # セッション集計（finish_session など）をインデックスのみで完結
+        Index("ix_user_answers_session", "session_id", "is_correct", "time_spent_seconds"),
+        # 問題別正答率（get_weak_points）
+        Index("ix_user_answers_question", "question_id", "is_correct"),
+        # 期間集計（get_learning_trend）
+        Index("ix_user_answers_answered_at", "answered_at", "is_correct"),
+    )
+    
     def __repr__(self):
         return f"<UserAnswer id={self.id} question_id={self.question_id} correct={self.is_correct}>"
 
@@ -138,3 +171,94 @@ class StudySession(Base):
     
     def __repr__(self):
         return f"<StudySession id={self.session_id} mode={self.mode}>"
+
+
+class QuestionStat(Base):
+    """問題別集計（回答記録時に増分更新）"""
+    __tablename__ = "question_stats"
+    
+    question_id = Column(Integer, ForeignKey("questions.id"), primary_key=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    correct = Column(Integer, default=0, nullable=False)
+    total_time_seconds = Column(Integer, default=0, nullable=False)
+    last_answered_at = Column(DateTime)
+    last_is_correct = Column(Boolean)
+    
+    def __repr__(self):
+        return f"<QuestionStat question_id={self.question_id} {self.correct}/{self.attempts}>"
+
+
+class CategoryStat(Base):
+    """分野別集計（回答記録時に増分更新）"""
+    __tablename__ = "category_stats"
+    
+    category_id = Column(Integer, ForeignKey("categories.id"), primary_key=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    correct = Column(Integer, default=0, nullable=False)
+    total_time_seconds = Column(Integer, default=0, nullable=False)
+    last_answered_at = Column(DateTime)
+    last_is_correct = Column(Boolean)
+    
+    def __repr__(self):
+        return f"<CategoryStat category_id={self.category_id} {self.correct}/{self.attempts}>"
+
+
+class DailyActivity(Base):
+    """日別学習量（ローカル日付単位、回答記録時に増分更新）"""
+    __tablename__ = "daily_activity"
+    
+    activity_date = Column(String(10), primary_key=True)  # YYYY-MM-DD（ローカル日付）
+    answers = Column(Integer, default=0, nullable=False)
+    correct = Column(Integer, default=0, nullable=False)
+    seconds_spent = Column(Integer, default=0, nullable=False)
+    sessions = Column(Integer, default=0, nullable=False)  # その日に回答のあったセッション数
+    
+    def __repr__(self):
+        return f"<DailyActivity {self.activity_date} {self.correct}/{self.answers}>"
+
+
+class ReviewState(Base):
+    """問題別の復習スケジュール（SM-2、回答記録時に増分更新）"""
+    __tablename__ = "review_schedule"
+    
+    question_id = Column(Integer, ForeignKey("questions.id"), primary_key=True)
+    repetitions = Column(Integer, default=0, nullable=False)  # 連続正解回数
+    interval_days = Column(Float, default=0.0, nullable=False)  # 復習間隔（日）
+    ease_factor = Column(Float, default=2.5, nullable=False)  # 易しさ係数
+    lapses = Column(Integer, default=0, nullable=False)  # 不正解回数
+    due_at = Column(DateTime, nullable=False)  # 次回復習日時
+    last_reviewed_at = Column(DateTime)
+    
+    __table_args__ = (
+        # 復習対象の抽出（due_at 順の範囲検索）
+        Index("ix_review_schedule_due_at", "due_at"),
+    )
+    
+    def __repr__(self):
+        return f"<ReviewState question_id={self.question_id} due_at={self.due_at}>"
+
+
+class ItemParameter(Base):
+    """問題別の IRT 項目パラメータ（較正バッチで更新）"""
+    __tablename__ = "item_parameters"
+    
+    question_id = Column(Integer, ForeignKey("questions.id"), primary_key=True)
+    discrimination = Column(Float, default=1.0, nullable=False)  # 識別力 a
+    difficulty = Column(Float, default=0.0, nullable=False)  # 困難度 b
+    responses = Column(Integer, default=0, nullable=False)  # 較正に使った回答数
+    calibrated_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ItemParameter question_id={self.question_id} b={self.difficulty:.2f}>"
+
+
+class SchemaVersion(Base):
+    """スキーマバージョン（適用済みマイグレーション）"""
+    __tablename__ = "schema_version"
+    
+    version = Column(Integer, primary_key=True)
+    description = Column(String(200))
+    applied_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<SchemaVersion version={self.version}>"
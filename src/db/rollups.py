@@ -0,0 +1,322 @@
+"""
+集計ロールアップ
+回答記録と同じトランザクションで question_stats / category_stats / daily_activity を増分更新する
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import text
+
+
+# 増分更新（同時刻・後着の回答を「最新」とみなす）
+_QUESTION_STATS_UPSERT = text("""
+    INSERT INTO question_stats (
+        question_id, attempts, correct, total_time_seconds, last_answered_at, last_is_correct
+    )
+    VALUES (:question_id, 1, :correct, :time_spent_seconds, :answered_at, :is_correct)
+    ON CONFLICT(question_id) DO UPDATE SET
+        attempts = attempts + 1,
+        correct = correct + excluded.correct,
+        total_time_seconds = total_time_seconds + excluded.total_time_seconds,
+        last_is_correct = CASE
+            WHEN excluded.last_answered_at >= COALESCE(last_answered_at, '')
+            THEN excluded.last_is_correct ELSE last_is_correct END,
+        last_answered_at = MAX(COALESCE(last_answered_at, ''), excluded.last_answered_at)
+""")
+
+_CATEGORY_STATS_UPSERT = text("""
+    INSERT INTO category_stats (
+        category_id, attempts, correct, total_time_seconds, last_answered_at, last_is_correct
+    )
+    SELECT category_id, 1, :correct, :time_spent_seconds, :answered_at, :is_correct
+    FROM questions WHERE id = :question_id
+    ON CONFLICT(category_id) DO UPDATE SET
+        attempts = attempts + 1,
+        correct = correct + excluded.correct,
+        total_time_seconds = total_time_seconds + excluded.total_time_seconds,
+        last_is_correct = CASE
+            WHEN excluded.last_answered_at >= COALESCE(last_answered_at, '')
+            THEN excluded.last_is_correct ELSE last_is_correct END,
+        last_answered_at = MAX(COALESCE(last_answered_at, ''), excluded.last_answered_at)
+""")
+
+_DAILY_ACTIVITY_UPSERT = text("""
+    INSERT INTO daily_activity (activity_date, answers, correct, seconds_spent, sessions)
+    VALUES (:activity_date, 1, :correct, :time_spent_seconds, :new_session)
+    ON CONFLICT(activity_date) DO UPDATE SET
+        answers = answers + 1,
+        correct = correct + excluded.correct,
+        seconds_spent = seconds_spent + excluded.seconds_spent,
+        sessions = sessions + excluded.sessions
+""")
+
+# セッションがその日に既に回答しているか（セッションIDインデックスで探索）
+_SESSION_ACTIVE_ON_DAY = text("""
+    SELECT 1 FROM user_answers
+    WHERE session_id = :session_id
+      AND answered_at >= :day_start AND answered_at < :day_end
+    LIMIT 1
+""")
+
+# グローバル統計（statistics）のカウンタ加算。正答率は加算後の値から計算する
+_STATISTICS_INCREMENT = text("""
+    UPDATE statistics SET
+        total_questions_answered = COALESCE(total_questions_answered, 0) + :answered,
+        total_correct = COALESCE(total_correct, 0) + :correct,
+        total_study_time_seconds = COALESCE(total_study_time_seconds, 0) + :seconds,
+        correct_rate = CAST(COALESCE(total_correct, 0) + :correct AS FLOAT)
+            / (COALESCE(total_questions_answered, 0) + :answered) * 100,
+        last_studied_at = :studied_at,
+        updated_at = :studied_at
+    WHERE id = (SELECT MIN(id) FROM statistics)
+""")
+
+_STATISTICS_INSERT = text("""
+    INSERT INTO statistics (
+        total_questions_answered, total_correct, correct_rate,
+        total_study_time_seconds, last_studied_at, updated_at
+    )
+    VALUES (:answered, :correct, :correct_rate, :seconds, :studied_at, :studied_at)
+""")
+
+_STATISTICS_CURRENT = text("""
+    SELECT
+        COALESCE(total_questions_answered, 0),
+        COALESCE(total_correct, 0),
+        COALESCE(total_study_time_seconds, 0)
+    FROM statistics ORDER BY id LIMIT 1
+""")
+
+# 終了済みセッションの回答から statistics の期待値を集計
+_STATISTICS_EXPECTED = text("""
+    SELECT
+        COUNT(*),
+        COALESCE(SUM(CASE WHEN a.is_correct = 1 THEN 1 ELSE 0 END), 0),
+        COALESCE(SUM(COALESCE(a.time_spent_seconds, 0)), 0),
+        MAX(a.answered_at)
+    FROM user_answers a
+    JOIN study_sessions s ON s.session_id = a.session_id
+    WHERE s.end_time IS NOT NULL
+""")
+
+# 全件再計算（user_answers から集計）
+_ROLLUP_COLUMNS = "attempts, correct, total_time_seconds, last_answered_at, last_is_correct"
+_DAILY_ACTIVITY_COLUMNS = "activity_date, answers, correct, seconds_spent, sessions"
+
+_QUESTION_STATS_REBUILD = """
+    SELECT
+        a.question_id,
+        COUNT(*),
+        SUM(CASE WHEN a.is_correct = 1 THEN 1 ELSE 0 END),
+        SUM(COALESCE(a.time_spent_seconds, 0)),
+        MAX(a.answered_at),
+        (SELECT l.is_correct FROM user_answers l
+         WHERE l.question_id = a.question_id
+         ORDER BY l.answered_at DESC, l.id DESC LIMIT 1)
+    FROM user_answers a
+    GROUP BY a.question_id
+"""
+
+_CATEGORY_STATS_REBUILD = """
+    SELECT
+        q.category_id,
+        COUNT(*),
+        SUM(CASE WHEN a.is_correct = 1 THEN 1 ELSE 0 END),
+        SUM(COALESCE(a.time_spent_seconds, 0)),
+        MAX(a.answered_at),
+        (SELECT l.is_correct FROM user_answers l
+         JOIN questions lq ON lq.id = l.question_id
+         WHERE lq.category_id = q.category_id
+         ORDER BY l.answered_at DESC, l.id DESC LIMIT 1)
+    FROM user_answers a
+    JOIN questions q ON q.id = a.question_id
+    GROUP BY q.category_id
+"""
+
+_DAILY_ACTIVITY_REBUILD = """
+    SELECT
+        date(answered_at, 'localtime'),
+        COUNT(*),
+        SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END),
+        SUM(COALESCE(time_spent_seconds, 0)),
+        COUNT(DISTINCT NULLIF(session_id, ''))
+    FROM user_answers
+    WHERE answered_at IS NOT NULL
+    GROUP BY date(answered_at, 'localtime')
+"""
+
+# テーブル名 → (列, 再計算SQL, 結果キー)
+_REBUILD_TARGETS = {
+    "question_stats": (
+        f"question_id, {_ROLLUP_COLUMNS}", _QUESTION_STATS_REBUILD, "question_rows"
+    ),
+    "category_stats": (
+        f"category_id, {_ROLLUP_COLUMNS}", _CATEGORY_STATS_REBUILD, "category_rows"
+    ),
+    "daily_activity": (
+        _DAILY_ACTIVITY_COLUMNS, _DAILY_ACTIVITY_REBUILD, "daily_rows"
+    ),
+}
+
+
+def format_datetime(value: datetime) -> str:
+    """SQLAlchemy の SQLite DateTime と同じ格納形式に変換"""
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def local_date(answered_at: datetime) -> date:
+    """UTC で格納された回答日時をローカル日付に変換（SQLite の 'localtime' と同じ基準）"""
+    return answered_at.replace(tzinfo=timezone.utc).astimezone().date()
+
+
+def local_day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """ローカル日付の開始・終了時刻を UTC（格納形式と同じ naive datetime）で返す"""
+    start = datetime.combine(day, time()).astimezone(timezone.utc)
+    end = datetime.combine(day + timedelta(days=1), time()).astimezone(timezone.utc)
+    return start.replace(tzinfo=None), end.replace(tzinfo=None)
+
+
+def _is_new_session_day(conn, session_id: str, day: date) -> bool:
+    """セッションがその日の最初の回答かどうか"""
+    day_start, day_end = local_day_bounds(day)
+    found = conn.execute(_SESSION_ACTIVE_ON_DAY, {
+        "session_id": session_id,
+        "day_start": format_datetime(day_start),
+        "day_end": format_datetime(day_end),
+    }).first()
+    return found is None
+
+
+def apply_answer_rollups(conn, answers: List[Dict]):
+    """
+    回答をロールアップへ反映（呼び出し側のトランザクション内で実行）
+    
+    日別のセッション数を判定するため、回答を user_answers へ挿入する前に呼び出すこと。
+    
+    Args:
+        conn: Session または Connection
+        answers: [{"question_id", "is_correct", "time_spent_seconds", "answered_at", "session_id"}, ...]
+                 answered_at は datetime
+    """
+    if not answers:
+        return
+    
+    params = []
+    seen_session_days = set()
+    for answer in answers:
+        day = local_date(answer["answered_at"])
+        session_id = answer.get("session_id")
+        new_session = False
+        if session_id and (session_id, day) not in seen_session_days:
+            seen_session_days.add((session_id, day))
+            new_session = _is_new_session_day(conn, session_id, day)
+        params.append({
+            "question_id": answer["question_id"],
+            "correct": 1 if answer["is_correct"] else 0,
+            "is_correct": answer["is_correct"],
+            "time_spent_seconds": answer.get("time_spent_seconds") or 0,
+            "answered_at": format_datetime(answer["answered_at"]),
+            "activity_date": day.isoformat(),
+            "new_session": 1 if new_session else 0,
+        })
+    conn.execute(_QUESTION_STATS_UPSERT, params)
+    conn.execute(_CATEGORY_STATS_UPSERT, params)
+    conn.execute(_DAILY_ACTIVITY_UPSERT, params)
+
+
+def rebuild_answer_rollups(conn, tables: Sequence[str] = None) -> Dict[str, int]:
+    """
+    ロールアップを user_answers から全件再計算
+    
+    再計算前の内容と比較し、不一致だった行数も返す（検証用）。
+    
+    Args:
+        conn: Session または Connection
+        tables: 再計算するテーブル名（None の場合は全ロールアップ）
+    
+    Returns:
+        {"question_rows": 件数, "category_rows": 件数, "daily_rows": 件数, "mismatches": 不一致行数}
+    """
+    result = {"mismatches": 0}
+    for table in tables or _REBUILD_TARGETS:
+        columns, rebuild_sql, result_key = _REBUILD_TARGETS[table]
+        conn.execute(text(f"DROP TABLE IF EXISTS temp.rebuilt_{table}"))
+        conn.execute(text(f"CREATE TEMP TABLE rebuilt_{table} ({columns})"))
+        conn.execute(text(f"INSERT INTO temp.rebuilt_{table} ({columns}) {rebuild_sql}"))
+        
+        result["mismatches"] += conn.execute(text(f"""
+            SELECT
+                (SELECT COUNT(*) FROM (
+                    SELECT {columns} FROM {table}
+                    EXCEPT SELECT {columns} FROM temp.rebuilt_{table}
+                ))
+                + (SELECT COUNT(*) FROM (
+                    SELECT {columns} FROM temp.rebuilt_{table}
+                    EXCEPT SELECT {columns} FROM {table}
+                ))
+        """)).scalar()
+        
+        conn.execute(text(f"DELETE FROM {table}"))
+        conn.execute(text(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM temp.rebuilt_{table}"
+        ))
+        result[result_key] = conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+        conn.execute(text(f"DROP TABLE temp.rebuilt_{table}"))
+    return result
+
+
+def increment_statistics(conn, answered: int, correct: int, seconds: int, studied_at: datetime):
+    """
+    グローバル統計カウンタへ加算（UPDATE ... SET total = total + ? で原子的に更新）
+    
+    Args:
+        conn: Session または Connection
+        answered: 加算する回答数
+        correct: 加算する正答数
+        seconds: 加算する学習時間（秒）
+        studied_at: 最終学習日時
+    """
+    if answered <= 0:
+        return
+    
+    params = {
+        "answered": answered,
+        "correct": correct,
+        "seconds": seconds,
+        "studied_at": format_datetime(studied_at),
+    }
+    if conn.execute(_STATISTICS_INCREMENT, params).rowcount == 0:
+        conn.execute(_STATISTICS_INSERT, dict(params, correct_rate=correct / answered * 100))
+
+
+def reconcile_statistics(conn, repair: bool = True) -> Dict:
+    """
+    グローバル統計カウンタを回答履歴（終了済みセッション分）と照合
+    
+    Args:
+        conn: Session または Connection
+        repair: True の場合、不一致ならカウンタを集計値で置き換える
+    
+    Returns:
+        {"expected": {...}, "actual": {...}, "mismatch": bool}
+        expected / actual は {"total_questions_answered", "total_correct", "total_study_time_seconds"}
+    """
+    answered, correct, seconds, last_answered_at = conn.execute(_STATISTICS_EXPECTED).one()
+    keys = ("total_questions_answered", "total_correct", "total_study_time_seconds")
+    expected = dict(zip(keys, (answered, correct, seconds)))
+    current = conn.execute(_STATISTICS_CURRENT).first()
+    actual = dict(zip(keys, current)) if current else dict.fromkeys(keys, 0)
+    mismatch = expected != actual
+    
+    if mismatch and repair:
+        conn.execute(text("DELETE FROM statistics"))
+        if answered:
+            conn.execute(_STATISTICS_INSERT, {
+                "answered": answered,
+                "correct": correct,
+                "correct_rate": correct / answered * 100,
+                "seconds": seconds,
+                "studied_at": last_answered_at,
+            })
+    return {"expected": expected, "actual": actual, "mismatch": mismatch}
@@ -0,0 +1,233 @@
+"""
+問題の全文検索インデックス
+問題文・解説・選択肢を FTS5（trigram）で索引し、トリガーで questions / choices と同期する
+（FTS5 または trigram トークナイザに対応しない SQLite では作成せず、検索は LIKE で行う）
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+# 検索インデックスの仮想テーブル名（rowid = 問題ID）
+SEARCH_TABLE = "question_search"
+
+# trigram トークナイザで索引を引ける最短の語の長さ（これより短い語は instr で絞り込む）
+SEARCH_MIN_TERM_LENGTH = 3
+
+# 列ごとの重み（問題文 > 選択肢 > 解説）
+SEARCH_COLUMN_WEIGHTS = (3.0, 1.0, 2.0)
+
+# このテーブルに行がある間は挿入トリガーで索引しない（一括インポートがバッチごとにまとめて索引する）
+SEARCH_SUSPEND_TABLE = "question_search_suspended"
+
+# 抜粋の一致箇所を囲む記号と、抜粋の文字数
+SEARCH_SNIPPET_MARKERS = ("【", "】")
+SEARCH_SNIPPET_LENGTH = 40
+
+_CHOICE_TEXTS = "(SELECT group_concat(text, ' ') FROM choices WHERE question_id = {})"
+
+_TRIGGERS_ENABLED = f"NOT EXISTS (SELECT 1 FROM {SEARCH_SUSPEND_TABLE})"
+
+_SEARCH_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE}
+    USING fts5(text, explanation, choices, tokenize = 'trigram')
+    """,
+    f"CREATE TABLE IF NOT EXISTS {SEARCH_SUSPEND_TABLE} (suspended INTEGER NOT NULL)",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_question_insert
+    AFTER INSERT ON questions
+    WHEN {_TRIGGERS_ENABLED} BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, text, explanation, choices)
+        VALUES (NEW.id, NEW.text, NEW.explanation, {_CHOICE_TEXTS.format("NEW.id")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_question_update
+    AFTER UPDATE OF text, explanation ON questions BEGIN
+        UPDATE {SEARCH_TABLE} SET text = NEW.text, explanation = NEW.explanation
+        WHERE rowid = NEW.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_question_delete
+    AFTER DELETE ON questions BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_choice_insert
+    AFTER INSERT ON choices
+    WHEN {_TRIGGERS_ENABLED} BEGIN
+        UPDATE {SEARCH_TABLE} SET choices = {_CHOICE_TEXTS.format("NEW.question_id")}
+        WHERE rowid = NEW.question_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_choice_update
+    AFTER UPDATE OF text ON choices BEGIN
+        UPDATE {SEARCH_TABLE} SET choices = {_CHOICE_TEXTS.format("NEW.question_id")}
+        WHERE rowid = NEW.question_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_choice_delete
+    AFTER DELETE ON choices BEGIN
+        UPDATE {SEARCH_TABLE} SET choices = {_CHOICE_TEXTS.format("OLD.question_id")}
+        WHERE rowid = OLD.question_id;
+    END
+    """,
+]
+
+# 全件再構築（選択肢は問題ごとに連結）
+_SEARCH_REBUILD = f"""
+    INSERT INTO {SEARCH_TABLE} (rowid, text, explanation, choices)
+    SELECT q.id, q.text, q.explanation, c.texts
+    FROM questions q
+    LEFT JOIN (
+        SELECT question_id, group_concat(text, ' ') AS texts
+        FROM choices GROUP BY question_id
+    ) c ON c.question_id = q.id
+"""
+
+# 索引への1問分の追加（一括インポートで executemany に使う）
+_SEARCH_INSERT = f"INSERT INTO {SEARCH_TABLE} (rowid, text, explanation, choices) VALUES (?, ?, ?, ?)"
+
+# 検索語の区切り（半角・全角スペース）
+_TERM_SEPARATOR = re.compile(r"[\s　]+")
+
+
+def create_search_index(conn):
+    """
+    検索インデックスと同期用トリガーを作成（既存の場合は何もしない）
+    
+    Args:
+        conn: Session または Connection
+    """
+    for statement in _SEARCH_DDL:
+        conn.execute(text(statement))
+
+
+def search_index_supported(conn) -> bool:
+    """この SQLite が FTS5 と trigram トークナイザ（SQLite 3.34 以降）に対応しているか"""
+    try:
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE temp.{SEARCH_TABLE}_probe USING fts5(text, tokenize = 'trigram')"
+        ))
+    except OperationalError:
+        return False
+    conn.execute(text(f"DROP TABLE temp.{SEARCH_TABLE}_probe"))
+    return True
+
+
+def search_index_exists(conn) -> bool:
+    """検索インデックスが作成済みか"""
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": SEARCH_TABLE}
+    ).first() is not None
+
+
+def suspend_search_triggers(cursor):
+    """
+    挿入トリガーによる索引を止める（bulk_index_questions で再開）
+    
+    Args:
+        cursor: DBAPI カーソル
+    """
+    cursor.execute(f"INSERT INTO {SEARCH_SUSPEND_TABLE} (suspended) VALUES (1)")
+
+
+def bulk_index_questions(cursor, rows: List[Tuple[int, str, Optional[str], str]]):
+    """
+    挿入トリガーを止めて追加した問題をまとめて索引（問題・選択肢と同じトランザクション内で呼ぶ）
+    
+    問題・選択肢の挿入前に suspend_search_triggers を呼んでおくこと。
+    この関数の終わりでトリガーを再開するため、コミット後に他の接続から停止中の状態は見えない。
+    
+    Args:
+        cursor: DBAPI カーソル
+        rows: [(問題ID, 問題文, 解説, 選択肢を空白で連結した文字列), ...]
+    """
+    cursor.executemany(_SEARCH_INSERT, rows)
+    cursor.execute(f"DELETE FROM {SEARCH_SUSPEND_TABLE}")
+
+
+def rebuild_search_index(conn) -> int:
+    """
+    検索インデックスを questions / choices から全件再構築
+    
+    Args:
+        conn: Session または Connection
+    
+    Returns:
+        索引した問題数
+    """
+    conn.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    conn.execute(text(_SEARCH_REBUILD))
+    return conn.execute(text(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")).scalar()
+
+
+def parse_search_query(query: str) -> Tuple[List[str], List[str]]:
+    """
+    入力された検索文字列をスペースで語に分割
+    
+    trigram は3文字未満の語を索引で引けないため、そうした語は分けて返し instr で絞り込む
+    （SQLite 3.40 の trigram は3文字未満の LIKE と MATCH を併用すると結果が空になるため
+    LIKE は使わない）。
+    
+    Returns:
+        (索引で引ける語のリスト, 3文字未満の語のリスト)
+    """
+    terms = []
+    short_terms = []
+    for term in _TERM_SEPARATOR.split(query.strip()):
+        if not term:
+            continue
+        if len(term) >= SEARCH_MIN_TERM_LENGTH:
+            terms.append(term)
+        else:
+            short_terms.append(term)
+    return terms, short_terms
+
+
+def match_expression(terms: List[str]) -> str:
+    """語をすべて含む行に一致する MATCH 式（語は引用符で囲み、FTS5 の演算子として解釈させない）"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def like_pattern(term: str) -> str:
+    """語を含む行に一致する LIKE パターン（ESCAPE '\\' と併用し、% と _ は文字として扱う）"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def make_snippet(values: List[Optional[str]], terms: List[str]) -> str:
+    """
+    検索結果の抜粋
+    
+    最初に語を含む列から、一致箇所の前後を SEARCH_SNIPPET_LENGTH 文字程度切り出し、
+    一致箇所を SEARCH_SNIPPET_MARKERS で囲む。
+    （FTS5 の snippet() は1件ごとのコストが大きいため、表示する件数分だけ Python で作る）
+    """
+    start_marker, end_marker = SEARCH_SNIPPET_MARKERS
+    for value in values:
+        if not value:
+            continue
+        lowered = value.lower()
+        for term in terms:
+            position = lowered.find(term.lower())
+            if position < 0:
+                continue
+            begin = max(0, position - SEARCH_SNIPPET_LENGTH // 3)
+            end = min(len(value), begin + SEARCH_SNIPPET_LENGTH)
+            return (
+                ("…" if begin > 0 else "")
+                + value[begin:position]
+                + start_marker + value[position:position + len(term)] + end_marker
+                + value[position + len(term):end]
+                + ("…" if end < len(value) else "")
+            )
+    return ""
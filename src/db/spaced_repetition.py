@@ -0,0 +1,220 @@
+"""
+間隔反復スケジュール（SM-2）
+回答記録と同じトランザクションで review_schedule を増分更新し、次回復習日時を決める
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+
+from src.db.rollups import format_datetime
+
+# SM-2 の初期値・下限
+SM2_INITIAL_EASE = 2.5
+SM2_MIN_EASE = 1.3
+
+# 1回目・2回目の正解後の復習間隔（日）
+SM2_FIRST_INTERVAL_DAYS = 1
+SM2_SECOND_INTERVAL_DAYS = 6
+
+# 復習間隔の上限（日）: 正解が続いても間隔が際限なく伸びて日時が範囲外にならないようにする
+SM2_MAX_INTERVAL_DAYS = 36500
+
+# 回答時間による評価（秒）: この時間以内の正解は「易しい」、超える正解は「難しい」
+SM2_FAST_ANSWER_SECONDS = 30
+SM2_SLOW_ANSWER_SECONDS = 90
+
+# (repetitions, interval_days, ease_factor, lapses)
+ReviewStateTuple = Tuple[int, float, float, int]
+
+_REVIEW_COLUMNS = (
+    "question_id, repetitions, interval_days, ease_factor, lapses, due_at, last_reviewed_at"
+)
+
+_REVIEW_STATE_SELECT = text("""
+    SELECT question_id, repetitions, interval_days, ease_factor, lapses
+    FROM review_schedule WHERE question_id IN :question_ids
+""").bindparams(bindparam("question_ids", expanding=True))
+
+_REVIEW_STATE_UPSERT = text(f"""
+    INSERT INTO review_schedule ({_REVIEW_COLUMNS})
+    VALUES (
+        :question_id, :repetitions, :interval_days, :ease_factor, :lapses,
+        :due_at, :last_reviewed_at
+    )
+    ON CONFLICT(question_id) DO UPDATE SET
+        repetitions = excluded.repetitions,
+        interval_days = excluded.interval_days,
+        ease_factor = excluded.ease_factor,
+        lapses = excluded.lapses,
+        due_at = excluded.due_at,
+        last_reviewed_at = excluded.last_reviewed_at
+""")
+
+# 全件再計算（回答履歴を時系列で再生）
+_REVIEW_REPLAY = """
+    SELECT question_id, is_correct, time_spent_seconds, answered_at
+    FROM user_answers
+    WHERE answered_at IS NOT NULL
+    ORDER BY answered_at, id
+"""
+
+
+def answer_quality(is_correct: Optional[bool], time_spent_seconds: Optional[int]) -> int:
+    """
+    回答を SM-2 の評価（0〜5）に変換
+    
+    正誤のみを記録しているため、正解は回答時間で 3〜5、不正解は 1 とする。
+    """
+    if not is_correct:
+        return 1
+    if time_spent_seconds is None or time_spent_seconds <= 0:
+        return 4
+    if time_spent_seconds <= SM2_FAST_ANSWER_SECONDS:
+        return 5
+    if time_spent_seconds > SM2_SLOW_ANSWER_SECONDS:
+        return 3
+    return 4
+
+
+def sm2_next(state: Optional[ReviewStateTuple], quality: int) -> ReviewStateTuple:
+    """
+    SM-2 で次の状態を計算
+    
+    Args:
+        state: 現在の (repetitions, interval_days, ease_factor, lapses)（未回答の場合 None）
+        quality: 評価（0〜5）
+    
+    Returns:
+        更新後の (repetitions, interval_days, ease_factor, lapses)
+    """
+    repetitions, interval_days, ease_factor, lapses = state or (0, 0.0, SM2_INITIAL_EASE, 0)
+    
+    if quality >= 3:
+        if repetitions == 0:
+            interval_days = SM2_FIRST_INTERVAL_DAYS
+        elif repetitions == 1:
+            interval_days = SM2_SECOND_INTERVAL_DAYS
+        else:
+            interval_days = min(round(interval_days * ease_factor), SM2_MAX_INTERVAL_DAYS)
+        repetitions += 1
+    else:
+        repetitions = 0
+        interval_days = SM2_FIRST_INTERVAL_DAYS
+        lapses += 1
+    
+    ease_factor += 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    # 浮動小数点の誤差が増分更新と再計算で食い違わないよう丸める
+    ease_factor = round(max(SM2_MIN_EASE, ease_factor), 4)
+    return repetitions, float(interval_days), ease_factor, lapses
+
+
+def _state_params(question_id: int, state: ReviewStateTuple, reviewed_at: datetime) -> Dict:
+    repetitions, interval_days, ease_factor, lapses = state
+    # 上限前に保存された間隔や遠い将来の回答日時でも datetime の範囲を超えないようにする
+    interval = min(
+        timedelta(days=min(interval_days, SM2_MAX_INTERVAL_DAYS)), datetime.max - reviewed_at
+    )
+    return {
+        "question_id": question_id,
+        "repetitions": repetitions,
+        "interval_days": interval_days,
+        "ease_factor": ease_factor,
+        "lapses": lapses,
+        "due_at": format_datetime(reviewed_at + interval),
+        "last_reviewed_at": format_datetime(reviewed_at),
+    }
+
+
+def apply_review_updates(conn, answers: List[Dict]):
+    """
+    回答を復習スケジュールへ反映（呼び出し側のトランザクション内で実行）
+    
+    対象問題の現在の状態を1回のクエリで読み込み、回答順に SM-2 を適用する。
+    
+    Args:
+        conn: Session または Connection
+        answers: [{"question_id", "is_correct", "time_spent_seconds", "answered_at"}, ...]
+                 answered_at は datetime
+    """
+    if not answers:
+        return
+    
+    question_ids = sorted({answer["question_id"] for answer in answers})
+    states = {
+        row[0]: tuple(row[1:])
+        for row in conn.execute(_REVIEW_STATE_SELECT, {"question_ids": question_ids})
+    }
+    
+    updated = {}
+    for answer in answers:
+        question_id = answer["question_id"]
+        quality = answer_quality(answer["is_correct"], answer.get("time_spent_seconds"))
+        states[question_id] = sm2_next(states.get(question_id), quality)
+        updated[question_id] = _state_params(
+            question_id, states[question_id], answer["answered_at"]
+        )
+    conn.execute(_REVIEW_STATE_UPSERT, list(updated.values()))
+
+
+def rebuild_review_schedule(conn) -> Dict[str, int]:
+    """
+    復習スケジュールを回答履歴から全件再計算
+    
+    再計算前の内容と比較し、不一致だった行数も返す（検証用）。
+    
+    Args:
+        conn: Session または Connection
+    
+    Returns:
+        {"review_rows": 件数, "mismatches": 不一致行数}
+    """
+    states = {}
+    last_reviewed = {}
+    for question_id, is_correct, time_spent_seconds, answered_at in conn.execute(
+        text(_REVIEW_REPLAY)
+    ):
+        quality = answer_quality(is_correct, time_spent_seconds)
+        states[question_id] = sm2_next(states.get(question_id), quality)
+        last_reviewed[question_id] = answered_at
+    
+    conn.execute(text("DROP TABLE IF EXISTS temp.rebuilt_review_schedule"))
+    conn.execute(text(f"CREATE TEMP TABLE rebuilt_review_schedule ({_REVIEW_COLUMNS})"))
+    if states:
+        conn.execute(
+            text(f"""
+                INSERT INTO temp.rebuilt_review_schedule ({_REVIEW_COLUMNS})
+                VALUES (
+                    :question_id, :repetitions, :interval_days, :ease_factor, :lapses,
+                    :due_at, :last_reviewed_at
+                )
+            """),
+            [
+                _state_params(
+                    question_id, state, datetime.fromisoformat(last_reviewed[question_id])
+                )
+                for question_id, state in states.items()
+            ]
+        )
+    
+    mismatches = conn.execute(text(f"""
+        SELECT
+            (SELECT COUNT(*) FROM (
+                SELECT {_REVIEW_COLUMNS} FROM review_schedule
+                EXCEPT SELECT {_REVIEW_COLUMNS} FROM temp.rebuilt_review_schedule
+            ))
+            + (SELECT COUNT(*) FROM (
+                SELECT {_REVIEW_COLUMNS} FROM temp.rebuilt_review_schedule
+                EXCEPT SELECT {_REVIEW_COLUMNS} FROM review_schedule
+            ))
+    """)).scalar()
+    
+    conn.execute(text("DELETE FROM review_schedule"))
+    conn.execute(text(
+        f"INSERT INTO review_schedule ({_REVIEW_COLUMNS}) "
+        f"SELECT {_REVIEW_COLUMNS} FROM temp.rebuilt_review_schedule"
+    ))
+    review_rows = conn.execute(text("SELECT COUNT(*) FROM review_schedule")).scalar()
+    conn.execute(text("DROP TABLE temp.rebuilt_review_schedule"))
+    return {"review_rows": review_rows, "mismatches": mismatches}
@@ -5,6 +5,7 @@
 import json
 import csv
 import logging
+import time
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
@@ -14,9 +15,9 @@ from PySide6.QtWidgets import (
     QTableWidget, QTableWidgetItem, QFileDialog, QMessageBox, QSpinBox,
     QComboBox, QLineEdit, QTextEdit, QFormLayout, QGroupBox, QDialog,
     QDialogButtonBox, QScrollArea, QSpinBox as QtSpinBox, QTableWidgetSelectionRange,
-    QTimeEdit
+    QTimeEdit, QProgressBar, QTableView, QAbstractItemView
 )
-from PySide6.QtCore import Qt, Signal, QTime
+from PySide6.QtCore import Qt, Signal, QTime, QTimer
 from PySide6.QtGui import QFont, QTextCursor
 
 from src.ui.styles import (
@@ -24,10 +25,17 @@ from src.ui.styles import (
     COLOR_CORRECT, COLOR_INCORRECT, COLOR_SURFACE
 )
 from src.utils.data_manager import get_data_manager
-from src.db import UserAnswer
+from src.ui.tasks import TaskRunner
+from src.ui.question_table_model import QuestionTableModel, QuestionTableDelegate
 
 logger = logging.getLogger(__name__)
 
+# 検索欄の入力が止まってから検索するまでの待ち時間（ミリ秒）
+QUESTION_SEARCH_DELAY_MS = 250
+
+# 統計タブを開き直したときに集計済みの値をそのまま表示する期間（秒）
+STATISTICS_CACHE_SECONDS = 60
+
 
 class AdminPanel(QWidget):
     """管理パネル"""
@@ -40,11 +48,19 @@ class AdminPanel(QWidget):
         self.questions_table = None
         self.combo_category = None
         self.combo_year = None
-        self.current_filtered_questions = []
+        # 問題追加・編集ダイアログの選択肢（_load_initial_data で読み込む）
+        self._categories = []
+        self._years = []
+        self.question_model = None
+        self.label_question_count = None
         self.scheduler = None
         self.scheduler_running = False
+        # DB アクセスはすべてワーカースレッドで行い、結果をシグナルで受け取る
+        self.tasks = TaskRunner(self)
+        self._import_task = None
+        # 統計タブの集計結果 (集計時刻, 結果)
+        self._statistics_cache = None
         self._setup_ui()
-        self._load_initial_data()
     
     def _setup_ui(self):
         """UI構築"""
@@ -58,27 +74,27 @@ class AdminPanel(QWidget):
         header.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY};")
         layout.addWidget(header)
         
-        # タブウィジェット
-        tabs = QTabWidget()
-        tabs.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY};")
-        
-        # タブ1: データインポート
-        tab_import = self._create_import_tab()
-        tabs.addTab(tab_import, "📥 データインポート")
-        
-        # タブ2: 問題一覧
-        tab_questions = self._create_questions_tab()
-        tabs.addTab(tab_questions, "📝 問題一覧")
-        
-        # タブ3: 統計情報
-        tab_stats = self._create_stats_tab()
-        tabs.addTab(tab_stats, "📊 統計情報")
-        
-        # タブ4: 設定
-        tab_settings = self._create_settings_tab()
-        tabs.addTab(tab_settings, "⚙️ 設定")
-        
-        layout.addWidget(tabs)
+        # タブウィジェット（各タブの中身は最初に開いたときに作成する）
+        self.tabs = QTabWidget()
+        self.tabs.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY};")
+        self._tab_builders = {}
+        for title, builder in (
+            ("📥 データインポート", self._create_import_tab),
+            ("📝 問題一覧", self._create_questions_tab),
+            ("📊 統計情報", self._create_stats_tab),
+            ("⚙️ 設定", self._create_settings_tab),
+        ):
+            container = QWidget()
+            container_layout = QVBoxLayout(container)
+            container_layout.setContentsMargins(0, 0, 0, 0)
+            index = self.tabs.addTab(container, title)
+            self._tab_builders[index] = builder
+            if builder == self._create_stats_tab:
+                self._stats_tab_index = index
+        self.tabs.currentChanged.connect(self._on_tab_changed)
+        self._on_tab_changed(self.tabs.currentIndex())
+        
+        layout.addWidget(self.tabs)
         
         # ボタン
         button_layout = QHBoxLayout()
@@ -92,30 +108,61 @@ class AdminPanel(QWidget):
         
         self.setLayout(layout)
     
+    def _on_tab_changed(self, index: int):
+        """タブを開いたときに中身を作成し、統計タブは集計結果が古ければ集計し直す"""
+        builder = self._tab_builders.pop(index, None)
+        if builder is not None:
+            self.tabs.widget(index).layout().addWidget(builder())
+        if index == self._stats_tab_index:
+            self._load_statistics()
+    
+    def showEvent(self, event):
+        """画面に戻ってきたとき、統計タブを表示中なら集計結果が古ければ集計し直す"""
+        super().showEvent(event)
+        if self.tabs.currentIndex() == self._stats_tab_index:
+            self._load_statistics()
+    
     def _load_initial_data(self):
-        """初期化時のデータ読み込み"""
-        try:
-            # カテゴリを読み込み
-            categories = self.data_manager.get_categories()
-            years = self.data_manager.get_years()
-            
-            # UIに反映
-            if self.combo_category:
-                self.combo_category.clear()
-                self.combo_category.addItem("すべて", None)
-                for cat in categories:
-                    self.combo_category.addItem(cat.name, cat.id)
-            
-            if self.combo_year:
-                self.combo_year.clear()
-                self.combo_year.addItem("すべて", None)
-                for year in years:
-                    year_text = f"{year.year}年"
-                    if year.season:
-                        year_text += f" {year.season}"
-                    self.combo_year.addItem(year_text, year.id)
-        except Exception as e:
-            print(f"データ読み込みエラー: {e}")
+        """分野・年度の一覧をワーカースレッドで取得（問題一覧タブの作成後のみ）"""
+        if self.combo_category is None:
+            return
+        self.tasks.start(
+            lambda context: (self.data_manager.get_categories(), self.data_manager.get_years()),
+            key="filter_options",
+            on_success=self._on_filter_options_loaded,
+            on_error=self._on_filter_options_failed
+        )
+    
+    def _on_filter_options_failed(self, error: Exception):
+        """分野・年度の一覧を取得できなかった場合（フィルターは「すべて」のまま）"""
+        logger.error(f"データ読み込みエラー: {error}")
+        QMessageBox.warning(self, "エラー", f"分野・年度の一覧を読み込めませんでした:\n{error}")
+    
+    def _on_filter_options_loaded(self, result):
+        """分野・年度の一覧をフィルターに反映（選択中の項目は維持）"""
+        categories, years = result
+        self._categories, self._years = categories, years
+        
+        for combo, items in (
+            (self.combo_category, [(cat.name, cat.id) for cat in categories]),
+            (self.combo_year, [
+                (f"{year.year}年" + (f" {year.season}" if year.season else ""), year.id)
+                for year in years
+            ]),
+        ):
+            if not combo:
+                continue
+            selected = combo.currentData()
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem("すべて", None)
+            for text, item_id in items:
+                combo.addItem(text, item_id)
+            index = combo.findData(selected)
+            combo.setCurrentIndex(index if index >= 0 else 0)
+            combo.blockSignals(False)
+        
+        self._apply_filters()
     
     def _create_import_tab(self) -> QWidget:
         """データインポートタブ"""
@@ -159,6 +206,19 @@ class AdminPanel(QWidget):
         
         layout.addSpacing(15)
         
+        self.import_buttons = [btn_sample, btn_csv, btn_json, btn_excel]
+        
+        # 進捗表示・中止ボタン（インポート中のみ表示）
+        progress_layout = QHBoxLayout()
+        self.import_progress = QProgressBar()
+        self.import_progress.hide()
+        progress_layout.addWidget(self.import_progress)
+        self.btn_import_cancel = QPushButton("⏹ 中止")
+        self.btn_import_cancel.clicked.connect(self._cancel_import)
+        self.btn_import_cancel.hide()
+        progress_layout.addWidget(self.btn_import_cancel)
+        layout.addLayout(progress_layout)
+        
         # ステータス表示
         self.status_label = QLabel("準備完了")
         self.status_label.setStyleSheet(f"color: {COLOR_TEXT_SECONDARY}; font-size: 11px;")
@@ -224,17 +284,40 @@ class AdminPanel(QWidget):
         self.combo_year.currentIndexChanged.connect(self._apply_filters)
         filter_layout.addWidget(self.combo_year)
         
-        filter_layout.addStretch()
+        filter_layout.addWidget(QLabel("検索:"))
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("問題文・解説・選択肢（スペース区切りですべて含む）")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.setMinimumWidth(280)
+        filter_layout.addWidget(self.search_edit, 1)
+        
+        # 入力のたびに検索せず、入力が止まってから検索する
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(QUESTION_SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self._apply_filters)
+        self.search_edit.textChanged.connect(self._search_timer.start)
+        self.search_edit.returnPressed.connect(self._apply_filters)
         
         layout.addLayout(filter_layout)
         
-        # 問題テーブル
-        self.questions_table = QTableWidget()
-        self.questions_table.setColumnCount(6)
-        self.questions_table.setHorizontalHeaderLabels([
-            "問題番号", "年度", "分野", "問題文 (最初50字)", "難易度", "操作"
-        ])
-        self.questions_table.setRowCount(0)
+        # 問題テーブル（スクロールに合わせてページ単位で読み込む）
+        self.question_model = QuestionTableModel(self.data_manager, self.tasks, self)
+        self.question_model.edit_failed.connect(
+            lambda message: QMessageBox.warning(self, "エラー", message)
+        )
+        self.question_delegate = QuestionTableDelegate(self)
+        self.question_delegate.edit_requested.connect(self._on_edit_button_clicked)
+        
+        self.questions_table = QTableView()
+        self.questions_table.setModel(self.question_model)
+        self.questions_table.setItemDelegate(self.question_delegate)
+        self.questions_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.questions_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.questions_table.setEditTriggers(
+            QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed
+        )
+        self.questions_table.verticalHeader().setDefaultSectionSize(28)
         self.questions_table.setColumnWidth(3, 250)
         layout.addWidget(self.questions_table)
         
@@ -257,6 +340,7 @@ class AdminPanel(QWidget):
         layout.addLayout(button_layout)
         
         widget.setLayout(layout)
+        self._load_initial_data()
         return widget
     
     def _create_stats_tab(self) -> QWidget:
@@ -268,54 +352,36 @@ class AdminPanel(QWidget):
         stats_group = QGroupBox("学習統計")
         stats_layout = QFormLayout()
         
-        # 登録問題数
-        try:
-            question_count = self.data_manager.get_question_count()
-        except:
-            question_count = 0
-        
-        self.label_question_count = QLabel(f"{question_count}問")
+        # 値はワーカースレッドで集計してから表示
+        self.label_question_count = QLabel("読み込み中...")
         stats_layout.addRow("登録問題数:", self.label_question_count)
         
-        # 統計情報取得
-        try:
-            stats = self.data_manager.get_statistics()
-            total_answers = stats.total_questions_answered if stats else 0
-            correct_count = stats.total_correct if stats else 0
-            correct_rate = stats.correct_rate if stats else 0.0
-        except:
-            total_answers = 0
-            correct_count = 0
-            correct_rate = 0.0
-        
-        self.label_total_answers = QLabel(f"{total_answers}問")
+        self.label_total_answers = QLabel("-")
         stats_layout.addRow("総回答数:", self.label_total_answers)
         
-        self.label_correct_count = QLabel(f"{correct_count}問")
+        self.label_correct_count = QLabel("-")
         stats_layout.addRow("正答数:", self.label_correct_count)
         
-        self.label_correct_rate = QLabel(f"{correct_rate:.1f}%")
+        self.label_correct_rate = QLabel("-")
         stats_layout.addRow("正答率:", self.label_correct_rate)
         
-        # 総学習時間（秒から時間へ変換）
-        try:
-            # すべての回答から学習時間を集計
-            session = self.data_manager.db.get_session()
-            all_answers = session.query(UserAnswer).all()
-            self.data_manager.db.close_session(session)
-            total_time_sec = sum(a.time_spent_seconds or 0 for a in all_answers) if all_answers else 0
-            hours = total_time_sec // 3600
-            minutes = (total_time_sec % 3600) // 60
-        except:
-            hours = 0
-            minutes = 0
-        
-        self.label_study_time = QLabel(f"{hours}時間 {minutes}分")
+        self.label_study_time = QLabel("-")
         stats_layout.addRow("総学習時間:", self.label_study_time)
         
         stats_group.setLayout(stats_layout)
         layout.addWidget(stats_group)
         
+        # 集計時刻と再集計ボタン（集計結果は STATISTICS_CACHE_SECONDS の間そのまま表示する）
+        refresh_layout = QHBoxLayout()
+        self.label_stats_updated = QLabel("")
+        self.label_stats_updated.setStyleSheet(f"color: {COLOR_TEXT_SECONDARY};")
+        refresh_layout.addWidget(self.label_stats_updated)
+        refresh_layout.addStretch()
+        self.btn_refresh_stats = QPushButton("🔄 再集計")
+        self.btn_refresh_stats.clicked.connect(lambda: self._load_statistics(force=True))
+        refresh_layout.addWidget(self.btn_refresh_stats)
+        layout.addLayout(refresh_layout)
+        
         # 分野別正答率
         chart_group = QGroupBox("分野別正答率")
         chart_layout = QVBoxLayout()
@@ -327,24 +393,6 @@ class AdminPanel(QWidget):
         ])
         self.category_stats_table.setMaximumHeight(300)
         
-        try:
-            categories = self.data_manager.get_categories()
-            self.category_stats_table.setRowCount(len(categories))
-            
-            for idx, cat in enumerate(categories):
-                cat_stats = self.data_manager.get_category_statistics(cat.id)
-                
-                self.category_stats_table.setItem(idx, 0, QTableWidgetItem(cat.name))
-                self.category_stats_table.setItem(idx, 1, 
-                    QTableWidgetItem(str(cat_stats.get("total", 0))))
-                self.category_stats_table.setItem(idx, 2, 
-                    QTableWidgetItem(str(cat_stats.get("correct", 0))))
-                
-                rate_item = QTableWidgetItem(f"{cat_stats.get('rate', 0):.1f}%")
-                self.category_stats_table.setItem(idx, 3, rate_item)
-        except Exception as e:
-            print(f"分野別統計取得エラー: {e}")
-        
         chart_layout.addWidget(self.category_stats_table)
         chart_group.setLayout(chart_layout)
         layout.addWidget(chart_group)
@@ -354,6 +402,82 @@ class AdminPanel(QWidget):
         widget.setLayout(layout)
         return widget
     
+    def _load_statistics(self, force: bool = False):
+        """
+        統計情報をワーカースレッドで集計して表示
+        
+        集計から STATISTICS_CACHE_SECONDS 以内は集計し直さない（force=True で常に集計）。
+        統計タブの作成前は集計結果を破棄するだけにし、タブを開いたときに集計する。
+        """
+        if self.label_question_count is None:
+            self._statistics_cache = None
+            return
+        if self._statistics_cache is not None:
+            if force:
+                self._statistics_cache = None
+            elif time.monotonic() - self._statistics_cache[0] < STATISTICS_CACHE_SECONDS:
+                return
+        if self.tasks.is_running("statistics") and not force:
+            return
+        
+        self.btn_refresh_stats.setEnabled(False)
+        self.label_stats_updated.setText("集計中...")
+        self.tasks.start(
+            self._collect_statistics,
+            key="statistics",
+            on_success=self._on_statistics_loaded,
+            on_error=self._on_statistics_failed
+        )
+    
+    def _collect_statistics(self, context) -> Dict:
+        """統計タブの表示内容を集計（ワーカースレッドで実行）"""
+        stats = self.data_manager.get_statistics()
+        categories = self.data_manager.get_all_category_statistics()
+        context.raise_if_cancelled()
+        return {
+            "question_count": self.data_manager.get_question_count(),
+            "total_answers": stats.total_questions_answered if stats else 0,
+            "correct_count": stats.total_correct if stats else 0,
+            "correct_rate": stats.correct_rate if stats else 0.0,
+            "total_time_sec": stats.total_study_time_seconds if stats else 0,
+            "categories": categories,
+        }
+    
+    def _on_statistics_failed(self, error: Exception):
+        """集計の失敗を統計タブに表示（前回の集計結果はそのまま残す）"""
+        logger.error(f"統計情報取得エラー: {error}")
+        self.label_stats_updated.setText(f"集計に失敗しました: {error}")
+        self.btn_refresh_stats.setEnabled(True)
+    
+    def _on_statistics_loaded(self, result: Dict):
+        """集計結果を統計タブに反映"""
+        self._statistics_cache = (time.monotonic(), result)
+        self.label_stats_updated.setText(f"最終集計: {datetime.now():%H:%M:%S}")
+        self.btn_refresh_stats.setEnabled(True)
+        
+        self.label_question_count.setText(f"{result['question_count']}問")
+        self.label_total_answers.setText(f"{result['total_answers'] or 0}問")
+        self.label_correct_count.setText(f"{result['correct_count'] or 0}問")
+        self.label_correct_rate.setText(f"{result['correct_rate'] or 0.0:.1f}%")
+        
+        # 総学習時間（秒から時間へ変換）
+        total_time_sec = result["total_time_sec"] or 0
+        hours = total_time_sec // 3600
+        minutes = (total_time_sec % 3600) // 60
+        self.label_study_time.setText(f"{hours}時間 {minutes}分")
+        
+        categories = result["categories"]
+        self.category_stats_table.setRowCount(len(categories))
+        for idx, (name, cat_stats) in enumerate(categories):
+            self.category_stats_table.setItem(idx, 0, QTableWidgetItem(name))
+            self.category_stats_table.setItem(idx, 1,
+                QTableWidgetItem(str(cat_stats.get("total", 0))))
+            self.category_stats_table.setItem(idx, 2,
+                QTableWidgetItem(str(cat_stats.get("correct", 0))))
+            
+            rate_item = QTableWidgetItem(f"{cat_stats.get('rate', 0):.1f}%")
+            self.category_stats_table.setItem(idx, 3, rate_item)
+    
     def _create_settings_tab(self) -> QWidget:
         """設定タブ"""
         widget = QWidget()
@@ -461,39 +585,7 @@ class AdminPanel(QWidget):
         )
         if not file_path:
             return
-        
-        try:
-            questions_data = []
-            with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    questions_data.append({
-                        'year': int(row.get('year', 2024)),
-                        'season': row.get('season', '春'),
-                        'category': row.get('category', 'テクノロジ'),
-                        'question_number': int(row.get('question_number', 0)),
-                        'text': row.get('text', ''),
-                        'explanation': row.get('explanation', ''),
-                        'choices': [
-                            row.get('choice_a', ''),
-                            row.get('choice_b', ''),
-                            row.get('choice_c', ''),
-                            row.get('choice_d', '')
-                        ],
-                        'correct_answer': int(row.get('correct_answer', 1)),
-                        'difficulty': int(row.get('difficulty', 2))
-                    })
-            
-            count = self.data_manager.bulk_add_questions(questions_data)
-            self._load_initial_data()
-            self._apply_filters()
-            QMessageBox.information(
-                self, 
-                "インポート成功", 
-                f"{count}/{len(questions_data)}件の問題をインポートしました。"
-            )
-        except Exception as e:
-            QMessageBox.critical(self, "インポートエラー", f"エラーが発生しました:\n{str(e)}")
+        self._start_import(self._read_csv_file, file_path)
     
     def _import_json(self):
         """JSONインポート"""
@@ -502,24 +594,7 @@ class AdminPanel(QWidget):
         )
         if not file_path:
             return
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # リストまたは単一オブジェクト対応
-            questions_data = data if isinstance(data, list) else [data]
-            
-            count = self.data_manager.bulk_add_questions(questions_data)
-            self._load_initial_data()
-            self._apply_filters()
-            QMessageBox.information(
-                self, 
-                "インポート成功", 
-                f"{count}/{len(questions_data)}件の問題をインポートしました。"
-            )
-        except Exception as e:
-            QMessageBox.critical(self, "インポートエラー", f"エラーが発生しました:\n{str(e)}")
+        self._start_import(self._read_json_file, file_path)
     
     def _import_excel(self):
         """Excelインポート"""
@@ -528,143 +603,258 @@ class AdminPanel(QWidget):
         )
         if not file_path:
             return
-        
-        try:
-            import pandas as pd
-            df = pd.read_excel(file_path)
-            questions_data = df.to_dict('records')
-            
-            count = self.data_manager.bulk_add_questions(questions_data)
-            self._load_initial_data()
-            self._apply_filters()
+        self._start_import(self._read_excel_file, file_path)
+    
+    @staticmethod
+    def _read_csv_file(file_path: str) -> List[Dict]:
+        """CSVファイルを問題データに変換"""
+        questions_data = []
+        with open(file_path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                questions_data.append({
+                    'year': int(row.get('year', 2024)),
+                    'season': row.get('season', '春'),
+                    'category': row.get('category', 'テクノロジ'),
+                    'question_number': int(row.get('question_number', 0)),
+                    'text': row.get('text', ''),
+                    'explanation': row.get('explanation', ''),
+                    'choices': [
+                        row.get('choice_a', ''),
+                        row.get('choice_b', ''),
+                        row.get('choice_c', ''),
+                        row.get('choice_d', '')
+                    ],
+                    'correct_answer': int(row.get('correct_answer', 1)),
+                    'difficulty': int(row.get('difficulty', 2))
+                })
+        return questions_data
+    
+    @staticmethod
+    def _read_json_file(file_path: str) -> List[Dict]:
+        """JSONファイルを問題データに変換（リストまたは単一オブジェクト対応）"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else [data]
+    
+    @staticmethod
+    def _read_excel_file(file_path: str) -> List[Dict]:
+        """Excelファイルを問題データに変換（pandas が必要）"""
+        import pandas as pd
+        df = pd.read_excel(file_path)
+        return df.to_dict('records')
+    
+    def _start_import(self, reader, file_path: str):
+        """ファイルの読み込みとインポートをワーカースレッドで実行"""
+        self._set_import_running(True)
+        self.status_label.setText(f"インポート中: {Path(file_path).name}")
+        self._import_task = self.tasks.start(
+            self._run_import,
+            reader,
+            file_path,
+            on_success=self._on_import_finished,
+            on_error=self._on_import_failed,
+            on_progress=self._on_import_progress,
+            on_cancel=lambda: self.status_label.setText("インポートを中止しました"),
+            on_finished=lambda: self._set_import_running(False)
+        )
+    
+    def _run_import(self, context, reader, file_path: str) -> Dict:
+        """ファイルを読み込んで一括インポート（ワーカースレッドで実行）"""
+        context.report_progress(0, 0, "ファイルを読み込み中...")
+        questions_data = reader(file_path)
+        context.raise_if_cancelled()
+        return self._import_questions(context, questions_data)
+    
+    def _import_questions(self, context, questions_data: List[Dict]) -> Dict:
+        """
+        問題データを一括インポート（ワーカースレッドで実行）
+        
+        中止要求はバッチの境界で反映し、途中までの件数を返す。
+        """
+        result = self.data_manager.bulk_import_questions(
+            questions_data,
+            progress_callback=lambda done, total: context.report_progress(
+                done, total, f"インポート中... {done}/{total}件"
+            ),
+            should_cancel=lambda: context.cancelled
+        )
+        context.report_progress(len(questions_data), len(questions_data), "インポート完了")
+        return dict(result, total=len(questions_data), cancelled=context.cancelled)
+    
+    def _cancel_import(self):
+        """実行中のインポートを中止"""
+        if self._import_task is not None:
+            self._import_task.cancel()
+            self.btn_import_cancel.setEnabled(False)
+            self.status_label.setText("中止しています...")
+    
+    def _set_import_running(self, running: bool):
+        """インポート中は進捗バー・中止ボタンを表示し、インポートボタンを無効化"""
+        for button in self.import_buttons:
+            button.setEnabled(not running)
+        self.import_progress.setVisible(running)
+        self.import_progress.setRange(0, 0)
+        self.btn_import_cancel.setVisible(running)
+        self.btn_import_cancel.setEnabled(running)
+        if not running:
+            self._import_task = None
+    
+    def _on_import_progress(self, done: int, total: int, message: str):
+        """インポートの進捗を表示（全件数 0 は件数不明）"""
+        self.import_progress.setRange(0, total)
+        self.import_progress.setValue(done)
+        if message:
+            self.status_label.setText(message)
+    
+    def _on_import_finished(self, result: Dict):
+        """インポート完了（中止時は途中までの件数を表示）"""
+        self._refresh_question_views()
+        if result["cancelled"]:
+            self.status_label.setText("インポートを中止しました")
             QMessageBox.information(
-                self, 
-                "インポート成功", 
-                f"{count}/{len(questions_data)}件の問題をインポートしました。"
+                self,
+                "インポート中止",
+                f"インポートを中止しました。\n"
+                f"中止までに {result['added']}/{result['total']}件の問題をインポートしました。"
             )
-        except ImportError:
+            return
+        
+        self.status_label.setText(f"最終更新: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        QMessageBox.information(
+            self, 
+            "インポート成功", 
+            f"{result['added']}/{result['total']}件の問題をインポートしました。"
+        )
+    
+    def _on_import_failed(self, error: Exception):
+        """インポート失敗"""
+        self.status_label.setText("エラー: インポート失敗")
+        if isinstance(error, ImportError):
             QMessageBox.warning(
                 self, 
                 "ライブラリが見つかりません",
                 "pandasライブラリが必要です。\npip install pandas openpyxl を実行してください。"
             )
-        except Exception as e:
-            QMessageBox.critical(self, "インポートエラー", f"エラーが発生しました:\n{str(e)}")
+            return
+        QMessageBox.critical(self, "インポートエラー", f"エラーが発生しました:\n{str(error)}")
+    
+    def _refresh_question_views(self):
+        """問題の追加・削除後にフィルター・一覧・統計を読み込み直す（作成済みのタブのみ）"""
+        self._load_initial_data()
+        self._load_statistics(force=True)
     
     def _add_question(self):
         """問題追加"""
-        dialog = QuestionDialog(self, mode='add', data_manager=self.data_manager)
+        dialog = QuestionDialog(
+            self, mode='add', categories=self._categories, years=self._years
+        )
         if dialog.exec() == QDialog.Accepted:
             question_data = dialog.get_data()
-            result = self.data_manager.add_question(question_data)
-            if result:
-                QMessageBox.information(self, "成功", "問題を追加しました。")
-                self._load_initial_data()
-                self._apply_filters()
-            else:
-                QMessageBox.warning(self, "エラー", "問題の追加に失敗しました。")
+            self.tasks.start(
+                lambda context: self.data_manager.add_question(question_data) is not None,
+                on_success=self._on_question_added
+            )
+    
+    def _on_question_added(self, added: bool):
+        if added:
+            QMessageBox.information(self, "成功", "問題を追加しました。")
+            self._refresh_question_views()
+        else:
+            QMessageBox.warning(self, "エラー", "問題の追加に失敗しました。")
+    
+    def _selected_row(self) -> int:
+        """選択中の行番号（未選択の場合 -1）"""
+        index = self.questions_table.currentIndex()
+        return index.row() if index.isValid() else -1
     
     def _edit_question(self):
-        """問題編集"""
-        current_row = self.questions_table.currentRow()
+        """問題編集（選択肢まで読み込んでからダイアログを表示）"""
+        current_row = self._selected_row()
         if current_row < 0:
             QMessageBox.warning(self, "警告", "編集する問題を選択してください。")
             return
         
         # 選択された問題の情報を取得
-        if current_row < len(self.current_filtered_questions):
-            question = self.current_filtered_questions[current_row]
-            dialog = QuestionDialog(self, mode='edit', question=question, data_manager=self.data_manager)
-            if dialog.exec() == QDialog.Accepted:
-                QMessageBox.information(self, "成功", "問題を更新しました。")
-                self._apply_filters()
+        question_id = self.question_model.question_id(current_row)
+        if question_id is not None:
+            self.tasks.start(
+                lambda context: self.data_manager.get_questions_by_ids([question_id]),
+                key="edit_question",
+                on_success=self._open_edit_dialog
+            )
+    
+    def _open_edit_dialog(self, questions: list):
+        if not questions:
+            QMessageBox.warning(self, "エラー", "問題が見つかりません。")
+            return
+        question = questions[0]
+        dialog = QuestionDialog(
+            self, mode='edit', question=question, categories=self._categories, years=self._years
+        )
+        if dialog.exec() == QDialog.Accepted:
+            question_data = dialog.get_edit_data()
+            self.tasks.start(
+                lambda context: self.data_manager.update_question(question.id, question_data),
+                on_success=self._on_question_updated
+            )
+    
+    def _on_question_updated(self, updated: bool):
+        if updated:
+            QMessageBox.information(self, "成功", "問題を更新しました。")
+            self._apply_filters()
+        else:
+            QMessageBox.warning(self, "エラー", "問題の更新に失敗しました。")
     
     def _delete_question(self):
         """問題削除"""
-        current_row = self.questions_table.currentRow()
+        current_row = self._selected_row()
         if current_row < 0:
             QMessageBox.warning(self, "警告", "削除する問題を選択してください。")
             return
         
-        if current_row < len(self.current_filtered_questions):
-            question = self.current_filtered_questions[current_row]
+        question_id = self.question_model.question_id(current_row)
+        question = self.question_model.row_data(current_row)
+        if question_id is not None:
+            number = question["question_number"] if question else question_id
             reply = QMessageBox.question(
                 self,
                 "確認",
-                f"問題番号 {question.question_number} を削除してもよろしいですか？",
+                f"問題番号 {number} を削除してもよろしいですか？",
                 QMessageBox.Yes | QMessageBox.No
             )
             
             if reply == QMessageBox.Yes:
-                try:
-                    session = self.data_manager.db.get_session()
-                    q = session.query(type(question)).filter_by(id=question.id).first()
-                    if q:
-                        q.is_active = False
-                        session.commit()
-                    self.data_manager.db.close_session(session)
-                    QMessageBox.information(self, "成功", "問題を削除しました。")
-                    self._apply_filters()
-                except Exception as e:
-                    QMessageBox.critical(self, "エラー", f"削除に失敗しました: {e}")
+                self.tasks.start(
+                    lambda context: self.data_manager.deactivate_question(question_id),
+                    on_success=self._on_question_deleted,
+                    on_error=lambda e: QMessageBox.critical(self, "エラー", f"削除に失敗しました: {e}")
+                )
+    
+    def _on_question_deleted(self, deleted: bool):
+        if deleted:
+            QMessageBox.information(self, "成功", "問題を削除しました。")
+            self._refresh_question_views()
+        else:
+            QMessageBox.warning(self, "エラー", "削除に失敗しました。")
     
     def _apply_filters(self):
-        """フィルターを適用してテーブルを更新"""
-        try:
-            # フィルターのクリア
-            self.questions_table.setRowCount(0)
-            
-            category_id = self.combo_category.currentData() if self.combo_category else None
-            year_id = self.combo_year.currentData() if self.combo_year else None
-            
-            # フィルター条件を作成
-            category_ids = [category_id] if category_id else None
-            year_ids = [year_id] if year_id else None
-            
-            # 問題取得
-            questions = self.data_manager.get_questions(
-                category_ids=category_ids,
-                year_ids=year_ids,
-                limit=1000
-            )
-            
-            self.current_filtered_questions = questions
-            
-            # テーブルに追加
-            self.questions_table.setRowCount(len(questions))
-            
-            for row, question in enumerate(questions):
-                # 問題番号
-                self.questions_table.setItem(row, 0, QTableWidgetItem(str(question.question_number)))
-                
-                # 年度
-                year_text = f"{question.year.year}"
-                if question.year.season:
-                    year_text += f" {question.year.season}"
-                self.questions_table.setItem(row, 1, QTableWidgetItem(year_text))
-                
-                # 分野
-                self.questions_table.setItem(row, 2, QTableWidgetItem(question.category.name))
-                
-                # 問題文（最初50字）
-                text_preview = question.text[:50] + "..." if len(question.text) > 50 else question.text
-                self.questions_table.setItem(row, 3, QTableWidgetItem(text_preview))
-                
-                # 難易度
-                difficulty_item = QTableWidgetItem(str(question.difficulty))
-                self.questions_table.setItem(row, 4, difficulty_item)
-                
-                # 操作ボタン
-                btn_edit = QPushButton("編集")
-                btn_edit.clicked.connect(lambda checked, r=row: self._on_edit_button_clicked(r))
-                self.questions_table.setCellWidget(row, 5, btn_edit)
+        """フィルター・検索語を適用してテーブルを読み込み直す（問題はワーカースレッドで取得）"""
+        category_id = self.combo_category.currentData() if self.combo_category else None
+        year_id = self.combo_year.currentData() if self.combo_year else None
         
-        except Exception as e:
-            print(f"フィルター適用エラー: {e}")
+        # フィルター条件を作成
+        category_ids = [category_id] if category_id else None
+        year_ids = [year_id] if year_id else None
+        
+        if self.question_model is None:
+            return
+        self._search_timer.stop()
+        self.question_model.set_filters(category_ids, year_ids, self.search_edit.text())
     
     def _on_edit_button_clicked(self, row):
-        """テーブルのeditボタンクリック処理"""
-        self.questions_table.setCurrentRow(row)
+        """テーブルの編集ボタンクリック処理"""
+        self.questions_table.selectRow(row)
         self._edit_question()
     
     def _initialize_scheduler_ui(self):
@@ -799,66 +989,79 @@ class AdminPanel(QWidget):
     
     def _load_sample_data(self):
         """サンプルデータをロード（春 + 秋 の10問）"""
-        try:
-            # どのサンプルデータをロードするか選択
-            reply = QMessageBox.question(
-                self,
-                "確認",
-                "ロードするサンプルデータを選択してください:\n\n"
-                "Yes: 両方ロード (春 5問 + 秋 5問 = 合計 10問)\n"
-                "No: 追加データのみロード (秋 5問)",
-                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel
-            )
-            
-            if reply == QMessageBox.Cancel:
-                return
-            
-            self.status_label.setText("サンプルデータをロード中...")
-            self._add_log("⏳ サンプルデータをロードしています...")
-            
-            total_added = 0
-            
-            # 春データをロード（Yes の場合と初回両方）
-            if reply == QMessageBox.Yes:
-                spring_file = Path(__file__).parent.parent.parent / "resources" / "sample_data" / "sample_questions_2024_spring.json"
-                if spring_file.exists():
-                    with open(spring_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    questions = data.get('questions', [])
-                    count = self.data_manager.bulk_add_questions(questions)
-                    total_added += count
-                    self._add_log(f"✅ 2024年春: {count}件追加")
-            
-            # 秋データをロード
-            autumn_file = Path(__file__).parent.parent.parent / "resources" / "sample_data" / "sample_questions_2024_autumn.json"
-            if autumn_file.exists():
-                with open(autumn_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                questions = data.get('questions', [])
-                count = self.data_manager.bulk_add_questions(questions)
-                total_added += count
-                self._add_log(f"✅ 2024年秋: {count}件追加")
-            
-            self.status_label.setText(f"最終更新: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            self._add_log(f"✅ サンプルデータロード完了: 合計 {total_added}件")
-            
-            QMessageBox.information(
-                self,
-                "成功",
-                f"{total_added}件のサンプル問題をデータベースに追加しました。\n\n"
-                "💡 より多くの問題が必要な場合:\n"
-                "  • CSVやJSONファイルをインポート\n"
-                "  • 公式サイトから問題を取得:\n"
-                "    https://www.itpassportsiken.com/kakomon/"
-            )
-            
-            self._load_initial_data()
-            self._apply_filters()
+        # どのサンプルデータをロードするか選択
+        reply = QMessageBox.question(
+            self,
+            "確認",
+            "ロードするサンプルデータを選択してください:\n\n"
+            "Yes: 両方ロード (春 5問 + 秋 5問 = 合計 10問)\n"
+            "No: 追加データのみロード (秋 5問)",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel
+        )
         
-        except Exception as e:
-            QMessageBox.critical(self, "エラー", f"サンプルデータロード中にエラーが発生しました:\n{str(e)}")
-            self._add_log(f"❌ エラー: {str(e)}")
-            self.status_label.setText("エラー: ロード失敗")
+        if reply == QMessageBox.Cancel:
+            return
+        
+        sample_dir = Path(__file__).parent.parent.parent / "resources" / "sample_data"
+        samples = []
+        # 春データをロード（Yes の場合と初回両方）
+        if reply == QMessageBox.Yes:
+            samples.append(("2024年春", sample_dir / "sample_questions_2024_spring.json"))
+        # 秋データをロード
+        samples.append(("2024年秋", sample_dir / "sample_questions_2024_autumn.json"))
+        
+        self.status_label.setText("サンプルデータをロード中...")
+        self._add_log("⏳ サンプルデータをロードしています...")
+        self._set_import_running(True)
+        self._import_task = self.tasks.start(
+            self._run_sample_import,
+            samples,
+            on_success=self._on_sample_data_loaded,
+            on_error=self._on_sample_data_failed,
+            on_progress=self._on_import_progress,
+            on_finished=lambda: self._set_import_running(False)
+        )
+    
+    def _run_sample_import(self, context, samples: list) -> list:
+        """サンプルファイルを順にインポート（ワーカースレッドで実行）"""
+        loaded = []
+        for label, sample_file in samples:
+            if context.cancelled:
+                break
+            if not sample_file.exists():
+                continue
+            with open(sample_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            result = self._import_questions(context, data.get('questions', []))
+            loaded.append((label, result["added"]))
+        return loaded
+    
+    def _on_sample_data_loaded(self, loaded: list):
+        """サンプルデータのロード完了"""
+        total_added = 0
+        for label, count in loaded:
+            total_added += count
+            self._add_log(f"✅ {label}: {count}件追加")
+        
+        self.status_label.setText(f"最終更新: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        self._add_log(f"✅ サンプルデータロード完了: 合計 {total_added}件")
+        
+        QMessageBox.information(
+            self,
+            "成功",
+            f"{total_added}件のサンプル問題をデータベースに追加しました。\n\n"
+            "💡 より多くの問題が必要な場合:\n"
+            "  • CSVやJSONファイルをインポート\n"
+            "  • 公式サイトから問題を取得:\n"
+            "    https://www.itpassportsiken.com/kakomon/"
+        )
+        
+        self._refresh_question_views()
+    
+    def _on_sample_data_failed(self, error: Exception):
+        QMessageBox.critical(self, "エラー", f"サンプルデータロード中にエラーが発生しました:\n{str(error)}")
+        self._add_log(f"❌ エラー: {str(error)}")
+        self.status_label.setText("エラー: ロード失敗")
 
 
 
@@ -868,11 +1071,13 @@ class AdminPanel(QWidget):
 class QuestionDialog(QDialog):
     """問題追加/編集ダイアログ"""
     
-    def __init__(self, parent=None, mode='add', question=None, data_manager=None):
+    def __init__(self, parent=None, mode='add', question=None, categories=(), years=()):
         super().__init__(parent)
         self.mode = mode
         self.question = question
-        self.data_manager = data_manager
+        # 分野・年度の一覧は管理パネルが読み込み済みのものを使う（GUI スレッドで DB に触れない）
+        self.categories = categories
+        self.years = years
         self.setWindowTitle("問題" + ("追加" if mode == 'add' else "編集"))
         self.setGeometry(100, 100, 600, 500)
         self._setup_ui()
@@ -890,15 +1095,11 @@ class QuestionDialog(QDialog):
         
         # 年度
         self.combo_year = QComboBox()
-        try:
-            years = self.data_manager.get_years()
-            for year in years:
-                year_text = f"{year.year}"
-                if year.season:
-                    year_text += f" {year.season}"
-                self.combo_year.addItem(year_text, year.id)
-        except:
-            pass
+        for year in self.years:
+            year_text = f"{year.year}"
+            if year.season:
+                year_text += f" {year.season}"
+            self.combo_year.addItem(year_text, year.id)
         if self.question and self.mode == 'edit':
             for i in range(self.combo_year.count()):
                 if self.combo_year.itemData(i) == self.question.year_id:
@@ -908,12 +1109,8 @@ class QuestionDialog(QDialog):
         
         # 分野
         self.combo_category = QComboBox()
-        try:
-            categories = self.data_manager.get_categories()
-            for cat in categories:
-                self.combo_category.addItem(cat.name, cat.id)
-        except:
-            pass
+        for cat in self.categories:
+            self.combo_category.addItem(cat.name, cat.id)
         if self.question and self.mode == 'edit':
             for i in range(self.combo_category.count()):
                 if self.combo_category.itemData(i) == self.question.category_id:
@@ -946,7 +1143,7 @@ class QuestionDialog(QDialog):
         # 選択肢
         self.line_choices = []
         if self.question and self.mode == 'edit':
-            for i, choice in enumerate(self.question.choices):
+            for i, choice in enumerate(self._sorted_choices()):
                 line = QLineEdit()
                 line.setText(choice.text)
                 self.line_choices.append(line)
@@ -962,7 +1159,7 @@ class QuestionDialog(QDialog):
         self.spin_correct.setMinimum(1)
         self.spin_correct.setMaximum(4)
         if self.question and self.mode == 'edit':
-            for i, choice in enumerate(self.question.choices):
+            for i, choice in enumerate(self._sorted_choices()):
                 if choice.is_correct:
                     self.spin_correct.setValue(i + 1)
                     break
@@ -996,6 +1193,23 @@ class QuestionDialog(QDialog):
         
         self.setLayout(layout)
     
+    def _sorted_choices(self) -> list:
+        """編集対象の選択肢（選択肢番号順）"""
+        return sorted(self.question.choices, key=lambda c: c.choice_number or 0)
+    
+    def get_edit_data(self) -> Dict:
+        """編集後の内容（DataManager.update_question 形式、分野・年度は ID で指定）"""
+        return {
+            'year_id': self.combo_year.currentData(),
+            'category_id': self.combo_category.currentData(),
+            'question_number': self.spin_number.value(),
+            'text': self.text_question.toPlainText(),
+            'explanation': self.text_explanation.toPlainText(),
+            'choices': [line.text() for line in self.line_choices],
+            'correct_answer': self.spin_correct.value(),
+            'difficulty': self.spin_difficulty.value()
+        }
+    
     def get_data(self) -> Dict:
         """フォームからデータを取得"""
         return {
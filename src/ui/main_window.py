@@ -158,6 +158,11 @@ class MainWindow(QMainWindow):
         dashboard.setLayout(layout)
         return dashboard
     
+    def closeEvent(self, event):
+        """終了時にクイズ画面を閉じる（出題エンジンのワーカーを停止）"""
+        self.quiz_widget.close()
+        super().closeEvent(event)
+    
     def _start_quiz(self, mode: str):
         """クイズ開始"""
         self.quiz_widget.initialize(mode)
@@ -0,0 +1,384 @@
+"""
+問題一覧テーブルモデル
+問題を ID 順のキーセット方式でページ単位に読み込み、表示中付近のページのみ保持する
+"""
+
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from PySide6.QtCore import (
+    QAbstractTableModel, QEvent, QModelIndex, QPersistentModelIndex, Qt, Signal
+)
+from PySide6.QtWidgets import (
+    QApplication, QSpinBox, QStyle, QStyledItemDelegate, QStyleOptionButton
+)
+
+from src.utils.data_manager import DataManager
+from src.ui.tasks import TaskRunner
+
+# 1回の読み込み件数
+QUESTION_TABLE_PAGE_SIZE = 200
+
+# 内容を保持するページ数（それ以外のページは ID のみ保持し、表示時に読み込み直す）
+QUESTION_TABLE_MAX_CACHED_PAGES = 10
+
+# 読み込み中のセルに表示する文字列
+QUESTION_TABLE_PLACEHOLDER = "…"
+
+
+class QuestionTableModel(QAbstractTableModel):
+    """
+    問題一覧のモデル（QTableView 用）
+    
+    canFetchMore / fetchMore で末尾の ID より後ろを1ページずつ読み込む（読み込みはワーカースレッド）。
+    読み込み済みの行は ID のみ配列で保持し、内容は最近表示したページだけを残す。
+    追い出したページは直前の行の ID を起点に読み込み直す。
+    検索語を指定した場合は DataManager.search の結果（関連度順・件数上限あり）を一度に表示し、
+    問題文の列には一致箇所の抜粋を表示する。
+    """
+    
+    COLUMNS = [
+        ("question_number", "問題番号"),
+        ("year", "年度"),
+        ("category", "分野"),
+        ("text", "問題文 (最初50字)"),
+        ("difficulty", "難易度"),
+        (None, "操作"),
+    ]
+    DIFFICULTY_COLUMN = 4
+    ACTION_COLUMN = 5
+    
+    # 編集が失敗した場合（メッセージ）
+    edit_failed = Signal(str)
+    
+    def __init__(
+        self,
+        data_manager: DataManager,
+        tasks: TaskRunner,
+        parent=None,
+        page_size: int = QUESTION_TABLE_PAGE_SIZE,
+        max_cached_pages: int = QUESTION_TABLE_MAX_CACHED_PAGES
+    ):
+        super().__init__(parent)
+        self.dm = data_manager
+        self.tasks = tasks
+        self.page_size = page_size
+        self.max_cached_pages = max_cached_pages
+        self.category_ids: Optional[List[int]] = None
+        self.year_ids: Optional[List[int]] = None
+        self.search_query = ""
+        
+        self._ids = array('q')
+        self._pages: "OrderedDict[int, List[Optional[Dict]]]" = OrderedDict()
+        self._loading_pages = set()
+        self._exhausted = True
+        self._fetching = False
+        self._generation = 0
+    
+    # ========================
+    # 条件・行の参照
+    # ========================
+    
+    def set_filters(
+        self,
+        category_ids: List[int] = None,
+        year_ids: List[int] = None,
+        search_query: str = ""
+    ):
+        """絞り込み条件・検索語を設定し、先頭から読み込み直す"""
+        self.category_ids = category_ids
+        self.year_ids = year_ids
+        self.search_query = search_query.strip()
+        self.reload()
+    
+    def reload(self):
+        """読み込み済みの行を破棄して先頭から読み込み直す（問題の追加・削除後など）"""
+        self.beginResetModel()
+        self._generation += 1
+        self._ids = array('q')
+        self._pages.clear()
+        self._loading_pages.clear()
+        self._exhausted = False
+        self._fetching = False
+        self.endResetModel()
+        if self.search_query:
+            self._search()
+        else:
+            self.fetchMore(QModelIndex())
+    
+    def question_id(self, row: int) -> Optional[int]:
+        """行の問題ID"""
+        if 0 <= row < len(self._ids):
+            return self._ids[row]
+        return None
+    
+    def row_data(self, row: int) -> Optional[Dict]:
+        """行の内容（get_question_summaries の1件、未読み込みの場合 None）"""
+        if not 0 <= row < len(self._ids):
+            return None
+        page = self._pages.get(row // self.page_size)
+        if page is None:
+            return None
+        return page[row % self.page_size]
+    
+    # ========================
+    # QAbstractTableModel
+    # ========================
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._ids)
+    
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section][1]
+        return super().headerData(section, orientation, role)
+    
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.column() == self.DIFFICULTY_COLUMN:
+            flags |= Qt.ItemIsEditable
+        return flags
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role == Qt.UserRole:
+            return self.question_id(row)
+        if role == Qt.TextAlignmentRole and column == self.DIFFICULTY_COLUMN:
+            return int(Qt.AlignCenter)
+        if role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        
+        key = self.COLUMNS[column][0]
+        if key is None:
+            return "編集"
+        row_data = self._row_for_display(row)
+        if row_data is None:
+            return QUESTION_TABLE_PLACEHOLDER
+        if role == Qt.EditRole:
+            return row_data[key]
+        if key == "year":
+            return f"{row_data['year']}" + (f" {row_data['season']}" if row_data["season"] else "")
+        if key == "text":
+            if row_data.get("snippet"):
+                return row_data["snippet"]
+            text = row_data["text"] or ""
+            return text[:50] + "..." if len(text) > 50 else text
+        return str(row_data[key]) if row_data[key] is not None else ""
+    
+    def setData(self, index, value, role=Qt.EditRole) -> bool:
+        """難易度の編集（画面は即時更新し、保存はワーカースレッドで行う。失敗時は元に戻す）"""
+        if role != Qt.EditRole or index.column() != self.DIFFICULTY_COLUMN:
+            return False
+        row_data = self.row_data(index.row())
+        if row_data is None or row_data["difficulty"] == value:
+            return False
+        
+        previous = row_data["difficulty"]
+        row_data["difficulty"] = value
+        self.dataChanged.emit(index, index)
+        
+        question_id = row_data["id"]
+        persistent = QPersistentModelIndex(index)
+        self.tasks.start(
+            lambda context: self.dm.update_question(question_id, {"difficulty": value}),
+            on_success=lambda ok: None if ok else self._revert_difficulty(persistent, row_data, previous),
+            on_error=lambda e: self._revert_difficulty(persistent, row_data, previous)
+        )
+        return True
+    
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted and not self._fetching
+    
+    def fetchMore(self, parent=QModelIndex()):
+        """末尾の次のページをワーカースレッドで読み込む"""
+        if not self.canFetchMore(parent):
+            return
+        self._fetching = True
+        after_id = self._ids[-1] if self._ids else None
+        generation = self._generation
+        fetch = self._fetcher(after_id, self.page_size)
+        self.tasks.start(
+            lambda context: fetch(),
+            key="question_table_fetch",
+            on_success=lambda rows: self._append_rows(generation, rows),
+            on_error=lambda e: self._end_fetch(generation)
+        )
+    
+    # ========================
+    # 内部処理
+    # ========================
+    
+    def _search(self):
+        """検索語に一致する問題をワーカースレッドで検索（結果は1回で全件追加し、続きは読み込まない）"""
+        self._fetching = True
+        generation = self._generation
+        query, category_ids, year_ids = self.search_query, self.category_ids, self.year_ids
+        self.tasks.start(
+            lambda context: self.dm.search(query, category_ids, year_ids),
+            key="question_table_fetch",
+            on_success=lambda rows: self._append_rows(generation, rows, exhausted=True),
+            on_error=lambda e: self._end_fetch(generation)
+        )
+    
+    def _fetcher(self, after_id: Optional[int], limit: int):
+        """現在の条件で1ページ分を取得する関数（ワーカースレッドで呼び出す）"""
+        category_ids, year_ids = self.category_ids, self.year_ids
+        return lambda: self.dm.get_question_summaries(
+            category_ids=category_ids,
+            year_ids=year_ids,
+            limit=limit,
+            after_id=after_id
+        )
+    
+    def _end_fetch(self, generation: int):
+        if generation == self._generation:
+            self._fetching = False
+    
+    def _append_rows(self, generation: int, rows: List[Dict], exhausted: bool = False):
+        """末尾に読み込んだ行を追加"""
+        if generation != self._generation:
+            return
+        self._fetching = False
+        if exhausted or len(rows) < self.page_size:
+            self._exhausted = True
+        if not rows:
+            return
+        
+        first = len(self._ids)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._ids.extend(row["id"] for row in rows)
+        # 末尾のページは部分的に埋まっている場合があるため、ページ単位に振り分ける
+        for offset, row in enumerate(rows):
+            position = first + offset
+            page = self._pages.get(position // self.page_size)
+            if page is None:
+                page = [None] * self.page_size
+                self._store_page(position // self.page_size, page)
+            page[position % self.page_size] = row
+        self.endInsertRows()
+    
+    def _row_for_display(self, row: int) -> Optional[Dict]:
+        """表示する行の内容（ページが追い出されていれば読み込みを開始して None）"""
+        page_number = row // self.page_size
+        page = self._pages.get(page_number)
+        row_data = page[row % self.page_size] if page is not None else None
+        if row_data is None:
+            self._request_page(page_number)
+            return None
+        self._pages.move_to_end(page_number)
+        return row_data
+    
+    def _request_page(self, page_number: int):
+        """追い出したページを直前の行の ID を起点に読み込み直す"""
+        if page_number in self._loading_pages:
+            return
+        self._loading_pages.add(page_number)
+        start = page_number * self.page_size
+        end = min(start + self.page_size, len(self._ids))
+        after_id = self._ids[start - 1] if start else None
+        generation = self._generation
+        fetch = self._fetcher(after_id, end - start)
+        self.tasks.start(
+            lambda context: fetch(),
+            key=f"question_table_page_{page_number}",
+            on_success=lambda rows: self._restore_page(generation, page_number, rows),
+            on_error=lambda e: self._loading_pages.discard(page_number)
+        )
+    
+    def _restore_page(self, generation: int, page_number: int, rows: List[Dict]):
+        """読み込み直したページを反映（その間に無効化された問題は削除済みと表示）"""
+        if generation != self._generation:
+            return
+        self._loading_pages.discard(page_number)
+        start = page_number * self.page_size
+        end = min(start + self.page_size, len(self._ids))
+        by_id = {row["id"]: row for row in rows}
+        page = [
+            by_id.get(self._ids[position]) or self._removed_row(self._ids[position])
+            for position in range(start, end)
+        ]
+        page += [None] * (self.page_size - len(page))
+        self._store_page(page_number, page)
+        self.dataChanged.emit(self.index(start, 0), self.index(end - 1, len(self.COLUMNS) - 1))
+    
+    @staticmethod
+    def _removed_row(question_id: int) -> Dict:
+        return {
+            "id": question_id, "question_number": None, "year": "", "season": None,
+            "category": "", "text": "(削除済み)", "difficulty": None,
+        }
+    
+    def _store_page(self, page_number: int, page: List[Optional[Dict]]):
+        """ページを保持（上限を超えたら最も長く表示していないページを追い出す）"""
+        self._pages[page_number] = page
+        self._pages.move_to_end(page_number)
+        # 検索結果は ID 順ではなくキーセットで読み込み直せないため追い出さない（件数は上限あり）
+        while len(self._pages) > self.max_cached_pages and not self.search_query:
+            self._pages.popitem(last=False)
+    
+    def _revert_difficulty(self, index: QPersistentModelIndex, row_data: Dict, previous: int):
+        """難易度の保存に失敗した場合に表示を元に戻す"""
+        row_data["difficulty"] = previous
+        if index.isValid():
+            self.dataChanged.emit(QModelIndex(index), QModelIndex(index))
+        self.edit_failed.emit("難易度の更新に失敗しました。")
+
+
+class QuestionTableDelegate(QStyledItemDelegate):
+    """
+    問題一覧のデリゲート
+    
+    難易度は QSpinBox で直接編集し、操作列は行ごとのウィジェットを作らずにボタンを描画する。
+    """
+    
+    edit_requested = Signal(int)  # 行番号
+    
+    def createEditor(self, parent, option, index):
+        if index.column() == QuestionTableModel.DIFFICULTY_COLUMN:
+            editor = QSpinBox(parent)
+            editor.setRange(1, 5)
+            editor.setFrame(False)
+            return editor
+        return super().createEditor(parent, option, index)
+    
+    def setEditorData(self, editor, index):
+        if isinstance(editor, QSpinBox):
+            value = index.data(Qt.EditRole)
+            editor.setValue(value if isinstance(value, int) else 1)
+            return
+        super().setEditorData(editor, index)
+    
+    def setModelData(self, editor, model, index):
+        if isinstance(editor, QSpinBox):
+            editor.interpretText()
+            model.setData(index, editor.value(), Qt.EditRole)
+            return
+        super().setModelData(editor, model, index)
+    
+    def paint(self, painter, option, index):
+        if index.column() != QuestionTableModel.ACTION_COLUMN:
+            super().paint(painter, option, index)
+            return
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(4, 2, -4, -2)
+        button.text = index.data(Qt.DisplayRole)
+        button.state = QStyle.State_Enabled
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, button, painter, option.widget)
+    
+    def editorEvent(self, event, model, option, index):
+        if (
+            index.column() == QuestionTableModel.ACTION_COLUMN
+            and event.type() == QEvent.MouseButtonRelease
+            and event.button() == Qt.LeftButton
+            and option.rect.contains(event.position().toPoint())
+        ):
+            self.edit_requested.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
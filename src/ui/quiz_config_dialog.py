@@ -2,17 +2,22 @@
 クイズ設定ダイアログ - 出題モード・フィルター選択
 """
 
+from datetime import datetime
+
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QSpinBox,
     QCheckBox, QGroupBox, QMessageBox, QScrollArea, QWidget
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QTimer
 from PySide6.QtGui import QFont, QIcon, QPixmap, QPainter, QColor
 
 from src.ui.styles import COLOR_PRIMARY, COLOR_TEXT_PRIMARY, COLOR_ACCENT, PADDING_MEDIUM
 from src.utils.data_manager import get_data_manager
 from src.core import QuizMode
 
+# 設定変更からこの時間操作がなければ出題セットの先読みを要求（ミリ秒）
+CONFIG_PREFETCH_DELAY_MS = 300
+
 
 def create_checkbox_icon(checked: bool, size: int = 20) -> QIcon:
     """チェックボックス用アイコンを生成"""
@@ -45,6 +50,7 @@ class QuizConfigDialog(QDialog):
     """クイズ設定ダイアログ"""
     
     quiz_started = Signal(str, dict)  # (mode, config)
+    config_changed = Signal(str, dict)  # (mode, config) 先読み用（操作が落ち着いてから通知）
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -53,6 +59,11 @@ class QuizConfigDialog(QDialog):
         self.setMinimumHeight(600)
         self.dm = get_data_manager()
         
+        self._config_timer = QTimer(self)
+        self._config_timer.setSingleShot(True)
+        self._config_timer.setInterval(CONFIG_PREFETCH_DELAY_MS)
+        self._config_timer.timeout.connect(self._emit_config_changed)
+        
         self._setup_ui()
     
     def _setup_ui(self):
@@ -76,8 +87,10 @@ class QuizConfigDialog(QDialog):
             (QuizMode.RANDOM.value, "🎲 ランダム", "ランダムに問題が出題されます"),
             (QuizMode.BY_YEAR.value, "📅 年度別", "特定年度の問題を出題します"),
             (QuizMode.BY_CATEGORY.value, "🏆 分野別", "特定分野の問題を出題します"),
-            (QuizMode.REVIEW.value, "🔄 復習モード", "正答率が低い問題を優先出題します"),
-            (QuizMode.MOCK_TEST.value, "📋 模擬試験", "100問の模擬試験を実施します")
+            (QuizMode.REVIEW.value, "🔄 復習モード", "復習時期が来た問題を優先出題します"),
+            (QuizMode.WEAKNESS.value, "🎯 弱点強化", "苦手な問題を中心に未回答の問題も混ぜて出題します"),
+            (QuizMode.ADAPTIVE.value, "📈 適応型", "回答に合わせて実力に近い難しさの問題を出題します"),
+            (QuizMode.MOCK_TEST.value, "📋 模擬試験", "本試験と同じ分野配分で100問の模擬試験を実施します")
         ]
         
         for mode_key, mode_label, mode_desc in modes:
@@ -106,10 +119,32 @@ class QuizConfigDialog(QDialog):
         self.spin_count.setMinimum(1)
         self.spin_count.setMaximum(100)
         self.spin_count.setValue(10)
+        self.spin_count.valueChanged.connect(self._update_candidate_count)
         count_layout.addWidget(self.spin_count)
         count_layout.addStretch()
         filter_layout.addLayout(count_layout)
         
+        # 難易度
+        difficulty_layout = QHBoxLayout()
+        difficulty_layout.addWidget(QLabel("難易度:"))
+        self.spin_difficulty_min = QSpinBox()
+        self.spin_difficulty_min.setRange(1, 5)
+        self.spin_difficulty_min.setValue(1)
+        difficulty_layout.addWidget(self.spin_difficulty_min)
+        difficulty_layout.addWidget(QLabel("〜"))
+        self.spin_difficulty_max = QSpinBox()
+        self.spin_difficulty_max.setRange(1, 5)
+        self.spin_difficulty_max.setValue(5)
+        difficulty_layout.addWidget(self.spin_difficulty_max)
+        difficulty_layout.addStretch()
+        filter_layout.addLayout(difficulty_layout)
+        
+        # 最小 > 最大 にならないよう相互に範囲を制限
+        self.spin_difficulty_min.valueChanged.connect(self.spin_difficulty_max.setMinimum)
+        self.spin_difficulty_max.valueChanged.connect(self.spin_difficulty_min.setMaximum)
+        self.spin_difficulty_min.valueChanged.connect(self._update_candidate_count)
+        self.spin_difficulty_max.valueChanged.connect(self._update_candidate_count)
+        
         filter_layout.addSpacing(10)
         
         # 年度選択
@@ -143,6 +178,7 @@ class QuizConfigDialog(QDialog):
             checkbox.stateChanged.connect(
                 lambda state, cb=checkbox: cb.setIcon(create_checkbox_icon(cb.isChecked()))
             )
+            checkbox.stateChanged.connect(self._update_candidate_count)
             year_inner_layout.addWidget(checkbox)
             self.year_checkboxes[year.id] = checkbox
         
@@ -185,6 +221,7 @@ class QuizConfigDialog(QDialog):
             checkbox.stateChanged.connect(
                 lambda state, cb=checkbox: cb.setIcon(create_checkbox_icon(cb.isChecked()))
             )
+            checkbox.stateChanged.connect(self._update_candidate_count)
             category_inner_layout.addWidget(checkbox)
             self.category_checkboxes[category.id] = checkbox
         
@@ -193,6 +230,11 @@ class QuizConfigDialog(QDialog):
         category_scroll.setMaximumHeight(120)
         filter_layout.addWidget(category_scroll)
         
+        # 該当問題数（候補数キャッシュから取得）
+        self.label_candidate_count = QLabel()
+        self.label_candidate_count.setStyleSheet(f"color: {COLOR_TEXT_PRIMARY};")
+        filter_layout.addWidget(self.label_candidate_count)
+        
         filter_group.setLayout(filter_layout)
         layout.addWidget(filter_group)
         
@@ -214,6 +256,7 @@ class QuizConfigDialog(QDialog):
         layout.addLayout(button_layout)
         
         self.setLayout(layout)
+        self._update_candidate_count()
     
     def _select_mode(self, mode: str):
         """モード選択"""
@@ -223,18 +266,84 @@ class QuizConfigDialog(QDialog):
         # 選択したボタンをチェック
         self.mode_buttons[mode].setChecked(True)
         self.selected_mode = mode
+        self._update_candidate_count()
     
-    def _start_quiz(self):
-        """クイズ開始"""
-        # フィルター情報を収集
-        selected_years = [
+    def _selected_years(self) -> list:
+        """選択中の年度ID"""
+        return [
             year_id for year_id, checkbox in self.year_checkboxes.items()
             if checkbox.isChecked()
         ]
-        selected_categories = [
+    
+    def _selected_categories(self) -> list:
+        """選択中の分野ID"""
+        return [
             cat_id for cat_id, checkbox in self.category_checkboxes.items()
             if checkbox.isChecked()
         ]
+    
+    def _difficulty_range(self) -> tuple:
+        """選択中の難易度範囲"""
+        return (self.spin_difficulty_min.value(), self.spin_difficulty_max.value())
+    
+    def _update_candidate_count(self, *args):
+        """選択中の条件に合う問題数を表示"""
+        if not hasattr(self, "label_candidate_count"):
+            return
+        
+        # 各モードが実際に使うフィルターのみで数える
+        year_ids = None
+        category_ids = None
+        if self.selected_mode in (
+            QuizMode.RANDOM.value, QuizMode.BY_YEAR.value,
+            QuizMode.WEAKNESS.value, QuizMode.ADAPTIVE.value
+        ):
+            year_ids = self._selected_years()
+        if self.selected_mode in (
+            QuizMode.RANDOM.value, QuizMode.BY_CATEGORY.value, QuizMode.REVIEW.value,
+            QuizMode.WEAKNESS.value, QuizMode.ADAPTIVE.value
+        ):
+            category_ids = self._selected_categories()
+        
+        if year_ids == [] or category_ids == []:
+            count = 0
+        elif self.selected_mode == QuizMode.REVIEW.value:
+            # 復習モードは復習期限が来た問題を数える
+            count = self.dm.count_review_questions(
+                category_ids=category_ids,
+                difficulty_range=self._difficulty_range(),
+                due_before=datetime.utcnow()
+            )
+        else:
+            count = self.dm.count_candidate_questions(
+                category_ids=category_ids,
+                year_ids=year_ids,
+                difficulty_range=self._difficulty_range()
+            )
+        self.label_candidate_count.setText(f"該当問題数: {count}問")
+        if count > 0:
+            self._config_timer.start()
+        else:
+            self._config_timer.stop()
+    
+    def current_config(self) -> dict:
+        """選択中の設定（quiz_started で通知する内容と同じ）"""
+        return {
+            "mode": self.selected_mode,
+            "question_count": self.spin_count.value(),
+            "year_ids": self._selected_years(),
+            "category_ids": self._selected_categories(),
+            "difficulty_range": self._difficulty_range()
+        }
+    
+    def _emit_config_changed(self):
+        self.config_changed.emit(self.selected_mode, self.current_config())
+    
+    def _start_quiz(self):
+        """クイズ開始"""
+        # フィルター情報を収集
+        selected_years = self._selected_years()
+        selected_categories = self._selected_categories()
         
         if not selected_years and self.selected_mode != QuizMode.REVIEW.value:
             QMessageBox.warning(self, "エラー", "年度を選択してください")
@@ -244,13 +353,9 @@ class QuizConfigDialog(QDialog):
             QMessageBox.warning(self, "エラー", "分野を選択してください")
             return
         
-        config = {
-            "mode": self.selected_mode,
-            "question_count": self.spin_count.value(),
-            "year_ids": selected_years,
-            "category_ids": selected_categories
-        }
+        config = self.current_config()
         
+        self._config_timer.stop()
         self.quiz_started.emit(self.selected_mode, config)
         self.accept()
 
@@ -3,6 +3,8 @@
 問題出題・回答・結果表示を担当
 """
 
+import time
+
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QRadioButton,
     QButtonGroup, QProgressBar, QSpinBox, QComboBox, QMessageBox, QDialog
@@ -16,8 +18,6 @@ from src.ui.styles import (
 )
 from src.core import get_quiz_engine, QuizMode
 from src.ui.quiz_config_dialog import QuizConfigDialog
-from src.db.models import Question
-from src.utils.data_manager import get_data_manager
 
 
 class QuizWidget(QWidget):
@@ -141,25 +141,47 @@ class QuizWidget(QWidget):
     def _update_timer(self):
         """時間表示更新"""
         self.elapsed_time += 1
+        self.engine.elapsed_seconds = self.elapsed_time
+        self._update_timer_label()
+    
+    def _update_timer_label(self):
+        """経過時間ラベルを更新"""
         minutes = self.elapsed_time // 60
         seconds = self.elapsed_time % 60
         self.timer_label.setText(f"⏱️ {minutes:02d}:{seconds:02d}")
     
     def initialize(self, mode: str, num_questions: int = 10):
-        """クイズ初期化（設定ダイアログを表示）"""
+        """クイズ初期化（中断セッションがあれば再開を確認し、なければ設定ダイアログを表示）"""
+        # 前のセッションの終了時に閉じたエンジンは使わず取得し直す
+        self.engine = get_quiz_engine()
+        if self._offer_resume():
+            return
+        
         self.config_dialog = QuizConfigDialog(self)
         self.config_dialog.quiz_started.connect(self._start_quiz_with_config)
+        self.config_dialog.config_changed.connect(self._prefetch_config)
         self.config_dialog.exec()
     
+    def _prefetch_config(self, mode: str, config: dict):
+        """ダイアログで選択中の設定の問題セットを先読み"""
+        self.engine.prefetch(QuizMode(mode), **self._session_options(config))
+    
+    @staticmethod
+    def _session_options(config: dict) -> dict:
+        """ダイアログの設定を start_session / prefetch の引数に変換"""
+        return {
+            "question_count": config.get('question_count', 10),
+            "category_ids": config.get('category_ids', None),
+            "year_ids": config.get('year_ids', None),
+            "difficulty_range": config.get('difficulty_range', (1, 5))
+        }
+    
     def _start_quiz_with_config(self, mode: str, config: dict):
-        """設定に基づいてクイズ開始"""
+        """設定に基づいてクイズ開始（先読み済みの問題セットがあれば DB を待たない）"""
         try:
             mode_enum = QuizMode(mode)
             session_id, questions = self.engine.start_session(
-                mode=mode_enum,
-                question_count=config.get('question_count', 10),
-                category_ids=config.get('category_ids', None),
-                year_ids=config.get('year_ids', None)
+                mode=mode_enum, **self._session_options(config)
             )
             
             if not questions:
@@ -168,6 +190,7 @@ class QuizWidget(QWidget):
                 return
             
             self.elapsed_time = 0
+            self._update_timer_label()
             self.timer.start(1000)
             self._display_question()
         
@@ -175,11 +198,37 @@ class QuizWidget(QWidget):
             QMessageBox.critical(self, "エラー", f"クイズ開始に失敗しました:\n{e}")
             self.back_requested.emit()
     
+    def _offer_resume(self) -> bool:
+        """中断したセッションの再開を確認（再開した場合 True）"""
+        resumable = self.engine.get_resumable_session()
+        if not resumable:
+            return False
+        
+        minutes = resumable["elapsed_seconds"] // 60
+        reply = QMessageBox.question(
+            self,
+            "学習の再開",
+            f"前回中断した学習があります。\n"
+            f"({resumable['answered_count']}/{resumable['total_questions']}問回答済み、"
+            f"経過 {minutes}分)\n\n再開しますか？",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            self.engine.discard_session(resumable["session_id"])
+            return False
+        
+        if not self.engine.resume_session(resumable["session_id"]):
+            QMessageBox.warning(self, "エラー", "学習を再開できませんでした。")
+            return False
+        
+        self.elapsed_time = self.engine.elapsed_seconds
+        self._update_timer_label()
+        self.timer.start(1000)
+        self._display_question()
+        return True
+    
     def _display_question(self):
         """現在の問題を表示"""
-        from src.db.database import DatabaseManager
-        from src.db.models import Question
-        
         question = self.engine.get_current_question()
         if not question:
             self._show_results()
@@ -194,31 +243,33 @@ class QuizWidget(QWidget):
         # 問題文表示
         self.question_label.setText(question.text)
         
-        # DB からリロードして選択肢を取得
-        db_manager = DatabaseManager()
-        session = db_manager.get_session()
-        try:
-            q_db = session.query(Question).filter_by(id=question.id).first()
-            
-            # 選択肢表示・リセット
-            if q_db and q_db.choices:
-                for i, choice in enumerate(q_db.choices):
-                    choice_text = f"{chr(65+i)}. {choice.text}"
-                    self.choice_buttons[i].setText(choice_text)
-                    self.choice_buttons[i].show()
-        finally:
-            db_manager.close_session(session)
+        # 選択肢表示・リセット（セッション開始時に読み込み済み）
+        for i, button in enumerate(self.choice_buttons):
+            if i < len(question.choices):
+                button.setText(f"{chr(65+i)}. {question.choices[i].text}")
+                button.show()
+            else:
+                button.hide()
         
         self.choices_group.setExclusive(False)
         for button in self.choice_buttons:
             button.setChecked(False)
         self.choices_group.setExclusive(True)
         
+        # 回答済みの問題は選択を復元
+        selected_choice_id = self.engine.get_selected_choice_id()
+        for i, choice in enumerate(question.choices[:len(self.choice_buttons)]):
+            if choice.id == selected_choice_id:
+                self.choice_buttons[i].setChecked(True)
+        
         # ボタンテキスト更新
         if current == total:
             self.btn_next.setText("完了 ✓")
         else:
             self.btn_next.setText("次へ ▶")
+        
+        # 回答時間の計測開始
+        self.current_question_start_time = time.monotonic()
     
     def _next_question(self):
         """次の問題へ"""
@@ -226,25 +277,29 @@ class QuizWidget(QWidget):
         selected_id = self.choices_group.checkedId()
         if selected_id != -1:
             question = self.engine.get_current_question()
-            # DB マネージャー経由でセッションを取得して choices にアクセス
-            dm = get_data_manager()
-            session = dm.db.get_session()
-            try:
-                question = session.query(Question).filter_by(id=question.id).first()
-                if question and selected_id < len(question.choices):
-                    choice = question.choices[selected_id]
-                    self.engine.submit_answer(choice.id, 0)
-            finally:
-                dm.db.close_session(session)
+            if question and selected_id < len(question.choices):
+                choice = question.choices[selected_id]
+                # 復元した選択のまま進む場合は再送しない
+                if choice.id != self.engine.get_selected_choice_id():
+                    self.engine.submit_answer(choice.id, self._question_elapsed_seconds())
         
         # 次の問題へ
         if self.engine.get_current_index() == self.engine.get_question_count() - 1:
             self._show_results()
             return
         
-        self.engine.next_question()
+        # 適応型で追加できる問題がない場合はここで終了
+        if not self.engine.next_question():
+            self._show_results()
+            return
         self._display_question()
     
+    def _question_elapsed_seconds(self) -> int:
+        """現在の問題を表示してからの経過秒数"""
+        if self.current_question_start_time is None:
+            return 0
+        return int(round(time.monotonic() - self.current_question_start_time))
+    
     def _previous_question(self):
         """前の問題へ"""
         if self.engine.previous_question():
@@ -271,7 +326,14 @@ class QuizWidget(QWidget):
                 QMessageBox.information(self, "👍 お疲れ様でした", message)
             else:
                 QMessageBox.information(self, "📚 もう一度チャレンジ", message)
+        elif self.engine.has_unsaved_answers():
+            QMessageBox.warning(
+                self,
+                "保存エラー",
+                "回答の保存が完了しませんでした。\n次回起動時にこのセッションを再開できます。"
+            )
         
+        self.engine.close()
         self.back_requested.emit()
     
     def _confirm_back(self):
@@ -284,6 +346,12 @@ class QuizWidget(QWidget):
         )
         if reply == QMessageBox.StandardButton.Yes:
             self.timer.stop()
+            self.engine.discard_session()
+            self.engine.close()
             self.back_requested.emit()
-
-
+    
+    def closeEvent(self, event):
+        """画面を閉じるときに出題エンジンのワーカーを停止"""
+        self.timer.stop()
+        self.engine.close()
+        super().closeEvent(event)
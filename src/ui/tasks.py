@@ -0,0 +1,206 @@
+"""
+バックグラウンドタスク
+DB アクセスなどの重い処理を QThreadPool で実行し、進捗・結果をシグナルで GUI スレッドへ返す
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Set
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+logger = logging.getLogger(__name__)
+
+
+class TaskCancelled(Exception):
+    """タスクが中止された（CancellationToken.raise_if_cancelled から送出）"""
+
+
+class CancellationToken:
+    """
+    中止要求の受け渡し
+    
+    GUI スレッドが cancel() し、ワーカー側は処理の区切りで cancelled を確認する。
+    """
+    
+    def __init__(self):
+        self._event = threading.Event()
+    
+    def cancel(self):
+        """中止を要求"""
+        self._event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def raise_if_cancelled(self):
+        """中止要求があれば TaskCancelled を送出"""
+        if self._event.is_set():
+            raise TaskCancelled()
+
+
+class TaskSignals(QObject):
+    """
+    タスクのシグナル（GUI スレッドで作成するため、接続先は GUI スレッドで呼ばれる）
+    
+    finished は成功・失敗・中止のいずれの場合も最後に発行される。
+    """
+    
+    progress = Signal(int, int, str)  # (処理済み件数, 全件数, メッセージ)
+    succeeded = Signal(object)  # 戻り値
+    failed = Signal(object)  # 例外
+    cancelled = Signal()
+    finished = Signal()
+
+
+class TaskContext:
+    """ワーカー関数に渡す実行状況（中止確認・進捗報告）"""
+    
+    def __init__(self, token: CancellationToken, signals: TaskSignals):
+        self.token = token
+        self._signals = signals
+    
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+    
+    def raise_if_cancelled(self):
+        self.token.raise_if_cancelled()
+    
+    def report_progress(self, done: int, total: int, message: str = ""):
+        """進捗を GUI スレッドへ通知"""
+        self._signals.progress.emit(done, total, message)
+
+
+class BackgroundTask(QRunnable):
+    """
+    QThreadPool で実行するタスク
+    
+    fn(context, *args, **kwargs) をワーカースレッドで呼び出す。
+    fn が TaskCancelled を送出した場合は cancelled を発行する（途中までの結果を返したい場合は
+    context.cancelled を確認して通常どおり戻る）。
+    """
+    
+    def __init__(self, fn: Callable[..., Any], *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.token = CancellationToken()
+        self.signals = TaskSignals()
+        self.context = TaskContext(self.token, self.signals)
+    
+    def cancel(self):
+        self.token.cancel()
+    
+    def run(self):
+        try:
+            self.token.raise_if_cancelled()
+            result = self.fn(self.context, *self.args, **self.kwargs)
+        except TaskCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            logger.exception(f"バックグラウンドタスクエラー: {e}")
+            self.signals.failed.emit(e)
+        else:
+            self.signals.succeeded.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+class TaskRunner(QObject):
+    """
+    ウィジェット単位のタスク管理
+    
+    同じ key のタスクを開始すると前のタスクを中止し、その結果・進捗は破棄する（最後の要求のみ反映）。
+    ウィジェットの破棄時は cancel_all() で実行中のタスクを中止する。
+    """
+    
+    def __init__(self, parent: QObject = None, pool: QThreadPool = None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._tasks: Set[BackgroundTask] = set()
+        self._keyed: Dict[str, BackgroundTask] = {}
+    
+    def start(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        key: str = None,
+        on_success: Callable[[Any], None] = None,
+        on_error: Callable[[Exception], None] = None,
+        on_progress: Callable[[int, int, str], None] = None,
+        on_cancel: Callable[[], None] = None,
+        on_finished: Callable[[], None] = None,
+        **kwargs
+    ) -> BackgroundTask:
+        """
+        タスクを開始
+        
+        Args:
+            fn: ワーカースレッドで実行する関数 fn(context, *args, **kwargs)
+            key: 同時に1つだけ実行するタスクの識別名
+            on_success: 戻り値を受け取る（GUI スレッド）
+            on_error: 例外を受け取る（GUI スレッド）
+            on_progress: (処理済み件数, 全件数, メッセージ) を受け取る（GUI スレッド）
+            on_cancel: 中止時に呼ばれる（GUI スレッド）
+            on_finished: 成功・失敗・中止のいずれでも最後に呼ばれる（GUI スレッド）
+        
+        Returns:
+            開始したタスク（cancel() で中止を要求できる）
+        """
+        if key is not None:
+            self.cancel(key)
+        
+        task = BackgroundTask(fn, *args, **kwargs)
+        task.setAutoDelete(False)
+        
+        # 後続のタスクに置き換えられたタスクの結果・進捗は反映しない
+        def current() -> bool:
+            return key is None or self._keyed.get(key) is task
+        
+        if on_success:
+            task.signals.succeeded.connect(
+                lambda result: on_success(result) if current() else None
+            )
+        if on_error:
+            task.signals.failed.connect(
+                lambda error: on_error(error) if current() else None
+            )
+        if on_progress:
+            task.signals.progress.connect(
+                lambda done, total, message: on_progress(done, total, message) if current() else None
+            )
+        if on_cancel:
+            task.signals.cancelled.connect(on_cancel)
+        task.signals.finished.connect(lambda: self._forget(task, key))
+        if on_finished:
+            task.signals.finished.connect(on_finished)
+        
+        self._tasks.add(task)
+        if key is not None:
+            self._keyed[key] = task
+        self.pool.start(task)
+        return task
+    
+    def cancel(self, key: str):
+        """key のタスクを中止（以降に届く結果は破棄）"""
+        task = self._keyed.pop(key, None)
+        if task is not None:
+            task.cancel()
+    
+    def cancel_all(self):
+        """実行中のタスクをすべて中止"""
+        for task in list(self._tasks):
+            task.cancel()
+        self._keyed.clear()
+    
+    def is_running(self, key: str) -> bool:
+        """key のタスクが実行中か"""
+        return key in self._keyed
+    
+    def _forget(self, task: BackgroundTask, key: Optional[str]):
+        self._tasks.discard(task)
+        if key is not None and self._keyed.get(key) is task:
+            del self._keyed[key]
@@ -4,6 +4,10 @@ utils モジュール初期化
 
 from src.utils.config import *
 from src.utils.data_manager import get_data_manager, DataManager
+from src.utils.answer_journal import get_answer_journal, AnswerJournal
 from src.utils.scraper import ITPassScraper
 
-__all__ = ['config', 'get_data_manager', 'DataManager', 'ITPassScraper']
+__all__ = [
+    'config', 'get_data_manager', 'DataManager', 'get_answer_journal', 'AnswerJournal',
+    'ITPassScraper'
+]
@@ -0,0 +1,368 @@
+"""
+回答ジャーナル（write-behind）
+回答をメモリキューと追記専用ファイルに記録し、バックグラウンドでまとめて user_answers へ書き込む
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import OperationalError
+
+from src.db import UserAnswer
+from src.utils.data_manager import DataManager, get_data_manager
+
+logger = logging.getLogger(__name__)
+
+# ジャーナルファイル名（DB と同じディレクトリに作成）
+ANSWER_JOURNAL_FILENAME = "answer_journal.jsonl"
+
+# 書き込めなかった回答の退避先（次回起動時に再投入する）
+ANSWER_DEAD_LETTER_FILENAME = "answer_journal.failed.jsonl"
+
+# この件数たまったら書き込み
+ANSWER_JOURNAL_BATCH_SIZE = 20
+
+# 件数に達しなくてもこの秒数ごとに書き込み
+ANSWER_JOURNAL_FLUSH_INTERVAL_SECONDS = 2.0
+
+# セッション終了時に書き込み完了を待つ上限秒数と、再試行間隔の初期値・上限
+ANSWER_JOURNAL_SESSION_TIMEOUT_SECONDS = 10.0
+ANSWER_JOURNAL_RETRY_INITIAL_SECONDS = 0.05
+ANSWER_JOURNAL_RETRY_MAX_SECONDS = 1.0
+
+# 次回の書き込みで再試行する一時的なエラー（ロック競合）
+_TRANSIENT_SQLITE_ERROR_CODES = (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+_TRANSIENT_ERROR_MESSAGES = ("database is locked", "database table is locked", "database is busy")
+
+_REQUIRED_KEYS = (
+    "question_id", "selected_choice_id", "is_correct",
+    "session_id", "time_spent_seconds", "answered_at"
+)
+
+
+class AnswerJournal:
+    """
+    回答の write-behind ジャーナル
+    
+    append() はキューとファイルへの追記のみで戻るため、回答操作が DB のコミットを待たない。
+    ファイルは行単位の JSON で、書き込み済みの回答は反映後に取り除く。
+    異常終了で残った回答は次回起動時に DB と突き合わせて再投入する。
+    個別に書き込んでも失敗した回答は破棄せず退避ファイルへ移し、次回起動時に再投入する。
+    """
+    
+    def __init__(
+        self,
+        data_manager: DataManager = None,
+        journal_path: str = None,
+        batch_size: int = ANSWER_JOURNAL_BATCH_SIZE,
+        flush_interval: float = ANSWER_JOURNAL_FLUSH_INTERVAL_SECONDS
+    ):
+        self.dm = data_manager or get_data_manager()
+        if journal_path is None:
+            journal_path = str(Path(self.dm.db.db_path).parent / ANSWER_JOURNAL_FILENAME)
+        self.journal_path = Path(journal_path)
+        self.dead_letter_path = self.journal_path.with_name(ANSWER_DEAD_LETTER_FILENAME)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        
+        self._pending: List[Dict] = []
+        self._failed: List[Dict] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        
+        self._recover()
+        self._file = open(self.journal_path, "a", encoding="utf-8")
+        if self._pending:
+            self._start_writer()
+    
+    # ========================
+    # 公開 API
+    # ========================
+    
+    def append(self, answer: Dict):
+        """
+        回答をジャーナルへ追加（DB への書き込みはバックグラウンドで実行）
+        
+        Args:
+            answer: DataManager.prepare_answer の戻り値
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("回答ジャーナルは終了しています")
+            self._file.write(self._encode(answer) + "\n")
+            self._file.flush()
+            self._pending.append(answer)
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.notify()
+        self._start_writer()
+    
+    def flush(self) -> int:
+        """
+        未書き込みの回答を DB へ書き込む（呼び出し元スレッドで同期実行）
+        
+        Returns:
+            書き込んだ件数
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending)
+            if not batch:
+                return 0
+            
+            retained = []
+            try:
+                written = self.dm.record_answers(batch)
+            except Exception as e:
+                if self._is_transient(e):
+                    # ロック競合は次回に再試行
+                    logger.warning(f"回答ジャーナル書き込み延期: {e}")
+                    return 0
+                logger.error(f"回答ジャーナル一括書き込みエラー（個別再試行）: {e}")
+                written, failed = self._write_individually(batch)
+                try:
+                    self._move_to_dead_letter(failed)
+                except OSError as e:
+                    # 退避できない回答はキューに残して次回に再試行
+                    logger.error(f"回答の退避エラー: {e}")
+                    retained = failed
+            
+            with self._lock:
+                # 書き込み中に追加された回答は末尾に残っている
+                self._pending[:len(batch)] = retained
+                self._rewrite_file()
+            return written
+    
+    def flush_session(
+        self,
+        session_id: str,
+        timeout: float = ANSWER_JOURNAL_SESSION_TIMEOUT_SECONDS
+    ) -> bool:
+        """
+        指定セッションの回答がすべて DB に反映されるまで書き込みを再試行
+        
+        ロック競合などで書き込みが延期された場合は間隔を延ばしながら再試行する。
+        
+        Args:
+            session_id: セッションID
+            timeout: 待つ上限秒数
+        
+        Returns:
+            すべて反映できた場合 True（タイムアウト、または退避ファイルへ移った回答がある場合 False）
+        """
+        deadline = time.monotonic() + timeout
+        delay = ANSWER_JOURNAL_RETRY_INITIAL_SECONDS
+        while True:
+            self.flush()
+            if self.failed_answers(session_id):
+                return False
+            if not self.pending_answers(session_id):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error(f"回答ジャーナル書き込みタイムアウト: session_id={session_id}")
+                return False
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, ANSWER_JOURNAL_RETRY_MAX_SECONDS)
+    
+    def pending_answers(self, session_id: str = None) -> List[Dict]:
+        """未書き込みの回答（session_id 指定時はそのセッション分のみ）"""
+        with self._lock:
+            return [
+                dict(answer) for answer in self._pending
+                if session_id is None or answer["session_id"] == session_id
+            ]
+    
+    def failed_answers(self, session_id: str = None) -> List[Dict]:
+        """退避ファイルへ移した回答（session_id 指定時はそのセッション分のみ）"""
+        with self._lock:
+            return [
+                dict(answer) for answer in self._failed
+                if session_id is None or answer["session_id"] == session_id
+            ]
+    
+    def close(self):
+        """バックグラウンド書き込みを停止し、残りをすべて書き込む"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval * 5)
+        self.flush()
+        with self._lock:
+            self._file.close()
+    
+    # ========================
+    # 内部処理
+    # ========================
+    
+    def _start_writer(self):
+        """バックグラウンド書き込みスレッドを起動（初回のみ）"""
+        with self._lock:
+            if self._thread is not None or self._closed:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="AnswerJournalWriter", daemon=True
+            )
+            self._thread.start()
+    
+    def _run(self):
+        """件数または時間のしきい値ごとに書き込み"""
+        while True:
+            with self._lock:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._wakeup.wait(self.flush_interval)
+                closed = self._closed
+            if closed:
+                return  # 残りは close() が書き込む
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"回答ジャーナル書き込みエラー: {e}")
+    
+    def _write_individually(self, batch: List[Dict]) -> Tuple[int, List[Dict]]:
+        """
+        1件ずつ書き込み
+        
+        Returns:
+            (書き込んだ件数, 書き込めなかった回答のリスト)
+        """
+        written = 0
+        failed = []
+        for answer in batch:
+            try:
+                written += self.dm.record_answers([answer])
+            except Exception as e:
+                logger.error(f"回答を退避: {self._encode(answer)} ({e})")
+                failed.append(answer)
+        return written, failed
+    
+    def _move_to_dead_letter(self, answers: List[Dict]):
+        """書き込めなかった回答を退避ファイルへ追記（fsync 後に戻る）"""
+        if not answers:
+            return
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            for answer in answers:
+                f.write(self._encode(answer) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        with self._lock:
+            self._failed.extend(answers)
+    
+    def _rewrite_file(self):
+        """未書き込みの回答のみでファイルを置き換え（ロック保持中に呼び出す）"""
+        self._file.close()
+        self._write_pending_file()
+        self._file = open(self.journal_path, "a", encoding="utf-8")
+    
+    def _write_pending_file(self):
+        """未書き込みの回答を一時ファイルに書き出し、アトミックに置き換え"""
+        temp_path = self.journal_path.with_name(self.journal_path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for answer in self._pending:
+                f.write(self._encode(answer) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.journal_path)
+    
+    def _recover(self):
+        """
+        前回終了時に残った回答と退避ファイルの回答のうち、DB に未反映のものをキューへ戻す
+        
+        ジャーナルを書き直してから退避ファイルを削除するため、途中で終了しても回答は失われない。
+        """
+        answers = self._read_answers(self.journal_path) + self._read_answers(self.dead_letter_path)
+        if not answers:
+            if self.dead_letter_path.exists():
+                self.dead_letter_path.unlink()
+            return
+        
+        # 反映済み（DB コミット後、ファイル更新前に終了した）回答を除外
+        session_ids = {answer["session_id"] for answer in answers}
+        session = self.dm.db.get_session()
+        try:
+            recorded = {
+                tuple(row) for row in session.query(
+                    UserAnswer.session_id, UserAnswer.question_id, UserAnswer.answered_at
+                ).filter(UserAnswer.session_id.in_(session_ids))
+            }
+        finally:
+            self.dm.db.close_session(session)
+        
+        # 反映済みの回答と、ジャーナルと退避ファイルの両方にある回答を除外
+        self._pending = []
+        for answer in answers:
+            key = (answer["session_id"], answer["question_id"], answer["answered_at"])
+            if key not in recorded:
+                recorded.add(key)
+                self._pending.append(answer)
+        logger.info(f"回答ジャーナル復旧: 未反映 {len(self._pending)}件 / {len(answers)}件")
+        self._write_pending_file()
+        if self.dead_letter_path.exists():
+            self.dead_letter_path.unlink()
+    
+    def _read_answers(self, path: Path) -> List[Dict]:
+        """ジャーナル形式のファイルから回答を読み込み（ファイルがなければ空）"""
+        if not path.exists():
+            return []
+        
+        answers = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    answers.append(self._decode(line))
+                except ValueError:
+                    # 書き込み途中で終了した最終行
+                    logger.warning(f"回答ジャーナルの破損行を無視: {line.strip()[:80]}")
+        return answers
+    
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """ロック競合（SQLITE_BUSY / SQLITE_LOCKED）による書き込みエラーか"""
+        if not isinstance(error, OperationalError):
+            return False
+        code = getattr(error.orig, "sqlite_errorcode", None)
+        if code is not None and code & 0xFF in _TRANSIENT_SQLITE_ERROR_CODES:
+            return True
+        message = str(error.orig).lower()
+        return any(text in message for text in _TRANSIENT_ERROR_MESSAGES)
+    
+    @staticmethod
+    def _encode(answer: Dict) -> str:
+        return json.dumps(
+            dict(answer, answered_at=answer["answered_at"].isoformat()),
+            ensure_ascii=False
+        )
+    
+    @staticmethod
+    def _decode(line: str) -> Dict:
+        answer = json.loads(line)
+        if not all(key in answer for key in _REQUIRED_KEYS):
+            raise ValueError("回答ジャーナルの必須項目がありません")
+        answer["answered_at"] = datetime.fromisoformat(answer["answered_at"])
+        return answer
+
+
+# グローバルインスタンス
+_answer_journal = None
+
+
+def get_answer_journal() -> AnswerJournal:
+    """グローバル回答ジャーナル取得（プロセス終了時に残りを書き込む）"""
+    global _answer_journal
+    if _answer_journal is None:
+        _answer_journal = AnswerJournal()
+        atexit.register(_answer_journal.close)
+    return _answer_journal
@@ -2,25 +2,132 @@
 データマネージャー - DB操作・問題管理
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import List, Dict, Optional, Tuple
-from datetime import datetime
+from sqlalchemy.orm import Session, selectinload, joinedload
+from sqlalchemy import and_, or_, func, case, select, Row
+from typing import Callable, Iterator, List, Dict, Optional, Set, Tuple
+from array import array
+from datetime import datetime, timezone
 import logging
+import random
+import threading
+import numpy as np
 
 from src.db import (
     get_db_manager, Question, Choice, Category, Year, 
-    UserAnswer, Statistics, StudySession
+    UserAnswer, Statistics, StudySession, CategoryStat, ReviewState, ItemParameter
 )
+from src.db.rollups import (
+    apply_answer_rollups, rebuild_answer_rollups, increment_statistics, reconcile_statistics
+)
+from src.db.spaced_repetition import apply_review_updates, rebuild_review_schedule
+from src.db.search_index import (
+    SEARCH_TABLE, SEARCH_COLUMN_WEIGHTS,
+    parse_search_query, match_expression, make_snippet, like_pattern,
+    search_index_exists, suspend_search_triggers, bulk_index_questions
+)
+from src.utils.weighted_sampler import WeightedQuestionSampler
+from src.utils.irt import ItemBank, calibrate_difficulties, prior_difficulty, DEFAULT_DISCRIMINATION
 
 logger = logging.getLogger(__name__)
 
+# 一括インポート時の1トランザクションあたりの問題数
+BULK_IMPORT_BATCH_SIZE = 1000
+
+# ID 指定で問題を読み込む際の IN 句1回あたりの件数
+QUESTION_FETCH_CHUNK_SIZE = 500
+
+# 出題候補IDキャッシュに保持する条件の数
+CANDIDATE_CACHE_MAX_ENTRIES = 64
+
+# 問題一覧用に読み込む問題文の文字数（表示は50字まで、51字目があれば省略記号を付ける）
+QUESTION_SUMMARY_TEXT_LENGTH = 51
+
+# iter_questions で1回に読み込む問題数
+QUESTION_PAGE_SIZE = 500
+
+# stream_question_rows で DB ドライバから1回に取り出す行数
+QUESTION_STREAM_BATCH_SIZE = 1000
+
+# キーワード検索で返す最大件数
+SEARCH_RESULT_LIMIT = 200
+
+
+class _ChoiceIndex:
+    """
+    選択肢ID → (問題ID, 正解フラグ) の対応表
+    
+    選択肢IDを添字とする配列で保持する（辞書より大幅に省メモリ）。
+    """
+    
+    # 正解フラグの格納値（0 は未登録）
+    _FLAG_UNKNOWN = 1
+    _FLAG_INCORRECT = 2
+    _FLAG_CORRECT = 3
+    
+    def __init__(self, rows, max_choice_id: int):
+        """
+        Args:
+            rows: (choice_id, question_id, is_correct) の反復（カーソルから1行ずつ読む）
+            max_choice_id: 選択肢IDの最大値（これより大きい ID の行は登録しない）
+        """
+        size = max_choice_id + 1
+        self.question_ids = array('q', bytes(8 * size))
+        self.flags = bytearray(size)
+        for choice_id, question_id, is_correct in rows:
+            if choice_id >= size:
+                continue  # 最大値の取得後に追加された選択肢（get() で DB を参照する）
+            self.question_ids[choice_id] = question_id
+            if is_correct is None:
+                self.flags[choice_id] = self._FLAG_UNKNOWN
+            else:
+                self.flags[choice_id] = self._FLAG_CORRECT if is_correct else self._FLAG_INCORRECT
+    
+    def get(self, choice_id: int) -> Optional[Tuple[int, Optional[bool]]]:
+        """(問題ID, 正解フラグ) を返す（未登録の場合 None）"""
+        if not 0 < choice_id < len(self.flags):
+            return None
+        flag = self.flags[choice_id]
+        if not flag:
+            return None
+        if flag == self._FLAG_UNKNOWN:
+            return self.question_ids[choice_id], None
+        return self.question_ids[choice_id], flag == self._FLAG_CORRECT
+
+
+def _fetch_array(cursor, width: int, batch_size: int = QUESTION_STREAM_BATCH_SIZE) -> np.ndarray:
+    """
+    DBAPI カーソルの結果を batch_size 行ずつ float64 配列に変換して連結
+    
+    全行の行タプルを一度にリストへ読み込まないため、ピークメモリは配列本体と1回分の行のみ。
+    NULL は NaN になる。
+    """
+    chunks = []
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        chunks.append(np.array(rows, dtype=np.float64).reshape(-1, width))
+    if not chunks:
+        return np.empty((0, width), dtype=np.float64)
+    return np.concatenate(chunks)
+
 
 class DataManager:
     """データベース操作管理クラス"""
     
     def __init__(self):
         self.db = get_db_manager()
+        self._candidate_ids_cache: Dict[Tuple, List[int]] = {}
+        self._choice_index: Optional[_ChoiceIndex] = None
+        self._weighted_sampler: Optional[WeightedQuestionSampler] = None
+        self._question_pools: Optional[Dict[Tuple[int, int], List[int]]] = None
+        self._item_bank: Optional[ItemBank] = None
+        self._search_index_available: Optional[bool] = None
+        self._invalidation_listeners: List[Callable[[], None]] = []
+        # キャッシュは先読みスレッドからも作成されるため、破棄のたびに世代を進め、
+        # 作成開始後に破棄された結果は格納しない
+        self._cache_lock = threading.Lock()
+        self._cache_generation = 0
     
     # ========================
     # Category 操作
@@ -129,6 +236,7 @@ class DataManager:
                 session.add(choice)
             
             session.commit()
+            self._invalidate_question_caches()
             logger.info(f"問題追加: {question.id}")
             return question
             
@@ -139,6 +247,57 @@ class DataManager:
         finally:
             self.db.close_session(session)
     
+    def update_question(self, question_id: int, question_data: Dict) -> bool:
+        """
+        問題更新（指定したキーのみ変更）
+        
+        出題候補・選択肢の正解表・問題プールなどに影響するため、更新後にキャッシュを破棄する。
+        選択肢は番号順に上書きし、不足分は追加する（回答履歴が参照するため削除はしない）。
+        
+        Args:
+            question_id: 問題ID
+            question_data: question_number / text / explanation / difficulty /
+                           category_id / year_id / choices / correct_answer のうち変更するもの
+        
+        Returns:
+            成功時 True
+        """
+        session = self.db.get_session()
+        try:
+            question = session.get(Question, question_id)
+            if not question:
+                return False
+            
+            for key in ("question_number", "text", "explanation", "difficulty", "category_id", "year_id"):
+                if key in question_data:
+                    setattr(question, key, question_data[key])
+            
+            if "choices" in question_data or "correct_answer" in question_data:
+                choices = sorted(question.choices, key=lambda c: c.choice_number or 0)
+                texts = question_data.get("choices", [c.text for c in choices])
+                correct_answer = question_data.get("correct_answer")
+                for idx, choice_text in enumerate(texts, 1):
+                    if idx <= len(choices):
+                        choice = choices[idx - 1]
+                        choice.text = choice_text
+                    else:
+                        choice = Choice(question_id=question.id, choice_number=idx, text=choice_text)
+                        session.add(choice)
+                    if correct_answer is not None:
+                        choice.is_correct = (idx == correct_answer)
+            
+            session.commit()
+            self._invalidate_question_caches()
+            logger.info(f"問題更新: {question_id}")
+            return True
+            
+        except Exception as e:
+            session.rollback()
+            logger.error(f"問題更新エラー: {e}")
+            return False
+        finally:
+            self.db.close_session(session)
+    
     def _get_or_create_category_internal(self, session, name: str, description: str = None) -> Category:
         """セッション内でカテゴリ取得/作成"""
         category = session.query(Category).filter_by(name=name).first()
@@ -159,12 +318,175 @@ class DataManager:
     
     def bulk_add_questions(self, questions_data: List[Dict]) -> int:
         """大量問題追加（Bulk Insert）"""
-        count = 0
-        for question_data in questions_data:
-            if self.add_question(question_data):
-                count += 1
-        logger.info(f"大量追加完了: {count}/{len(questions_data)}件")
-        return count
+        result = self.bulk_import_questions(questions_data)
+        return result["added"]
+    
+    def bulk_import_questions(
+        self,
+        questions_data: List[Dict],
+        batch_size: int = BULK_IMPORT_BATCH_SIZE,
+        progress_callback: Callable[[int, int], None] = None,
+        should_cancel: Callable[[], bool] = None
+    ) -> Dict[str, int]:
+        """
+        大量問題インポート（バッチ単位のトランザクション）
+        
+        カテゴリ・年度は最初に一括解決し、重複チェックは既存キー集合を
+        1回だけ読み込んで行う。Question/Choice は executemany で挿入する。
+        中止はバッチの境界で行い、それまでにコミットしたバッチは残す。
+        
+        Args:
+            questions_data: add_question と同形式の辞書リスト
+            batch_size: 1トランザクションあたりの問題数
+            progress_callback: バッチごとに (処理済み件数, 全件数) で呼ばれる
+            should_cancel: True を返したら次のバッチに進まず中止
+        
+        Returns:
+            {"added": 追加数, "duplicates": 重複数, "errors": エラー数}
+        """
+        result = {"added": 0, "duplicates": 0, "errors": 0}
+        if not questions_data:
+            return result
+        
+        session = self.db.get_session()
+        try:
+            # カテゴリ・年度マップを一括解決
+            category_ids = {}
+            year_ids = {}
+            for question_data in questions_data:
+                name = question_data.get('category', 'テクノロジ')
+                year = question_data.get('year', 2024)
+                try:
+                    if name not in category_ids:
+                        category_ids[name] = self._get_or_create_category_internal(session, name).id
+                        session.commit()
+                    if year not in year_ids:
+                        year_ids[year] = self._get_or_create_year_internal(
+                            session, year, question_data.get('season', '春')
+                        ).id
+                        session.commit()
+                except Exception as e:
+                    session.rollback()
+                    logger.error(f"カテゴリ・年度解決エラー: {e}")
+            
+            # 検索インデックスはトリガーではなくバッチごとにまとめて登録する
+            indexed = search_index_exists(session)
+            
+            # 既存の重複キーを一括読み込み（add_question と同じく問題番号なしも1つのキーとみなす）
+            existing_keys = {
+                tuple(row) for row in session.query(
+                    Question.category_id, Question.year_id, Question.question_number
+                )
+            }
+            
+            for start in range(0, len(questions_data), batch_size):
+                if should_cancel and should_cancel():
+                    logger.info(f"大量追加を中止: {start}/{len(questions_data)}件処理済み")
+                    break
+                if progress_callback and start:
+                    progress_callback(start, len(questions_data))
+                batch = questions_data[start:start + batch_size]
+                question_rows = []
+                choice_lists = []
+                staged = []
+                
+                for question_data in batch:
+                    try:
+                        name = question_data.get('category', 'テクノロジ')
+                        year = question_data.get('year', 2024)
+                        if name not in category_ids or year not in year_ids:
+                            result["errors"] += 1
+                            continue
+                        
+                        number = question_data.get('question_number')
+                        key = (category_ids[name], year_ids[year], number)
+                        if key in existing_keys:
+                            logger.warning(f"問題重複: {number}")
+                            result["duplicates"] += 1
+                            continue
+                        
+                        text = question_data.get('text')
+                        choices = list(question_data.get('choices', []))
+                        if text is None or any(c is None for c in choices):
+                            result["errors"] += 1
+                            continue
+                        
+                        correct_answer = question_data.get('correct_answer', 1)
+                        question_rows.append((
+                            number,
+                            text,
+                            question_data.get('explanation', ''),
+                            key[0],
+                            key[1],
+                            question_data.get('difficulty', 2),
+                        ))
+                        choice_lists.append([
+                            (idx, choice_text, idx == correct_answer)
+                            for idx, choice_text in enumerate(choices, 1)
+                        ])
+                        staged.append(question_data)
+                        existing_keys.add(key)
+                    except Exception as e:
+                        logger.error(f"問題データ変換エラー: {e}")
+                        result["errors"] += 1
+                
+                if not question_rows:
+                    continue
+                
+                try:
+                    # 問題を先に挿入して SQLite が採番した ID を受け取り、選択肢を executemany で一括挿入
+                    # （同じトランザクション内のため、途中で失敗してもバッチごと取り消される）
+                    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")
+                    cursor = session.connection().connection.driver_connection.cursor()
+                    try:
+                        if indexed:
+                            suspend_search_triggers(cursor)
+                        new_ids = []
+                        for row in question_rows:
+                            cursor.execute(
+                                "INSERT INTO questions (question_number, text, explanation, "
+                                "category_id, year_id, difficulty, is_active, created_at, updated_at) "
+                                "VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?)",
+                                row + (now, now)
+                            )
+                            new_ids.append(cursor.lastrowid)
+                        cursor.executemany(
+                            "INSERT INTO choices (question_id, choice_number, text, is_correct, created_at) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            [
+                                (question_id, idx, choice_text, is_correct, now)
+                                for question_id, choices in zip(new_ids, choice_lists)
+                                for idx, choice_text, is_correct in choices
+                            ]
+                        )
+                        if indexed:
+                            bulk_index_questions(cursor, [
+                                (question_id, row[1], row[2], " ".join(c[1] for c in choices))
+                                for question_id, row, choices in zip(new_ids, question_rows, choice_lists)
+                            ])
+                    finally:
+                        cursor.close()
+                    session.commit()
+                    result["added"] += len(new_ids)
+                except Exception as e:
+                    # バッチ失敗時は1件ずつ再試行して件数を確定
+                    session.rollback()
+                    logger.error(f"バッチ挿入エラー（個別再試行）: {e}")
+                    for question_data in staged:
+                        if self.add_question(question_data):
+                            result["added"] += 1
+                        else:
+                            result["errors"] += 1
+        finally:
+            self.db.close_session(session)
+            if result["added"]:
+                self._invalidate_question_caches()
+        
+        logger.info(
+            f"大量追加完了: {result['added']}/{len(questions_data)}件 "
+            f"(重複: {result['duplicates']}件, エラー: {result['errors']}件)"
+        )
+        return result
     
     def get_question_count(self) -> int:
         """問題総数取得"""
@@ -180,47 +502,829 @@ class DataManager:
         year_ids: List[int] = None,
         difficulty_min: int = 1,
         difficulty_max: int = 5,
-        limit: int = 10
+        limit: int = 10,
+        after_id: int = None
     ) -> List[Question]:
-        """問題取得（フィルター付き）"""
+        """
+        問題取得（フィルター付き、ID 順）
+        
+        after_id を指定すると、その ID より後ろから limit 件を返す（全件を順に読む場合は iter_questions）。
+        """
         session = self.db.get_session()
         try:
-            query = session.query(Question).filter(
-                Question.is_active == True,
-                Question.difficulty >= difficulty_min,
-                Question.difficulty <= difficulty_max
+            return (
+                session.query(Question)
+                .filter(*self._question_conditions(
+                    category_ids, year_ids, (difficulty_min, difficulty_max), after_id
+                ))
+                .order_by(Question.id)
+                .limit(limit)
+                .all()
             )
-            
-            if category_ids:
-                query = query.filter(Question.category_id.in_(category_ids))
-            
-            if year_ids:
-                query = query.filter(Question.year_id.in_(year_ids))
-            
-            return query.limit(limit).all()
         finally:
             self.db.close_session(session)
     
+    def iter_questions(
+        self,
+        category_ids: List[int] = None,
+        year_ids: List[int] = None,
+        difficulty_range: Tuple[int, int] = None,
+        page_size: int = QUESTION_PAGE_SIZE,
+        after_id: int = None
+    ) -> Iterator[Question]:
+        """
+        条件に合う問題を ID 順にすべて返す（キーセット方式で page_size 件ずつ読み込む）
+        
+        全ページを1つのセッションで読み込み、メモリに載るのは1ページ分のみ。分野・年度は
+        セッション内で1回だけ読み込んで共有する。選択肢も読み込み済み（ORM オブジェクトの作成が
+        処理時間の大半を占めるため、選択肢や ORM オブジェクトが不要な場合は stream_question_rows）。
+        走査中はセッションを開いたままにするので、途中でやめる場合はイテレータを close() する。
+        中断した位置から再開する場合は、最後に受け取った問題の ID を after_id に渡す。
+        
+        Args:
+            category_ids: 対象分野ID リスト
+            year_ids: 対象年度ID リスト
+            difficulty_range: 難易度範囲 (最小, 最大)（None の場合は絞り込まない）
+            page_size: 1回に読み込む問題数
+            after_id: この ID より後ろの問題から返す
+        """
+        session = self.db.get_session()
+        try:
+            while True:
+                page = (
+                    session.query(Question)
+                    .options(
+                        selectinload(Question.choices),
+                        selectinload(Question.category),
+                        selectinload(Question.year)
+                    )
+                    .filter(*self._question_conditions(
+                        category_ids, year_ids, difficulty_range, after_id
+                    ))
+                    .order_by(Question.id)
+                    .limit(page_size)
+                    .all()
+                )
+                yield from page
+                if len(page) < page_size:
+                    return
+                after_id = page[-1].id
+        finally:
+            self.db.close_session(session)
+    
+    def stream_question_rows(
+        self,
+        category_ids: List[int] = None,
+        year_ids: List[int] = None,
+        difficulty_range: Tuple[int, int] = None,
+        batch_size: int = QUESTION_STREAM_BATCH_SIZE,
+        columns: tuple = None
+    ) -> Iterator[Row]:
+        """
+        条件に合う問題を ID 順に軽量な行タプルで返す（エクスポート・問題プール作成などの全件走査用）
+        
+        1回のクエリの結果を yield_per で batch_size 行ずつ取り出すため、ORM オブジェクトを作らず
+        結果セット全体も保持しない。走査中はセッションを開いたままにするので、途中でやめる場合は
+        イテレータを close() する（WAL モードのため書き込みはブロックしない）。
+        
+        Args:
+            columns: 取り出す questions の列（例: (Question.id, Question.difficulty)）。
+                     省略時は分野・年度を結合した下記の列
+        
+        Yields:
+            (id, question_number, year, season, category, text, explanation, difficulty)
+            の Row（row.text のように列名でも参照できる）
+        """
+        if columns:
+            query = select(*columns)
+        else:
+            query = (
+                select(
+                    Question.id,
+                    Question.question_number,
+                    Year.year,
+                    Year.season,
+                    Category.name.label("category"),
+                    Question.text,
+                    Question.explanation,
+                    Question.difficulty
+                )
+                .join(Year, Question.year_id == Year.id)
+                .join(Category, Question.category_id == Category.id)
+            )
+        query = (
+            query
+            .where(*self._question_conditions(category_ids, year_ids, difficulty_range))
+            .order_by(Question.id)
+            .execution_options(yield_per=batch_size)
+        )
+        
+        session = self.db.get_session()
+        try:
+            for partition in session.connection().execute(query).partitions():
+                yield from partition
+        finally:
+            self.db.close_session(session)
+    
+    @staticmethod
+    def _question_conditions(
+        category_ids: List[int] = None,
+        year_ids: List[int] = None,
+        difficulty_range: Tuple[int, int] = None,
+        after_id: int = None
+    ) -> list:
+        """有効な問題の絞り込み条件（get_questions / iter_questions などで共通）"""
+        conditions = [Question.is_active == True]
+        if category_ids:
+            conditions.append(Question.category_id.in_(category_ids))
+        if year_ids:
+            conditions.append(Question.year_id.in_(year_ids))
+        if difficulty_range is not None:
+            conditions.append(Question.difficulty.between(*difficulty_range))
+        if after_id is not None:
+            conditions.append(Question.id > after_id)
+        return conditions
+    
+    def get_question_summaries(
+        self,
+        category_ids: List[int] = None,
+        year_ids: List[int] = None,
+        limit: int = 1000,
+        after_id: int = None
+    ) -> List[Dict]:
+        """
+        問題一覧表示用の概要（分野・年度を結合した1回のクエリ、ORM オブジェクトを作らない）
+        
+        ID 順に返す。after_id を指定すると、その ID より後ろから limit 件を返す（キーセット方式で
+        ページを読み進めるため、OFFSET と違い後ろのページでも読み飛ばしが発生しない）。
+        
+        Returns:
+            [{"id", "question_number", "year", "season", "category", "text", "difficulty"}, ...]
+            text は先頭 QUESTION_SUMMARY_TEXT_LENGTH 文字
+        """
+        query = (
+            select(
+                Question.id,
+                Question.question_number,
+                Year.year,
+                Year.season,
+                Category.name,
+                func.substr(Question.text, 1, QUESTION_SUMMARY_TEXT_LENGTH),
+                Question.difficulty
+            )
+            .join(Year, Question.year_id == Year.id)
+            .join(Category, Question.category_id == Category.id)
+            .where(*self._question_conditions(category_ids, year_ids, after_id=after_id))
+            .order_by(Question.id)
+            .limit(limit)
+        )
+        
+        session = self.db.get_session()
+        try:
+            keys = ("id", "question_number", "year", "season", "category", "text", "difficulty")
+            return [dict(zip(keys, row)) for row in session.connection().execute(query)]
+        finally:
+            self.db.close_session(session)
+    
+    def search(
+        self,
+        query: str,
+        category_ids: List[int] = None,
+        year_ids: List[int] = None,
+        limit: int = SEARCH_RESULT_LIMIT
+    ) -> List[Dict]:
+        """
+        問題文・解説・選択肢のキーワード検索（全文検索インデックス）
+        
+        スペース区切りの語をすべて含む有効な問題を返す。3文字以上の語は FTS5 の索引で引き、
+        一致したすべての問題を BM25 の関連度順（問題文 > 選択肢 > 解説の重み）に並べて上位 limit 件を返す。
+        3文字未満の語のみの場合は索引を使わずに ID 順で返す。
+        検索インデックスがない（FTS5 trigram 非対応の SQLite）場合は LIKE で ID 順に検索する。
+        
+        Returns:
+            get_question_summaries と同じキーに "snippet"（一致箇所を【】で囲んだ抜粋）を加えた辞書のリスト
+        """
+        terms, short_terms = parse_search_query(query)
+        if not terms and not short_terms:
+            return []
+        
+        session = self.db.get_session()
+        try:
+            if self._search_index_available is None:
+                self._search_index_available = search_index_exists(session)
+            if self._search_index_available:
+                rows = self._search_index(session, terms, short_terms, category_ids, year_ids, limit)
+            else:
+                rows = self._search_like(session, terms + short_terms, category_ids, year_ids, limit)
+        finally:
+            self.db.close_session(session)
+        
+        keys = ("id", "question_number", "year", "season", "category", "text", "difficulty")
+        results = []
+        for row in rows:
+            result = dict(zip(keys, row))
+            result["snippet"] = make_snippet(row[7:], terms + short_terms)
+            results.append(result)
+        return results
+    
+    @staticmethod
+    def _search_index(
+        session: Session,
+        terms: List[str],
+        short_terms: List[str],
+        category_ids: List[int],
+        year_ids: List[int],
+        limit: int
+    ) -> list:
+        """全文検索インデックスで検索（search の本体）"""
+        params = {"limit": limit}
+        conditions = ["q.is_active = 1"]
+        if terms:
+            conditions.append(f"{SEARCH_TABLE} MATCH :match")
+            params["match"] = match_expression(terms)
+            weights = ", ".join(str(float(w)) for w in SEARCH_COLUMN_WEIGHTS)
+            score = f"bm25({SEARCH_TABLE}, {weights})"
+            order = "score, id"
+        else:
+            # 索引を使わない走査は ID 順に進むため、limit 件見つかった時点で打ち切る
+            score = "0"
+            order = f"{SEARCH_TABLE}.rowid"
+        searchable = (
+            f"lower({SEARCH_TABLE}.text || ' ' || COALESCE({SEARCH_TABLE}.explanation, '')"
+            f" || ' ' || COALESCE({SEARCH_TABLE}.choices, ''))"
+        )
+        for i, term in enumerate(short_terms):
+            conditions.append(f"instr({searchable}, :term{i}) > 0")
+            params[f"term{i}"] = term.lower()
+        for column, name, ids in (
+            ("q.category_id", "category", category_ids), ("q.year_id", "year", year_ids)
+        ):
+            if ids:
+                names = [f"{name}{i}" for i in range(len(ids))]
+                conditions.append(f"{column} IN ({', '.join(':' + n for n in names)})")
+                params.update(zip(names, ids))
+        
+        # 一致した問題すべてを ID と関連度のみで順位付けし、上位 limit 件だけ内容を読み込む
+        # （CROSS JOIN で検索インデックスを外側に固定し、分野・年度の絞り込みは同じクエリで行う）
+        sql = f"""
+            SELECT
+                q.id, q.question_number, y.year, y.season, c.name,
+                substr(q.text, 1, {QUESTION_SUMMARY_TEXT_LENGTH}), q.difficulty,
+                s.text, s.explanation, s.choices
+            FROM (
+                SELECT {SEARCH_TABLE}.rowid AS id, {score} AS score
+                FROM {SEARCH_TABLE}
+                CROSS JOIN questions q ON q.id = {SEARCH_TABLE}.rowid
+                WHERE {" AND ".join(conditions)}
+                ORDER BY {order}
+                LIMIT :limit
+            ) AS hits
+            JOIN {SEARCH_TABLE} s ON s.rowid = hits.id
+            JOIN questions q ON q.id = hits.id
+            JOIN years y ON y.id = q.year_id
+            JOIN categories c ON c.id = q.category_id
+            ORDER BY hits.score, hits.id
+        """
+        # 条件に応じて組み立てた SQL を名前付きパラメータで DBAPI カーソルから実行する
+        dbapi_conn = session.connection().connection.driver_connection
+        return dbapi_conn.execute(sql, params).fetchall()
+    
+    def _search_like(
+        self,
+        session: Session,
+        terms: List[str],
+        category_ids: List[int],
+        year_ids: List[int],
+        limit: int
+    ) -> list:
+        """検索インデックスがない場合の LIKE による検索（ID 順）"""
+        conditions = self._question_conditions(category_ids, year_ids)
+        for term in terms:
+            pattern = like_pattern(term)
+            conditions.append(or_(
+                Question.text.like(pattern, escape="\\"),
+                Question.explanation.like(pattern, escape="\\"),
+                select(Choice.id).where(
+                    Choice.question_id == Question.id,
+                    Choice.text.like(pattern, escape="\\")
+                ).exists()
+            ))
+        choice_texts = (
+            select(func.group_concat(Choice.text, " "))
+            .where(Choice.question_id == Question.id)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                Question.id,
+                Question.question_number,
+                Year.year,
+                Year.season,
+                Category.name,
+                func.substr(Question.text, 1, QUESTION_SUMMARY_TEXT_LENGTH),
+                Question.difficulty,
+                Question.text,
+                Question.explanation,
+                choice_texts
+            )
+            .join(Year, Question.year_id == Year.id)
+            .join(Category, Question.category_id == Category.id)
+            .where(*conditions)
+            .order_by(Question.id)
+            .limit(limit)
+        )
+        return session.connection().execute(query).all()
+    
     def get_random_questions(
         self,
         count: int = 10,
         category_ids: List[int] = None,
-        year_ids: List[int] = None
+        year_ids: List[int] = None,
+        difficulty_range: Tuple[int, int] = None,
+        seed: Optional[int] = None
     ) -> List[Question]:
-        """ランダムに問題取得"""
-        import random
+        """
+        ランダムに問題取得
+        
+        条件に合う問題IDの一覧（キャッシュ済み）から一様に抽出し、
+        選ばれた問題のみを1回の IN クエリで読み込む。
+        
+        Args:
+            count: 取得件数
+            category_ids: 対象分野ID リスト
+            year_ids: 対象年度ID リスト
+            difficulty_range: 難易度範囲 (最小, 最大)（None の場合は絞り込まない）
+            seed: 乱数シード（指定時は同じ条件で同じ結果になる）
+        """
+        rng = random.Random(seed) if seed is not None else random
         session = self.db.get_session()
         try:
-            query = session.query(Question).filter(Question.is_active == True)
-            
-            if category_ids:
-                query = query.filter(Question.category_id.in_(category_ids))
-            
-            if year_ids:
-                query = query.filter(Question.year_id.in_(year_ids))
+            candidate_ids = self._get_candidate_ids(
+                session, category_ids, year_ids, difficulty_range
+            )
+            chosen_ids = rng.sample(candidate_ids, min(count, len(candidate_ids)))
+            return self._fetch_questions_in_order(session, chosen_ids)
+        finally:
+            self.db.close_session(session)
+    
+    def count_candidate_questions(
+        self,
+        category_ids: List[int] = None,
+        year_ids: List[int] = None,
+        difficulty_range: Tuple[int, int] = None
+    ) -> int:
+        """
+        出題条件に合う問題数（設定ダイアログ表示用）
+        
+        get_random_questions と同じ候補IDキャッシュを使うため、同じ条件での再計算は不要。
+        """
+        session = self.db.get_session()
+        try:
+            return len(self._get_candidate_ids(
+                session, category_ids, year_ids, difficulty_range
+            ))
+        finally:
+            self.db.close_session(session)
+    
+    def get_review_question_ids(
+        self,
+        count: int = 10,
+        category_ids: List[int] = None,
+        year_ids: List[int] = None,
+        difficulty_range: Tuple[int, int] = None,
+        due_before: datetime = None
+    ) -> List[int]:
+        """
+        復習スケジュールから次回復習日時の早い順に問題IDを取得
+        
+        review_schedule の due_at インデックスを順に走査し、条件に合う問題が
+        count 件見つかった時点で終了する（回答履歴は参照しない）。
+        
+        Args:
+            count: 取得件数
+            category_ids: 対象分野ID リスト
+            year_ids: 対象年度ID リスト
+            difficulty_range: 難易度範囲 (最小, 最大)
+            due_before: 指定時はこの日時までに復習期限が来る問題のみ
+        """
+        query = select(ReviewState.question_id).where(
+            self._review_filter(category_ids, year_ids, difficulty_range, due_before)
+        ).order_by(ReviewState.due_at, ReviewState.question_id).limit(count)
+        
+        session = self.db.get_session()
+        try:
+            return list(session.connection().execute(query).scalars())
+        finally:
+            self.db.close_session(session)
+    
+    def count_review_questions(
+        self,
+        category_ids: List[int] = None,
+        year_ids: List[int] = None,
+        difficulty_range: Tuple[int, int] = None,
+        due_before: datetime = None
+    ) -> int:
+        """
+        復習スケジュールのうち条件に合う問題数（設定ダイアログ表示用）
+        
+        条件は get_review_question_ids と同じ。
+        """
+        query = select(func.count()).select_from(ReviewState).where(
+            self._review_filter(category_ids, year_ids, difficulty_range, due_before)
+        )
+        session = self.db.get_session()
+        try:
+            return session.connection().execute(query).scalar_one()
+        finally:
+            self.db.close_session(session)
+    
+    @staticmethod
+    def _review_filter(
+        category_ids: List[int],
+        year_ids: List[int],
+        difficulty_range: Tuple[int, int],
+        due_before: datetime
+    ):
+        """復習スケジュールの抽出条件"""
+        # JOIN にすると分野・難易度のインデックスが選ばれ全件ソートになるため、
+        # 問題側の条件は相関 EXISTS にして due_at インデックス順の走査を保つ
+        question_filter = select(Question.id).where(
+            Question.id == ReviewState.question_id, Question.is_active == True
+        )
+        if category_ids:
+            question_filter = question_filter.where(Question.category_id.in_(category_ids))
+        if year_ids:
+            question_filter = question_filter.where(Question.year_id.in_(year_ids))
+        if difficulty_range:
+            question_filter = question_filter.where(Question.difficulty.between(*difficulty_range))
+        
+        condition = question_filter.exists()
+        if due_before is not None:
+            condition = and_(condition, ReviewState.due_at <= due_before)
+        return condition
+    
+    def _get_candidate_ids(
+        self,
+        session: Session,
+        category_ids: List[int] = None,
+        year_ids: List[int] = None,
+        difficulty_range: Tuple[int, int] = None
+    ) -> List[int]:
+        """
+        条件に合う有効な問題IDを ID 順で取得（条件ごとにキャッシュ）
+        
+        問題の追加・削除時は _invalidate_question_caches() でキャッシュを破棄する。
+        """
+        key = self._candidate_key(category_ids, year_ids, difficulty_range)
+        cached = self._candidate_ids_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        generation = self._cache_generation
+        query = select(Question.id).where(Question.is_active == True)
+        if category_ids:
+            query = query.where(Question.category_id.in_(category_ids))
+        if year_ids:
+            query = query.where(Question.year_id.in_(year_ids))
+        if difficulty_range:
+            query = query.where(Question.difficulty.between(*difficulty_range))
+        
+        # インデックスのみで取得し、シード指定時に再現できるよう ID 順に並べる
+        candidate_ids = sorted(session.connection().execute(query).scalars())
+        
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                if len(self._candidate_ids_cache) >= CANDIDATE_CACHE_MAX_ENTRIES:
+                    self._candidate_ids_cache.pop(next(iter(self._candidate_ids_cache)))
+                self._candidate_ids_cache[key] = candidate_ids
+        return candidate_ids
+    
+    @staticmethod
+    def _candidate_key(
+        category_ids: List[int] = None,
+        year_ids: List[int] = None,
+        difficulty_range: Tuple[int, int] = None
+    ) -> Tuple:
+        """出題条件のキャッシュキー"""
+        return (
+            tuple(sorted(set(category_ids or ()))),
+            tuple(sorted(set(year_ids or ()))),
+            tuple(difficulty_range) if difficulty_range else None
+        )
+    
+    def get_weighted_question_ids(
+        self,
+        count: int = 10,
+        category_ids: List[int] = None,
+        year_ids: List[int] = None,
+        difficulty_range: Tuple[int, int] = None,
+        seed: Optional[int] = None
+    ) -> List[int]:
+        """
+        誤答率・回答からの経過時間・回答数で重み付けして問題IDを抽出（重複なし）
+        
+        苦手な問題を中心に、未回答の問題も一定の割合で含まれる。
+        重みとエイリアス表はメモリ上に保持し、回答記録時に増分更新する。
+        
+        Args:
+            count: 取得件数
+            category_ids: 対象分野ID リスト
+            year_ids: 対象年度ID リスト
+            difficulty_range: 難易度範囲 (最小, 最大)
+            seed: 乱数シード
+        """
+        session = self.db.get_session()
+        try:
+            sampler = self._get_weighted_sampler(session)
+            key = self._candidate_key(category_ids, year_ids, difficulty_range)
+            candidate_ids = None
+            if any(key):
+                candidate_ids = self._get_candidate_ids(
+                    session, category_ids, year_ids, difficulty_range
+                )
+        finally:
+            self.db.close_session(session)
+        return sampler.sample(count, candidate_ids, cache_key=key, seed=seed)
+    
+    def _get_weighted_sampler(self, session: Session) -> WeightedQuestionSampler:
+        """有効な問題と問題別ロールアップから重み付きサンプラーを作成（初回のみ）"""
+        sampler = self._weighted_sampler
+        if sampler is None:
+            generation = self._cache_generation
+            # 行数が多いため ORM/Core の行変換を通さず DBAPI カーソルから分割して読み込む
+            dbapi_conn = session.connection().connection.driver_connection
+            sampler = WeightedQuestionSampler(_fetch_array(dbapi_conn.execute("""
+                SELECT
+                    q.id,
+                    COALESCE(s.attempts, 0),
+                    COALESCE(s.correct, 0),
+                    (julianday(s.last_answered_at) - 2440587.5) * 86400.0
+                FROM questions q
+                LEFT JOIN question_stats s ON s.question_id = q.id
+                WHERE q.is_active = 1
+                ORDER BY q.id
+            """), 4))
+            self._store_cache(generation, "_weighted_sampler", sampler)
+        return sampler
+    
+    def get_recently_answered_ids(self, since: datetime) -> Set[int]:
+        """
+        指定日時（UTC）以降に回答した有効な問題ID
+        
+        重み付きサンプラーがメモリ上に保持する最終回答時刻から求める（回答履歴は参照しない）。
+        """
+        session = self.db.get_session()
+        try:
+            sampler = self._get_weighted_sampler(session)
+        finally:
+            self.db.close_session(session)
+        since_epoch = since.replace(tzinfo=timezone.utc).timestamp()
+        return set(sampler.answered_since(since_epoch).tolist())
+    
+    def get_question_pools(self) -> Dict[Tuple[int, int], List[int]]:
+        """
+        有効な問題IDを (分野ID, 難易度) ごとに ID 順でまとめたもの（模擬試験の組み立て用）
+        
+        初回のみ部分インデックスから読み込み、問題の追加・削除時に破棄する。
+        """
+        pools = self._question_pools
+        if pools is None:
+            generation = self._cache_generation
+            pools = {}
+            for category_id, difficulty, question_id in self.stream_question_rows(
+                columns=(Question.category_id, Question.difficulty, Question.id)
+            ):
+                pools.setdefault((category_id, difficulty), []).append(question_id)
+            self._store_cache(generation, "_question_pools", pools)
+        return pools
+    
+    def get_item_bank(self) -> ItemBank:
+        """
+        有効な問題の IRT 項目パラメータ（初回のみ読み込み）
+        
+        未較正の問題は問題の難易度から換算した困難度を使う。
+        """
+        bank = self._item_bank
+        if bank is None:
+            generation = self._cache_generation
+            session = self.db.get_session()
+            try:
+                dbapi_conn = session.connection().connection.driver_connection
+                bank = ItemBank(_fetch_array(dbapi_conn.execute("""
+                    SELECT q.id, q.difficulty, p.discrimination, p.difficulty
+                    FROM questions q
+                    LEFT JOIN item_parameters p ON p.question_id = q.id
+                    WHERE q.is_active = 1
+                    ORDER BY q.id
+                """), 4))
+            finally:
+                self.db.close_session(session)
+            self._store_cache(generation, "_item_bank", bank)
+        return bank
+    
+    def get_adaptive_question_id(
+        self,
+        ability: float,
+        exclude_ids: List[int] = (),
+        category_ids: List[int] = None,
+        year_ids: List[int] = None,
+        difficulty_range: Tuple[int, int] = None
+    ) -> Optional[int]:
+        """
+        能力値 ability で項目情報量が最大となる問題IDを選ぶ（適応型出題）
+        
+        Args:
+            ability: 現在の能力値
+            exclude_ids: 出題済みの問題ID
+            category_ids: 対象分野ID リスト
+            year_ids: 対象年度ID リスト
+            difficulty_range: 難易度範囲 (最小, 最大)
+        
+        Returns:
+            問題ID（候補がない場合 None）
+        """
+        bank = self.get_item_bank()
+        key = self._candidate_key(category_ids, year_ids, difficulty_range)
+        candidate_ids = None
+        if any(key):
+            session = self.db.get_session()
+            try:
+                candidate_ids = self._get_candidate_ids(
+                    session, category_ids, year_ids, difficulty_range
+                )
+            finally:
+                self.db.close_session(session)
+        return bank.select_next(ability, exclude_ids, candidate_ids, cache_key=key)
+    
+    def calibrate_item_parameters(self) -> Dict[str, int]:
+        """
+        回答履歴から IRT 項目パラメータを較正して item_parameters を置き換える（バッチ処理）
+        
+        Returns:
+            {"items": 較正した問題数, "responses": 使用した回答数, "sessions": セッション数}
+        """
+        session = self.db.get_session()
+        try:
+            conn = session.connection()
+            dbapi_conn = conn.connection.driver_connection
+            # セッションを回答者とみなし、連番に変換して読み込む
+            rows = dbapi_conn.execute("""
+                SELECT
+                    question_id,
+                    DENSE_RANK() OVER (ORDER BY session_id) - 1,
+                    CASE WHEN is_correct = 1 THEN 1 ELSE 0 END
+                FROM user_answers
+                WHERE session_id IS NOT NULL AND is_correct IS NOT NULL
+            """).fetchall()
+            levels = dict(dbapi_conn.execute("SELECT id, difficulty FROM questions").fetchall())
             
-            all_questions = query.all()
-            return random.sample(all_questions, min(count, len(all_questions)))
+            result = {"items": 0, "responses": len(rows), "sessions": 0}
+            conn.execute(ItemParameter.__table__.delete())
+            if rows:
+                data = np.array(rows, dtype=np.int64)
+                item_ids, item_index = np.unique(data[:, 0], return_inverse=True)
+                person_count = int(data[:, 1].max()) + 1
+                prior_b = prior_difficulty(
+                    [levels.get(qid, np.nan) for qid in item_ids.tolist()]
+                )
+                difficulties = calibrate_difficulties(
+                    data[:, 1], item_index, data[:, 2], prior_b, person_count
+                )
+                counts = np.bincount(item_index, minlength=len(item_ids))
+                calibrated_at = datetime.utcnow()
+                conn.execute(ItemParameter.__table__.insert(), [
+                    {
+                        "question_id": qid,
+                        "discrimination": DEFAULT_DISCRIMINATION,
+                        "difficulty": b,
+                        "responses": count,
+                        "calibrated_at": calibrated_at
+                    }
+                    for qid, b, count in zip(
+                        item_ids.tolist(), difficulties.tolist(), counts.tolist()
+                    )
+                ])
+                result.update(items=len(item_ids), sessions=person_count)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"項目パラメータ較正エラー: {e}")
+            raise
+        finally:
+            self.db.close_session(session)
+        
+        with self._cache_lock:
+            self._cache_generation += 1
+            self._item_bank = None
+        logger.info(
+            f"項目パラメータ較正完了: 問題 {result['items']}件 "
+            f"(回答 {result['responses']}件, セッション {result['sessions']}件)"
+        )
+        return result
+    
+    def _invalidate_question_caches(self):
+        """問題の追加・編集・削除時に出題候補・選択肢・重み付きサンプラー・問題プール・項目バンクを破棄"""
+        with self._cache_lock:
+            self._cache_generation += 1
+            self._candidate_ids_cache.clear()
+            self._choice_index = None
+            self._weighted_sampler = None
+            self._question_pools = None
+            self._item_bank = None
+        for listener in list(self._invalidation_listeners):
+            listener()
+    
+    def _store_cache(self, generation: int, name: str, value):
+        """作成開始時の世代から破棄されていなければキャッシュ属性 name に格納"""
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                setattr(self, name, value)
+    
+    def add_invalidation_listener(self, listener: Callable[[], None]):
+        """問題の追加・編集・削除でキャッシュを破棄したときに呼ぶ関数を登録（出題セットの先読みなど）"""
+        self._invalidation_listeners.append(listener)
+    
+    def remove_invalidation_listener(self, listener: Callable[[], None]):
+        """add_invalidation_listener で登録した関数を解除"""
+        if listener in self._invalidation_listeners:
+            self._invalidation_listeners.remove(listener)
+    
+    def _lookup_choice(self, choice_id: int) -> Optional[Tuple[int, Optional[bool]]]:
+        """
+        選択肢ID から (問題ID, 正解フラグ) を取得
+        
+        対応表は初回に1回のクエリで作成する。対応表にない選択肢のみ DB を参照する。
+        """
+        choice_index = self._choice_index
+        if choice_index is None:
+            generation = self._cache_generation
+            session = self.db.get_session()
+            try:
+                # 行数が多いため ORM/Core の行変換を通さず、DBAPI カーソルから1行ずつ読み込む
+                dbapi_conn = session.connection().connection.driver_connection
+                max_choice_id = dbapi_conn.execute("SELECT MAX(id) FROM choices").fetchone()[0]
+                choice_index = _ChoiceIndex(dbapi_conn.execute(
+                    "SELECT id, question_id, is_correct FROM choices"
+                ), max_choice_id or 0)
+            finally:
+                self.db.close_session(session)
+            self._store_cache(generation, "_choice_index", choice_index)
+        
+        entry = choice_index.get(choice_id)
+        if entry is not None:
+            return entry
+        
+        # キャッシュ作成後に別経路で追加された選択肢
+        session = self.db.get_session()
+        try:
+            row = session.query(Choice.question_id, Choice.is_correct).filter(
+                Choice.id == choice_id
+            ).first()
+            return tuple(row) if row else None
+        finally:
+            self.db.close_session(session)
+    
+    def get_questions_by_ids(self, question_ids: List[int]) -> List[Question]:
+        """指定ID順に問題を取得（選択肢・分野・年度も読み込み済み）"""
+        session = self.db.get_session()
+        try:
+            return self._fetch_questions_in_order(session, list(question_ids))
+        finally:
+            self.db.close_session(session)
+    
+    def _fetch_questions_in_order(self, session: Session, question_ids: List[int]) -> List[Question]:
+        """
+        指定ID順に問題を取得（IN 句は SQLite の変数上限を超えないよう分割）
+        
+        選択肢・分野・年度も読み込むため、セッション終了後も追加クエリなしで参照できる。
+        """
+        questions_by_id = {}
+        for start in range(0, len(question_ids), QUESTION_FETCH_CHUNK_SIZE):
+            chunk = question_ids[start:start + QUESTION_FETCH_CHUNK_SIZE]
+            query = session.query(Question).options(
+                selectinload(Question.choices),
+                joinedload(Question.category),
+                joinedload(Question.year)
+            ).filter(Question.id.in_(chunk))
+            for question in query:
+                questions_by_id[question.id] = question
+        return [questions_by_id[qid] for qid in question_ids if qid in questions_by_id]
+    
+    def deactivate_question(self, question_id: int) -> bool:
+        """問題を無効化（論理削除）"""
+        session = self.db.get_session()
+        try:
+            question = session.get(Question, question_id)
+            if not question:
+                return False
+            question.is_active = False
+            session.commit()
+            self._invalidate_question_caches()
+            return True
+        except Exception as e:
+            session.rollback()
+            logger.error(f"問題削除エラー: {e}")
+            return False
         finally:
             self.db.close_session(session)
     
@@ -236,29 +1340,99 @@ class DataManager:
         time_spent_seconds: int = 0
     ) -> bool:
         """回答を記録"""
-        session = self.db.get_session()
+        answer = self.prepare_answer(
+            question_id, selected_choice_id, session_id, time_spent_seconds
+        )
+        if answer is None:
+            return False
+        
         try:
-            # 選択肢が正解かチェック
-            choice = session.query(Choice).filter_by(id=selected_choice_id).first()
-            if not choice:
-                return False
-            
-            user_answer = UserAnswer(
-                question_id=question_id,
-                selected_choice_id=selected_choice_id,
-                is_correct=choice.is_correct,
-                session_id=session_id,
-                time_spent_seconds=time_spent_seconds
-            )
-            session.add(user_answer)
-            session.commit()
+            self.record_answers([answer])
             return True
         except Exception as e:
             logger.error(f"回答記録エラー: {e}")
-            session.rollback()
             return False
+    
+    def prepare_answer(
+        self,
+        question_id: int,
+        selected_choice_id: int,
+        session_id: str,
+        time_spent_seconds: int = 0
+    ) -> Optional[Dict]:
+        """
+        回答レコードを作成（選択肢を検証するのみで DB には書き込まない）
+        
+        Returns:
+            record_answers に渡せる辞書（選択肢が不正な場合 None）
+        """
+        # 選択肢が正解かチェック（キャッシュ済みの対応表を参照）
+        try:
+            choice = self._lookup_choice(selected_choice_id)
+        except Exception as e:
+            logger.error(f"回答記録エラー: {e}")
+            return None
+        if not choice:
+            logger.warning(f"選択肢が存在しません: {selected_choice_id}")
+            return None
+        
+        choice_question_id, is_correct = choice
+        if choice_question_id != question_id:
+            logger.warning(
+                f"選択肢と問題が一致しません: 選択肢 {selected_choice_id} は"
+                f"問題 {choice_question_id} のもの（指定: {question_id}）"
+            )
+            return None
+        
+        return {
+            "question_id": question_id,
+            "selected_choice_id": selected_choice_id,
+            "is_correct": is_correct,
+            "session_id": session_id,
+            "time_spent_seconds": time_spent_seconds,
+            "answered_at": datetime.utcnow()
+        }
+    
+    def record_answers(self, answers: List[Dict]) -> int:
+        """
+        prepare_answer で作成した回答を1トランザクションでまとめて記録
+        
+        集計ロールアップ・復習スケジュールも同じトランザクションで更新し、
+        コミット後に重み付きサンプラーへ反映する。失敗時は例外を送出する。
+        
+        Returns:
+            記録した件数
+        """
+        if not answers:
+            return 0
+        
+        session = self.db.get_session()
+        try:
+            # 集計ロールアップを同一トランザクションで更新（回答の挿入前に反映）
+            apply_answer_rollups(session, answers)
+            apply_review_updates(session, answers)
+            session.execute(UserAnswer.__table__.insert(), [
+                {
+                    "question_id": answer["question_id"],
+                    "selected_choice_id": answer["selected_choice_id"],
+                    "is_correct": answer["is_correct"],
+                    "session_id": answer["session_id"],
+                    "time_spent_seconds": answer["time_spent_seconds"],
+                    "answered_at": answer["answered_at"]
+                }
+                for answer in answers
+            ])
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
         finally:
             self.db.close_session(session)
+        
+        sampler = self._weighted_sampler
+        if sampler is not None:
+            sampler.apply_answers(answers)
+        return len(answers)
     
     def get_user_answers(self, session_id: str) -> List[UserAnswer]:
         """セッション内の回答取得"""
@@ -273,30 +1447,28 @@ class DataManager:
     # ========================
     
     def update_statistics(self, session_id: str) -> Optional[Statistics]:
-        """統計情報を更新"""
+        """
+        セッションの回答をグローバル統計へ加算
+        
+        セッション終了時に1回だけ呼び出すこと（同じセッションを再度渡すと二重に加算される）。
+        """
         session = self.db.get_session()
         try:
-            answers = session.query(UserAnswer).filter_by(session_id=session_id).all()
+            total_count, correct_count, total_time = session.query(
+                func.count(UserAnswer.id),
+                func.coalesce(func.sum(case((UserAnswer.is_correct == True, 1), else_=0)), 0),
+                func.coalesce(func.sum(func.coalesce(UserAnswer.time_spent_seconds, 0)), 0)
+            ).filter(UserAnswer.session_id == session_id).one()
             
-            if not answers:
+            if not total_count:
                 return None
             
-            correct_count = sum(1 for a in answers if a.is_correct)
-            total_count = len(answers)
-            correct_rate = (correct_count / total_count * 100) if total_count > 0 else 0
-            
-            # グローバル統計更新
-            stats = session.query(Statistics).first()
-            if not stats:
-                stats = Statistics()
-            
-            stats.total_questions_answered = total_count
-            stats.total_correct = correct_count
-            stats.correct_rate = correct_rate
-            stats.last_studied_at = datetime.utcnow()
-            
-            session.add(stats)
+            increment_statistics(
+                session, total_count, correct_count, total_time, datetime.utcnow()
+            )
             session.commit()
+            
+            stats = session.query(Statistics).order_by(Statistics.id).first()
             return stats
         except Exception as e:
             logger.error(f"統計更新エラー: {e}")
@@ -305,40 +1477,117 @@ class DataManager:
         finally:
             self.db.close_session(session)
     
+    def reconcile_statistics(self, repair: bool = True) -> Dict:
+        """
+        グローバル統計カウンタを回答履歴と照合（1回の集計クエリ）
+        
+        Args:
+            repair: True の場合、不一致ならカウンタを修正
+        
+        Returns:
+            {"expected": {...}, "actual": {...}, "mismatch": bool}
+        """
+        session = self.db.get_session()
+        try:
+            result = reconcile_statistics(session, repair=repair)
+            session.commit()
+            if result["mismatch"]:
+                logger.warning(
+                    f"統計カウンタ不一致: {result['actual']} → {result['expected']}"
+                    + ("（修正済み）" if repair else "")
+                )
+            return result
+        except Exception as e:
+            session.rollback()
+            logger.error(f"統計照合エラー: {e}")
+            raise
+        finally:
+            self.db.close_session(session)
+    
     def get_statistics(self) -> Optional[Statistics]:
         """統計情報取得"""
         session = self.db.get_session()
         try:
-            stats = session.query(Statistics).first()
+            stats = session.query(Statistics).order_by(Statistics.id).first()
             if not stats:
                 stats = Statistics()
                 session.add(stats)
                 session.commit()
+                session.refresh(stats)
             return stats
         finally:
             self.db.close_session(session)
     
     def get_category_statistics(self, category_id: int) -> Dict:
-        """分野別統計"""
+        """分野別統計（ロールアップから取得）"""
         session = self.db.get_session()
         try:
-            answers = session.query(UserAnswer).join(Question).filter(
-                Question.category_id == category_id
-            ).all()
+            stat = session.get(CategoryStat, category_id)
             
-            if not answers:
+            if not stat or not stat.attempts:
                 return {"total": 0, "correct": 0, "rate": 0}
             
-            correct = sum(1 for a in answers if a.is_correct)
-            total = len(answers)
-            
             return {
-                "total": total,
-                "correct": correct,
-                "rate": (correct / total * 100) if total > 0 else 0
+                "total": stat.attempts,
+                "correct": stat.correct,
+                "rate": (stat.correct / stat.attempts * 100) if stat.attempts > 0 else 0
             }
         finally:
             self.db.close_session(session)
+    
+    def get_all_category_statistics(self) -> List[Tuple[str, Dict]]:
+        """
+        全分野の分野別統計（分野とロールアップを結合した1回のクエリ、get_categories と同じ順）
+        
+        Returns:
+            [(分野名, get_category_statistics と同じ形式の辞書), ...]
+        """
+        session = self.db.get_session()
+        try:
+            rows = session.query(
+                Category.name, CategoryStat.attempts, CategoryStat.correct
+            ).outerjoin(
+                CategoryStat, CategoryStat.category_id == Category.id
+            ).order_by(Category.id).all()
+        finally:
+            self.db.close_session(session)
+        
+        results = []
+        for name, attempts, correct in rows:
+            if not attempts:
+                results.append((name, {"total": 0, "correct": 0, "rate": 0}))
+            else:
+                results.append((name, {
+                    "total": attempts,
+                    "correct": correct,
+                    "rate": correct / attempts * 100
+                }))
+        return results
+    
+    def rebuild_rollups(self) -> Dict[str, int]:
+        """
+        集計ロールアップ・復習スケジュールを回答履歴から全件再計算（検証用）
+        
+        Returns:
+            {"question_rows": 件数, "category_rows": 件数, "daily_rows": 件数,
+             "review_rows": 件数, "mismatches": 再計算前との不一致行数}
+        """
+        session = self.db.get_session()
+        try:
+            result = rebuild_answer_rollups(session)
+            review = rebuild_review_schedule(session)
+            result["review_rows"] = review["review_rows"]
+            result["mismatches"] += review["mismatches"]
+            session.commit()
+            if result["mismatches"]:
+                logger.warning(f"ロールアップ不一致を修正: {result['mismatches']}行")
+            return result
+        except Exception as e:
+            session.rollback()
+            logger.error(f"ロールアップ再計算エラー: {e}")
+            raise
+        finally:
+            self.db.close_session(session)
 
 
 # グローバルインスタンス
@@ -0,0 +1,223 @@
+"""
+項目反応理論（IRT）
+2パラメータロジスティックモデルによる能力推定・項目情報量・項目パラメータ較正（NumPy でベクトル化）
+"""
+
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 能力値（θ）の事前分布と推定範囲
+ABILITY_PRIOR_MEAN = 0.0
+ABILITY_PRIOR_SD = 1.0
+ABILITY_BOUNDS = (-4.0, 4.0)
+
+# 未較正の問題の識別力と、問題の難易度（1〜5）から困難度 b への換算
+DEFAULT_DISCRIMINATION = 1.0
+DIFFICULTY_LEVEL_CENTER = 3
+DIFFICULTY_LEVEL_SCALE = 0.75
+
+# 較正時の困難度の事前分布の標準偏差（回答の少ない問題は難易度からの換算値に寄せる）
+DIFFICULTY_PRIOR_SD = 1.0
+
+# ニュートン法の反復回数
+ABILITY_ITERATIONS = 8
+CALIBRATION_ITERATIONS = 30
+
+# 情報量上位からこの件数の中で無作為に選ぶ（同じ問題ばかり出題されるのを防ぐ）
+SELECTION_TOP_K = 5
+
+# 出題条件ごとに保持する候補位置の数
+CANDIDATE_CACHE_MAX_ENTRIES = 16
+
+
+def prior_difficulty(levels: np.ndarray) -> np.ndarray:
+    """問題の難易度（1〜5、未設定は中央）を困難度 b に換算"""
+    levels = np.nan_to_num(np.asarray(levels, dtype=np.float64), nan=DIFFICULTY_LEVEL_CENTER)
+    return (levels - DIFFICULTY_LEVEL_CENTER) * DIFFICULTY_LEVEL_SCALE
+
+
+def response_probability(theta, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """正答確率 P(θ) = 1 / (1 + exp(-a(θ - b)))"""
+    return 1.0 / (1.0 + np.exp(-a * (theta - b)))
+
+
+def item_information(theta: float, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """項目情報量 I(θ) = a² P(θ) (1 - P(θ))"""
+    p = response_probability(theta, a, b)
+    return a * a * p * (1.0 - p)
+
+
+def estimate_ability(
+    a: np.ndarray,
+    b: np.ndarray,
+    responses: np.ndarray,
+    theta: float = ABILITY_PRIOR_MEAN
+) -> float:
+    """
+    回答済み項目から能力値を MAP 推定（ニュートン法）
+    
+    事前分布を置くため、全問正解・全問不正解でも有限の値になる。
+    
+    Args:
+        a: 識別力
+        b: 困難度
+        responses: 正誤（1 / 0）
+        theta: 初期値（前回の推定値）
+    """
+    responses = np.asarray(responses, dtype=np.float64)
+    prior_precision = 1.0 / (ABILITY_PRIOR_SD ** 2)
+    for _ in range(ABILITY_ITERATIONS):
+        p = response_probability(theta, a, b)
+        gradient = np.sum(a * (responses - p)) - (theta - ABILITY_PRIOR_MEAN) * prior_precision
+        hessian = -np.sum(a * a * p * (1.0 - p)) - prior_precision
+        step = gradient / hessian
+        theta = float(np.clip(theta - step, *ABILITY_BOUNDS))
+        if abs(step) < 1e-6:
+            break
+    return theta
+
+
+def calibrate_difficulties(
+    person_index: np.ndarray,
+    item_index: np.ndarray,
+    responses: np.ndarray,
+    prior_b: np.ndarray,
+    person_count: int
+) -> np.ndarray:
+    """
+    回答履歴から困難度を較正（ラッシュモデルの同時 MAP 推定）
+    
+    学習者は1人のため識別力は推定できず、セッションを回答者とみなして困難度のみ求める。
+    
+    回答者ごとの能力値と項目ごとの困難度を交互にニュートン法で更新する。
+    勾配・ヘッセ行列の対角成分は np.bincount で一括集計する。
+    
+    Args:
+        person_index: 回答ごとの回答者番号（0 〜 person_count - 1）
+        item_index: 回答ごとの項目番号（prior_b の添字）
+        responses: 回答ごとの正誤（1 / 0）
+        prior_b: 項目ごとの困難度の事前平均
+        person_count: 回答者数
+    
+    Returns:
+        項目ごとの困難度
+    """
+    responses = np.asarray(responses, dtype=np.float64)
+    item_count = len(prior_b)
+    theta = np.zeros(person_count)
+    b = np.array(prior_b, dtype=np.float64)
+    person_precision = 1.0 / (ABILITY_PRIOR_SD ** 2)
+    item_precision = 1.0 / (DIFFICULTY_PRIOR_SD ** 2)
+    
+    for _ in range(CALIBRATION_ITERATIONS):
+        p = response_probability(theta[person_index], 1.0, b[item_index])
+        residual = responses - p
+        variance = p * (1.0 - p)
+        gradient = np.bincount(person_index, residual, person_count) - theta * person_precision
+        hessian = -np.bincount(person_index, variance, person_count) - person_precision
+        theta = np.clip(theta - gradient / hessian, *ABILITY_BOUNDS)
+        
+        p = response_probability(theta[person_index], 1.0, b[item_index])
+        residual = responses - p
+        variance = p * (1.0 - p)
+        gradient = -np.bincount(item_index, residual, item_count) - (b - prior_b) * item_precision
+        hessian = -np.bincount(item_index, variance, item_count) - item_precision
+        step = gradient / hessian
+        b = b - step
+        if np.max(np.abs(step), initial=0.0) < 1e-4:
+            break
+    return b
+
+
+class ItemBank:
+    """
+    出題候補の項目パラメータ（識別力 a・困難度 b）
+    
+    有効な問題すべてを NumPy 配列で保持し、次の問題の選択は候補全体の情報量を一括計算して行う。
+    """
+    
+    def __init__(self, rows: Sequence[Tuple]):
+        """
+        Args:
+            rows: (question_id, difficulty_level, discrimination, difficulty) を ID 順に並べたもの
+                  未較正の問題は discrimination / difficulty が None
+        """
+        data = np.array(rows, dtype=np.float64).reshape(-1, 4)
+        self.question_ids = data[:, 0].astype(np.int64)
+        self.a = np.where(np.isnan(data[:, 2]), DEFAULT_DISCRIMINATION, data[:, 2])
+        self.b = np.where(np.isnan(data[:, 3]), prior_difficulty(data[:, 1]), data[:, 3])
+        self._lock = threading.Lock()
+        self._positions: Dict[tuple, np.ndarray] = {}
+    
+    def __len__(self):
+        return len(self.question_ids)
+    
+    def parameters(self, question_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """指定問題の (a, b)（無効化された問題は既定値）"""
+        ids = np.asarray(question_ids, dtype=np.int64)
+        if len(self.question_ids) == 0:
+            return np.full(len(ids), DEFAULT_DISCRIMINATION), np.zeros(len(ids))
+        positions = np.minimum(np.searchsorted(self.question_ids, ids), len(self.question_ids) - 1)
+        found = self.question_ids[positions] == ids
+        a = np.where(found, self.a[positions], DEFAULT_DISCRIMINATION)
+        b = np.where(found, self.b[positions], 0.0)
+        return a, b
+    
+    def select_next(
+        self,
+        theta: float,
+        exclude_ids: Sequence[int] = (),
+        candidate_ids: Sequence[int] = None,
+        cache_key: tuple = None,
+        rng: np.random.Generator = None
+    ) -> Optional[int]:
+        """
+        現在の能力値で情報量が最大となる問題を選ぶ（上位 SELECTION_TOP_K 件から無作為）
+        
+        Args:
+            theta: 現在の能力値
+            exclude_ids: 出題済みの問題ID
+            candidate_ids: 対象の問題ID（ID 順、None の場合は全件）
+            cache_key: candidate_ids に対応するキャッシュキー
+            rng: 乱数生成器
+        
+        Returns:
+            問題ID（候補がない場合 None）
+        """
+        positions = self._candidate_positions(candidate_ids, cache_key)
+        if len(positions) == 0:
+            return None
+        
+        information = item_information(theta, self.a[positions], self.b[positions])
+        if len(exclude_ids):
+            excluded = np.isin(
+                self.question_ids[positions], np.asarray(exclude_ids, dtype=np.int64)
+            )
+            information[excluded] = -np.inf
+        
+        top_k = min(SELECTION_TOP_K, len(positions))
+        top = np.argpartition(information, -top_k)[-top_k:]
+        top = top[np.isfinite(information[top])]
+        if len(top) == 0:
+            return None
+        rng = rng or np.random.default_rng()
+        return int(self.question_ids[positions[rng.choice(top)]])
+    
+    def _candidate_positions(self, candidate_ids, cache_key) -> np.ndarray:
+        """条件に対応する配列上の位置（条件ごとにキャッシュ）"""
+        if candidate_ids is None:
+            return np.arange(len(self.question_ids))
+        with self._lock:
+            positions = self._positions.get(cache_key)
+            if positions is None:
+                ids = np.asarray(candidate_ids, dtype=np.int64)
+                positions = np.searchsorted(self.question_ids, ids)
+                found = positions < len(self.question_ids)
+                positions = positions[found]
+                positions = positions[self.question_ids[positions] == ids[found]]
+                if len(self._positions) >= CANDIDATE_CACHE_MAX_ENTRIES:
+                    self._positions.pop(next(iter(self._positions)))
+                self._positions[cache_key] = positions
+        return positions
@@ -0,0 +1,225 @@
+"""
+弱点重み付き出題サンプラー
+問題別ロールアップから重みを計算し、エイリアス法（Walker/Vose）で1回 O(1) の抽出を行う
+"""
+
+import math
+import threading
+import time
+from datetime import timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 重みの構成
+WEIGHT_FLOOR = 0.1  # すべての問題に残す最低重み
+WEIGHT_FRESH = 1.0  # 未回答の問題
+WEIGHT_ERROR_SCALE = 4.0  # 誤答率（平滑化済み）に掛ける係数
+WEIGHT_RECENCY_DAYS = 3.0  # 直近に回答した問題の重みを下げる時定数（日）
+
+# 時間経過で重みが変わるため、この秒数ごとに再計算する
+WEIGHT_REFRESH_SECONDS = 600
+
+# 抽出条件ごとに保持するエイリアス表の数
+ALIAS_TABLE_CACHE_MAX_ENTRIES = 16
+
+# 重複除去のため要求数のこの倍数を一度に抽出する
+OVERSAMPLE_FACTOR = 2
+
+
+class AliasTable:
+    """
+    エイリアス表（重み付き復元抽出を1回 O(1) で行う）
+    
+    構築は NumPy のベクトル演算のみで O(n)（Python のループなし）。
+    """
+    
+    __slots__ = ("prob", "alias", "size")
+    
+    def __init__(self, weights: np.ndarray):
+        weights = np.asarray(weights, dtype=np.float64)
+        self.size = len(weights)
+        self.prob = np.ones(self.size, dtype=np.float64)
+        self.alias = np.arange(self.size, dtype=np.int64)
+        total = weights.sum()
+        if self.size == 0 or total <= 0:
+            return
+        
+        # 平均が 1 になるよう正規化し、1 未満（small）と 1 以上（large）に分ける
+        scaled = weights * (self.size / total)
+        small = np.flatnonzero(scaled < 1.0)
+        large = np.flatnonzero(scaled >= 1.0)
+        if len(small) == 0 or len(large) == 0:
+            return  # すべて 1（丸め誤差で large が無い場合も含む）
+        
+        # Vose 法で small は先頭から順に現在の large の余剰を受け取り、large は余剰を
+        # 使い切った時点で次の large を別名にする。不足分・余剰分の累積和で一括計算する。
+        deficits = 1.0 - scaled[small]
+        deficit_ends = np.cumsum(deficits)
+        deficit_starts = deficit_ends - deficits
+        surplus_ends = np.cumsum(scaled[large] - 1.0)
+        
+        donors = np.minimum(
+            np.searchsorted(surplus_ends, deficit_starts, side="left"), len(large) - 1
+        )
+        self.prob[small] = scaled[small]
+        self.alias[small] = large[donors]
+        
+        # large の余剰を超えた最初の small の位置で、その large の列が確定する
+        crossing = np.searchsorted(deficit_ends, surplus_ends, side="right")
+        exhausted = crossing < len(small)
+        overflow = np.zeros(len(large), dtype=np.float64)
+        overflow[exhausted] = deficit_ends[crossing[exhausted]] - surplus_ends[exhausted]
+        self.prob[large] = np.clip(1.0 - overflow, 0.0, 1.0)
+        self.alias[large[:-1]] = np.where(exhausted[:-1], large[1:], large[:-1])
+    
+    def sample(self, rng: np.random.Generator, count: int) -> np.ndarray:
+        """重みに比例して count 件を復元抽出（インデックスを返す）"""
+        columns = rng.integers(0, self.size, size=count)
+        keep = rng.random(count) < self.prob[columns]
+        return np.where(keep, columns, self.alias[columns])
+
+
+class WeightedQuestionSampler:
+    """
+    弱点重み付きサンプラー
+    
+    有効な問題ごとの回答数・正答数・最終回答時刻を NumPy 配列で保持する。
+    回答記録時は apply_answers() で該当要素のみ更新し、重みとエイリアス表は
+    次の抽出時に配列演算で作り直す。
+    """
+    
+    def __init__(self, rows: Sequence[Tuple]):
+        """
+        Args:
+            rows: (question_id, attempts, correct, last_answered_epoch) を ID 順に並べたもの
+        """
+        data = np.array(rows, dtype=np.float64).reshape(-1, 4)
+        self.question_ids = data[:, 0].astype(np.int64)
+        self.attempts = data[:, 1].copy()
+        self.correct = data[:, 2].copy()
+        self.last_answered = data[:, 3].copy()  # UNIX 時刻（未回答は NaN）
+        
+        self._lock = threading.Lock()
+        self._weights: Optional[np.ndarray] = None
+        self._weights_at = 0.0
+        self._positions: Dict[tuple, np.ndarray] = {}
+        self._alias_tables: Dict[tuple, AliasTable] = {}
+    
+    def __len__(self):
+        return len(self.question_ids)
+    
+    def apply_answers(self, answers: List[Dict]):
+        """記録済みの回答を反映（record_answers のコミット後に呼び出す）"""
+        if not answers or not len(self.question_ids):
+            return
+        question_ids = np.array([a["question_id"] for a in answers], dtype=np.int64)
+        positions = np.searchsorted(self.question_ids, question_ids)
+        positions = np.minimum(positions, len(self.question_ids) - 1)
+        with self._lock:
+            for answer, position in zip(answers, positions.tolist()):
+                if self.question_ids[position] != answer["question_id"]:
+                    continue  # 読み込み後に無効化された問題など
+                self.attempts[position] += 1
+                self.correct[position] += 1 if answer["is_correct"] else 0
+                answered_at = answer["answered_at"].replace(tzinfo=timezone.utc).timestamp()
+                if not answered_at <= self.last_answered[position]:
+                    self.last_answered[position] = answered_at
+            self._weights = None
+            self._alias_tables.clear()
+    
+    def answered_since(self, since_epoch: float) -> np.ndarray:
+        """指定時刻（UNIX 時刻）以降に回答した問題ID"""
+        with self._lock:
+            return self.question_ids[self.last_answered >= since_epoch]
+    
+    def sample(
+        self,
+        count: int,
+        candidate_ids: Sequence[int] = None,
+        cache_key: tuple = None,
+        seed: Optional[int] = None
+    ) -> List[int]:
+        """
+        重みに比例して重複なしで問題IDを抽出
+        
+        Args:
+            count: 抽出件数
+            candidate_ids: 対象の問題ID（ID 順、None の場合は全件）
+            cache_key: candidate_ids に対応するキャッシュキー（同じキーには同じ candidate_ids を渡す）
+            seed: 乱数シード
+        
+        Returns:
+            抽出した問題ID（抽出順）
+        """
+        rng = np.random.default_rng(seed)
+        with self._lock:
+            positions, table = self._get_alias_table(candidate_ids, cache_key)
+            small_pool = count * OVERSAMPLE_FACTOR > len(positions)
+            weights = self._current_weights()[positions] if small_pool else None
+        count = min(count, len(positions))
+        if count <= 0:
+            return []
+        
+        if small_pool:
+            # 候補が少ない場合は非復元の重み付き抽出を直接行う
+            chosen = rng.choice(len(positions), size=count, replace=False, p=weights / weights.sum())
+            return self.question_ids[positions[chosen]].tolist()
+        
+        chosen = np.empty(0, dtype=np.int64)
+        while len(chosen) < count:
+            drawn = np.concatenate([chosen, table.sample(rng, count * OVERSAMPLE_FACTOR)])
+            _, first = np.unique(drawn, return_index=True)
+            chosen = drawn[np.sort(first)]
+        return self.question_ids[positions[chosen[:count]]].tolist()
+    
+    def _get_alias_table(self, candidate_ids, cache_key) -> Tuple[np.ndarray, AliasTable]:
+        """条件に対応する (全体配列上の位置, エイリアス表) を取得（ロック保持中に呼び出す）"""
+        if time.time() - self._weights_at > WEIGHT_REFRESH_SECONDS:
+            self._weights = None
+            self._alias_tables.clear()
+        
+        positions = self._positions.get(cache_key)
+        if positions is None:
+            if candidate_ids is None:
+                positions = np.arange(len(self.question_ids))
+            else:
+                ids = np.asarray(candidate_ids, dtype=np.int64)
+                positions = np.searchsorted(self.question_ids, ids)
+                found = positions < len(self.question_ids)
+                positions = positions[found]
+                positions = positions[self.question_ids[positions] == ids[found]]
+            if len(self._positions) >= ALIAS_TABLE_CACHE_MAX_ENTRIES:
+                self._positions.pop(next(iter(self._positions)))
+            self._positions[cache_key] = positions
+        
+        table = self._alias_tables.get(cache_key)
+        if table is None:
+            table = AliasTable(self._current_weights()[positions])
+            if len(self._alias_tables) >= ALIAS_TABLE_CACHE_MAX_ENTRIES:
+                self._alias_tables.pop(next(iter(self._alias_tables)))
+            self._alias_tables[cache_key] = table
+        return positions, table
+    
+    def _current_weights(self) -> np.ndarray:
+        """
+        問題ごとの重み
+        
+        誤答率は (誤答 + 1) / (回答 + 2) で平滑化するため、回答数が少ない問題は 0.5 付近になる。
+        直近に回答した問題は時定数 WEIGHT_RECENCY_DAYS で重みを下げる。
+        """
+        if self._weights is not None:
+            return self._weights
+        
+        now = time.time()
+        attempted = self.attempts > 0
+        error_rate = (self.attempts - self.correct + 1) / (self.attempts + 2)
+        days_since = np.nan_to_num((now - self.last_answered) / 86400.0, nan=math.inf)
+        recency = 1.0 - np.exp(-np.maximum(days_since, 0.0) / WEIGHT_RECENCY_DAYS)
+        self._weights = np.where(
+            attempted,
+            WEIGHT_FLOOR + WEIGHT_ERROR_SCALE * error_rate * recency,
+            WEIGHT_FRESH
+        )
+        self._weights_at = now
+        return self._weights
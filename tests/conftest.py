@@ -0,0 +1,39 @@
+"""
+テスト共通のフィクスチャ
+"""
+
+import pytest
+
+from src.db.database import DatabaseManager
+from src.utils import data_manager as data_manager_module
+from src.utils.data_manager import DataManager
+
+
+@pytest.fixture
+def data_manager(tmp_path, monkeypatch):
+    """一時ディレクトリの DB を使う DataManager（スキーマ作成済み）"""
+    db = DatabaseManager(str(tmp_path / "app.db"))
+    db.init_db()
+    monkeypatch.setattr(data_manager_module, "get_db_manager", lambda: db)
+    yield DataManager()
+    db.engine.dispose()
+
+
+@pytest.fixture
+def add_questions(data_manager):
+    """問題を追加して ID のリストを返す関数"""
+    def add(count, category="テクノロジ", year=2024, start=1):
+        ids = []
+        for number in range(start, start + count):
+            question = data_manager.add_question({
+                "question_number": number,
+                "text": f"問題文{number}",
+                "explanation": f"解説{number}",
+                "category": category,
+                "year": year,
+                "choices": ["ア", "イ", "ウ", "エ"],
+                "correct_answer": 1,
+            })
+            ids.append(question.id)
+        return ids
+    return add
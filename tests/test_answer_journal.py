@@ -0,0 +1,141 @@
+"""
+回答ジャーナル（write-behind）の復旧・退避のテスト
+"""
+
+import json
+
+from sqlalchemy.exc import OperationalError
+
+from src.db import Choice, UserAnswer
+from src.utils.answer_journal import AnswerJournal, ANSWER_DEAD_LETTER_FILENAME
+
+
+def _make_answers(dm, question_ids, session_id="s1"):
+    session = dm.db.get_session()
+    try:
+        choice_ids = {
+            question_id: choice_id for question_id, choice_id in session.query(
+                Choice.question_id, Choice.id
+            ).filter(Choice.choice_number == 1)
+        }
+    finally:
+        dm.db.close_session(session)
+    return [dm.prepare_answer(qid, choice_ids[qid], session_id, 5) for qid in question_ids]
+
+
+def _open_journal(dm, tmp_path):
+    # 自動書き込みは行わず、flush() を明示的に呼ぶ
+    return AnswerJournal(
+        dm, str(tmp_path / "journal.jsonl"), batch_size=1000, flush_interval=60
+    )
+
+
+def _recorded_count(dm):
+    session = dm.db.get_session()
+    try:
+        return session.query(UserAnswer).count()
+    finally:
+        dm.db.close_session(session)
+
+
+def test_recover_skips_recorded_and_duplicate_answers(data_manager, add_questions, tmp_path):
+    answers = _make_answers(data_manager, add_questions(3))
+    # 1件目は DB 反映済み、2件目はジャーナルと退避ファイルの両方に残っている
+    data_manager.record_answers(answers[:1])
+    (tmp_path / "journal.jsonl").write_text(
+        "".join(AnswerJournal._encode(a) + "\n" for a in answers) + '{"broken',
+        encoding="utf-8"
+    )
+    (tmp_path / ANSWER_DEAD_LETTER_FILENAME).write_text(
+        AnswerJournal._encode(answers[1]) + "\n", encoding="utf-8"
+    )
+    
+    journal = _open_journal(data_manager, tmp_path)
+    pending = journal.pending_answers()
+    assert [a["question_id"] for a in pending] == [a["question_id"] for a in answers[1:]]
+    assert not (tmp_path / ANSWER_DEAD_LETTER_FILENAME).exists()
+    
+    assert journal.flush() == 2
+    journal.close()
+    assert _recorded_count(data_manager) == 3
+    assert (tmp_path / "journal.jsonl").read_text(encoding="utf-8") == ""
+
+
+def test_failed_answers_move_to_dead_letter_and_recover(data_manager, add_questions, tmp_path, monkeypatch):
+    answers = _make_answers(data_manager, add_questions(3))
+    bad_question_id = answers[1]["question_id"]
+    record_answers = data_manager.record_answers
+    
+    def failing_record_answers(batch):
+        if any(a["question_id"] == bad_question_id for a in batch):
+            raise ValueError("書き込み失敗")
+        return record_answers(batch)
+    
+    monkeypatch.setattr(data_manager, "record_answers", failing_record_answers)
+    journal = _open_journal(data_manager, tmp_path)
+    for answer in answers:
+        journal.append(answer)
+    
+    # 書き込めない回答は破棄せず退避し、セッションの書き込み完了待ちは失敗とする
+    assert journal.flush() == 2
+    assert journal.pending_answers() == []
+    assert [a["question_id"] for a in journal.failed_answers("s1")] == [bad_question_id]
+    assert not journal.flush_session("s1", timeout=0)
+    journal.close()
+    
+    lines = (tmp_path / ANSWER_DEAD_LETTER_FILENAME).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["question_id"] for line in lines] == [bad_question_id]
+    
+    # 次回起動時に再投入される
+    monkeypatch.setattr(data_manager, "record_answers", record_answers)
+    journal = _open_journal(data_manager, tmp_path)
+    assert [a["question_id"] for a in journal.pending_answers()] == [bad_question_id]
+    assert journal.flush_session("s1", timeout=0)
+    journal.close()
+    assert _recorded_count(data_manager) == 3
+
+
+def test_flush_session_retries_deferred_writes(data_manager, add_questions, tmp_path, monkeypatch):
+    answers = _make_answers(data_manager, add_questions(2))
+    record_answers = data_manager.record_answers
+    calls = []
+    
+    def locked_once(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+        return record_answers(batch)
+    
+    monkeypatch.setattr(data_manager, "record_answers", locked_once)
+    journal = _open_journal(data_manager, tmp_path)
+    for answer in answers:
+        journal.append(answer)
+    
+    assert journal.flush_session("s1", timeout=5)
+    assert calls == [2, 2]
+    assert journal.pending_answers("s1") == []
+    journal.close()
+    assert _recorded_count(data_manager) == 2
+
+
+def test_non_lock_operational_error_moves_to_dead_letter(data_manager, add_questions, tmp_path, monkeypatch):
+    answers = _make_answers(data_manager, add_questions(2))
+    calls = []
+    
+    def missing_table(batch):
+        calls.append(len(batch))
+        raise OperationalError("INSERT", {}, Exception("no such table: user_answers"))
+    
+    monkeypatch.setattr(data_manager, "record_answers", missing_table)
+    journal = _open_journal(data_manager, tmp_path)
+    for answer in answers:
+        journal.append(answer)
+    
+    # ロック競合以外は再試行を繰り返さず、個別に書き込んだうえで退避する
+    assert not journal.flush_session("s1", timeout=5)
+    assert calls == [2, 1, 1]
+    assert journal.pending_answers() == []
+    assert len(journal.failed_answers("s1")) == 2
+    journal.close()
+    lines = (tmp_path / ANSWER_DEAD_LETTER_FILENAME).read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
@@ -0,0 +1,59 @@
+"""
+問題の一括インポートのテスト
+"""
+
+from src.db import Choice, Question
+
+
+def _question(number, year=2024):
+    return {
+        "question_number": number,
+        "text": f"問題文{number}",
+        "explanation": f"解説{number}",
+        "category": "テクノロジ",
+        "year": year,
+        "choices": [f"選択肢{number}-{i}" for i in range(1, 5)],
+        "correct_answer": 2,
+    }
+
+
+def test_bulk_import_links_choices_to_assigned_ids(data_manager, add_questions):
+    add_questions(2)
+    result = data_manager.bulk_import_questions(
+        [_question(n) for n in range(1, 8)] + [_question(1, year=2023)], batch_size=3
+    )
+    assert result == {"added": 6, "duplicates": 2, "errors": 0}
+    
+    session = data_manager.db.get_session()
+    try:
+        for question in session.query(Question).filter(Question.question_number > 2):
+            number = question.question_number
+            choices = sorted(question.choices, key=lambda c: c.choice_number)
+            assert [c.text for c in choices] == [f"選択肢{number}-{i}" for i in range(1, 5)]
+            assert [c.is_correct for c in choices] == [False, True, False, False]
+        assert session.query(Choice).count() == 8 * 4
+    finally:
+        data_manager.db.close_session(session)
+
+
+def test_bulk_import_indexes_questions_for_search(data_manager):
+    data_manager.bulk_import_questions([_question(n) for n in range(1, 6)], batch_size=2)
+    
+    results = data_manager.search("選択肢3-4")
+    assert [r["question_number"] for r in results] == [3]
+    assert [r["question_number"] for r in data_manager.search("解説4")] == [4]
+    
+    # 一括インポート後も通常の追加はトリガーで索引される
+    data_manager.add_question(_question(6))
+    assert [r["question_number"] for r in data_manager.search("問題文6")] == [6]
+
+
+def test_bulk_import_treats_missing_number_as_duplicate_key(data_manager):
+    # add_question と同じく、問題番号なしの問題は分野・年度ごとに1問まで
+    assert data_manager.bulk_import_questions([_question(None)]) == {
+        "added": 1, "duplicates": 0, "errors": 0
+    }
+    assert data_manager.bulk_import_questions([_question(None), _question(None, year=2023)]) == {
+        "added": 1, "duplicates": 1, "errors": 0
+    }
+    assert data_manager.add_question(_question(None)) is None
@@ -0,0 +1,42 @@
+"""
+DataManager の問題キャッシュ（作成中の破棄）のテスト
+"""
+
+from src.utils import data_manager as data_manager_module
+
+
+def test_item_bank_built_during_invalidation_is_not_cached(data_manager, add_questions, monkeypatch):
+    add_questions(3)
+    item_bank_class = data_manager_module.ItemBank
+    
+    def build_and_invalidate(rows):
+        # 先読みスレッドの作成中に問題が編集された状況を再現
+        data_manager._invalidate_question_caches()
+        return item_bank_class(rows)
+    
+    monkeypatch.setattr(data_manager_module, "ItemBank", build_and_invalidate)
+    bank = data_manager.get_item_bank()
+    assert len(bank.question_ids) == 3
+    assert data_manager._item_bank is None
+    
+    monkeypatch.setattr(data_manager_module, "ItemBank", item_bank_class)
+    add_questions(1, start=4)
+    assert len(data_manager.get_item_bank().question_ids) == 4
+    assert data_manager._item_bank is not None
+
+
+def test_question_pools_built_during_invalidation_are_not_cached(data_manager, add_questions, monkeypatch):
+    add_questions(3)
+    stream_question_rows = data_manager.stream_question_rows
+    
+    def stream_and_invalidate(**kwargs):
+        yield from stream_question_rows(**kwargs)
+        data_manager._invalidate_question_caches()
+    
+    monkeypatch.setattr(data_manager, "stream_question_rows", stream_and_invalidate)
+    assert sum(len(ids) for ids in data_manager.get_question_pools().values()) == 3
+    assert data_manager._question_pools is None
+    
+    monkeypatch.setattr(data_manager, "stream_question_rows", stream_question_rows)
+    data_manager.get_question_pools()
+    assert data_manager._question_pools is not None
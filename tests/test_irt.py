@@ -0,0 +1,92 @@
+"""
+IRT（能力値推定・困難度較正・適応型の項目選択）のテスト
+"""
+
+import numpy as np
+import pytest
+
+from src.utils.irt import (
+    ABILITY_PRIOR_SD, DEFAULT_DISCRIMINATION, ItemBank, calibrate_difficulties,
+    estimate_ability, prior_difficulty, response_probability
+)
+
+
+def _map_by_grid(a, b, responses):
+    """格子点探索による能力値の MAP 推定（比較用）"""
+    grid = np.linspace(-4.0, 4.0, 80001)[:, None]
+    p = response_probability(grid, a, b)
+    log_posterior = (
+        np.sum(responses * np.log(p) + (1 - responses) * np.log(1 - p), axis=1)
+        - grid[:, 0] ** 2 / (2 * ABILITY_PRIOR_SD ** 2)
+    )
+    return grid[np.argmax(log_posterior), 0]
+
+
+def test_prior_difficulty_centers_unknown_levels():
+    np.testing.assert_allclose(prior_difficulty([1, 3, np.nan, 5]), [-1.5, 0.0, 0.0, 1.5])
+
+
+@pytest.mark.parametrize("responses", [
+    [1, 0, 1, 1, 0],
+    [1, 1, 1, 1, 1],
+    [0, 0, 0, 0, 0],
+])
+def test_estimate_ability_matches_map(responses):
+    a = np.array([1.0, 0.8, 1.2, 1.0, 1.5])
+    b = np.array([-1.0, 0.0, 0.5, 1.0, 2.0])
+    responses = np.array(responses)
+    theta = estimate_ability(a, b, responses)
+    assert theta == pytest.approx(_map_by_grid(a, b, responses), abs=1e-3)
+
+
+def test_estimate_ability_prior_and_symmetry():
+    assert estimate_ability(np.array([]), np.array([]), np.array([])) == 0.0
+    a = np.ones(4)
+    b = np.zeros(4)
+    high = estimate_ability(a, b, np.ones(4))
+    low = estimate_ability(a, b, np.zeros(4))
+    assert 0.0 < high < 4.0
+    assert low == pytest.approx(-high)
+
+
+def test_calibrate_difficulties_recovers_ordering():
+    rng = np.random.default_rng(0)
+    true_b = np.linspace(-2.0, 2.0, 20)
+    person_count = 400
+    thetas = rng.normal(size=person_count)
+    person_index = np.repeat(np.arange(person_count), len(true_b))
+    item_index = np.tile(np.arange(len(true_b)), person_count)
+    responses = (
+        rng.random(len(person_index))
+        < response_probability(thetas[person_index], 1.0, true_b[item_index])
+    ).astype(np.int64)
+    
+    b = calibrate_difficulties(
+        person_index, item_index, responses, np.zeros(len(true_b)), person_count
+    )
+    assert np.corrcoef(b, true_b)[0, 1] > 0.98
+    assert np.max(np.abs(b - true_b)) < 0.5
+
+
+def test_calibrate_difficulties_keeps_prior_without_responses():
+    prior_b = np.array([-0.75, 0.0, 0.75])
+    empty = np.array([], dtype=np.int64)
+    np.testing.assert_allclose(calibrate_difficulties(empty, empty, empty, prior_b, 0), prior_b)
+
+
+def test_item_bank_selects_informative_unseen_items():
+    # 困難度 -2.0 〜 2.0 の 41 問、22 番目以降は較正済み（識別力 1.5）
+    rows = [
+        (qid, 3, 1.5 if qid > 21 else None, -2.0 + 0.1 * (qid - 1))
+        for qid in range(1, 42)
+    ]
+    bank = ItemBank(rows)
+    rng = np.random.default_rng(0)
+    chosen = {bank.select_next(0.5, rng=rng) for _ in range(50)}
+    assert chosen <= set(range(24, 33))
+    
+    assert bank.select_next(0.5, exclude_ids=list(range(1, 42))) is None
+    assert bank.select_next(0.5, candidate_ids=[3, 40], cache_key=("c",), rng=rng) == 40
+    a, b = bank.parameters([1, 30, 999])
+    np.testing.assert_allclose(a, [DEFAULT_DISCRIMINATION, 1.5, DEFAULT_DISCRIMINATION])
+    np.testing.assert_allclose(b, [-2.0, 0.9, 0.0])
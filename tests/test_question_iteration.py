@@ -0,0 +1,40 @@
+"""
+問題の全件走査（キーセット方式・ストリーミング）と、それを使う問題プール・項目バンクのテスト
+"""
+
+from src.db import Question
+
+
+def test_iter_questions_walks_all_pages(data_manager, add_questions):
+    ids = add_questions(7) + add_questions(3, category="ストラテジ")
+    data_manager.deactivate_question(ids[1])
+    
+    questions = list(data_manager.iter_questions(page_size=3))
+    assert [q.id for q in questions] == ids[:1] + ids[2:]
+    # セッション終了後も選択肢・分野・年度を参照できる
+    assert all(len(q.choices) == 4 for q in questions)
+    assert {q.category.name for q in questions} == {"テクノロジ", "ストラテジ"}
+    assert {q.year.year for q in questions} == {2024}
+    
+    resumed = data_manager.iter_questions(page_size=3, after_id=ids[6])
+    assert [q.id for q in resumed] == ids[7:]
+
+
+def test_stream_question_rows_with_columns(data_manager, add_questions):
+    ids = add_questions(5)
+    rows = list(data_manager.stream_question_rows(batch_size=2))
+    assert [row.id for row in rows] == ids
+    assert rows[0].category == "テクノロジ"
+    
+    rows = data_manager.stream_question_rows(columns=(Question.id, Question.difficulty))
+    assert [tuple(row) for row in rows] == [(qid, 2) for qid in ids]
+
+
+def test_pools_and_item_bank_cover_active_questions(data_manager, add_questions):
+    ids = add_questions(4)
+    data_manager.deactivate_question(ids[0])
+    category_id = data_manager.get_or_create_category("テクノロジ").id
+    
+    assert data_manager.get_question_pools() == {(category_id, 2): ids[1:]}
+    bank = data_manager.get_item_bank()
+    assert bank.question_ids.tolist() == ids[1:]
@@ -0,0 +1,24 @@
+"""
+出題エンジンの終了処理のテスト
+"""
+
+from src.core import quiz_engine as quiz_engine_module
+from src.core.quiz_engine import QuizEngine, get_quiz_engine
+
+
+def test_close_stops_worker_and_unregisters_listener(data_manager, monkeypatch):
+    monkeypatch.setattr(quiz_engine_module, "get_data_manager", lambda: data_manager)
+    monkeypatch.setattr(quiz_engine_module, "get_answer_journal", lambda: None)
+    monkeypatch.setattr(quiz_engine_module, "_quiz_engine", None)
+    engine = get_quiz_engine()
+    assert len(data_manager._invalidation_listeners) == 1
+    
+    engine.close()
+    engine.close()
+    assert data_manager._invalidation_listeners == []
+    assert engine._worker._shutdown
+    
+    # 閉じたエンジンの代わりに新しいエンジンを返す
+    replacement = get_quiz_engine()
+    assert isinstance(replacement, QuizEngine) and replacement is not engine
+    replacement.close()
@@ -0,0 +1,98 @@
+"""
+全文検索（検索語の解析・抜粋・関連度順の検索・LIKE へのフォールバック）のテスト
+"""
+
+from src.db import migrations
+from src.db.database import DatabaseManager
+from src.db.search_index import (
+    SEARCH_SNIPPET_MARKERS, like_pattern, make_snippet, match_expression, parse_search_query,
+    search_index_exists
+)
+from src.utils import data_manager as data_manager_module
+from src.utils.data_manager import DataManager
+
+
+def _question(number, text, explanation="", choices=("ア", "イ", "ウ", "エ"), category="テクノロジ"):
+    return {
+        "question_number": number,
+        "text": text,
+        "explanation": explanation,
+        "category": category,
+        "year": 2024,
+        "choices": list(choices),
+    }
+
+
+def test_parse_search_query_splits_short_terms():
+    assert parse_search_query("  ネットワーク　IP  セキュリティ ") == (
+        ["ネットワーク", "セキュリティ"], ["IP"]
+    )
+    assert parse_search_query(" 　") == ([], [])
+
+
+def test_match_expression_quotes_terms():
+    assert match_expression(["TCP/IP", "OR"]) == '"TCP/IP" "OR"'
+    assert match_expression(['say "hi"']) == '"say ""hi"""'
+
+
+def test_like_pattern_escapes_wildcards():
+    assert like_pattern("100%") == "%100\\%%"
+    assert like_pattern("a_b\\c") == "%a\\_b\\\\c%"
+
+
+def test_make_snippet_marks_first_match():
+    start, end = SEARCH_SNIPPET_MARKERS
+    assert make_snippet([None, "説明の中に Network がある"], ["network"]) == (
+        f"説明の中に {start}Network{end} がある"
+    )
+    snippet = make_snippet(["あ" * 50 + "キーワード" + "い" * 50], ["キーワード"])
+    assert snippet.startswith("…") and snippet.endswith("…")
+    assert f"{start}キーワード{end}" in snippet
+    assert make_snippet(["一致しない"], ["キーワード"]) == ""
+
+
+def test_search_ranks_all_matches(data_manager):
+    # 解説にのみ語を含む問題が多数あっても、問題文に含む後ろの問題が最上位になる
+    data_manager.bulk_import_questions(
+        [_question(n, f"問題{n}", explanation="暗号化の説明") for n in range(1, 51)]
+        + [_question(51, "公開鍵暗号化の方式")]
+    )
+    results = data_manager.search("暗号化", limit=1)
+    assert [r["question_number"] for r in results] == [51]
+    assert len(data_manager.search("暗号化")) == 51
+
+
+def test_search_applies_filters_and_short_terms(data_manager):
+    data_manager.bulk_import_questions([
+        _question(1, "IPアドレスの割り当て", category="テクノロジ"),
+        _question(2, "IPアドレスの管理", category="マネジメント"),
+        _question(3, "MACアドレスの割り当て", category="テクノロジ"),
+    ])
+    category_id = data_manager.get_or_create_category("テクノロジ").id
+    results = data_manager.search("アドレス IP", category_ids=[category_id])
+    assert [r["question_number"] for r in results] == [1]
+    assert [r["question_number"] for r in data_manager.search("IP")] == [1, 2]
+
+
+def test_search_falls_back_to_like_without_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(migrations, "search_index_supported", lambda conn: False)
+    db = DatabaseManager(str(tmp_path / "app.db"))
+    db.init_db()
+    monkeypatch.setattr(data_manager_module, "get_db_manager", lambda: db)
+    dm = DataManager()
+    try:
+        with db.engine.connect() as conn:
+            assert not search_index_exists(conn)
+        dm.bulk_import_questions([
+            _question(1, "100%の稼働率", explanation="可用性"),
+            _question(2, "稼働率の計算", choices=("直列システム", "並列システム")),
+            _question(3, "1000の稼働率"),
+        ])
+        assert [r["question_number"] for r in dm.search("稼働率")] == [1, 2, 3]
+        assert [r["question_number"] for r in dm.search("100%")] == [1]
+        results = dm.search("並列 稼働率")
+        assert [r["question_number"] for r in results] == [2]
+        start, end = SEARCH_SNIPPET_MARKERS
+        assert [r["snippet"] for r in dm.search("並列")] == [f"直列システム {start}並列{end}システム"]
+    finally:
+        db.engine.dispose()
@@ -0,0 +1,58 @@
+"""
+学習セッションのチェックポイント保存・読み込みのテスト
+"""
+
+import os
+
+from src.core.session_checkpoint import SessionCheckpointStore
+
+
+def _save(store, session_id, **overrides):
+    state = {
+        "mode": "random",
+        "question_ids": [5, 3, 9],
+        "current_index": 1,
+        "answers": {5: 21, 3: 14},
+        "elapsed_seconds": 42,
+        "options": {"total_questions": 3, "category_ids": [1]},
+    }
+    state.update(overrides)
+    store.save(session_id, **state)
+
+
+def test_round_trip(tmp_path):
+    store = SessionCheckpointStore(str(tmp_path / "checkpoints"))
+    _save(store, "s1")
+    
+    state = store.load("s1")
+    assert state["session_id"] == "s1"
+    assert state["mode"] == "random"
+    assert state["question_ids"] == [5, 3, 9]
+    assert state["current_index"] == 1
+    # JSON のキーは文字列になるため、問題ID は int に戻す
+    assert state["answers"] == {5: 21, 3: 14}
+    assert state["elapsed_seconds"] == 42
+    assert state["options"] == {"total_questions": 3, "category_ids": [1]}
+    assert not list((tmp_path / "checkpoints").glob("*.tmp"))
+    
+    _save(store, "s1", current_index=2, answers={5: 21, 3: 14, 9: 33})
+    assert store.load("s1")["answers"] == {5: 21, 3: 14, 9: 33}
+    
+    store.delete("s1")
+    assert store.load("s1") is None
+    store.delete("s1")  # 存在しなくてもエラーにしない
+
+
+def test_latest_skips_broken_and_unsupported(tmp_path):
+    store = SessionCheckpointStore(str(tmp_path))
+    _save(store, "old")
+    _save(store, "newer")
+    (tmp_path / "broken.json").write_text('{"version": 1, "sess', encoding="utf-8")
+    (tmp_path / "future.json").write_text('{"version": 999}', encoding="utf-8")
+    for offset, name in enumerate(["old", "newer", "broken", "future"]):
+        os.utime(tmp_path / f"{name}.json", (1000 + offset, 1000 + offset))
+    
+    assert store.latest()["session_id"] == "newer"
+    assert store.load("broken") is None
+    assert store.load("future") is None
+    assert SessionCheckpointStore(str(tmp_path / "empty")).latest() is None
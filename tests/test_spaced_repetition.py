@@ -0,0 +1,79 @@
+"""
+間隔反復スケジュール（SM-2）のテスト
+"""
+
+from datetime import datetime, timedelta
+
+from src.db import Choice
+from src.db.spaced_repetition import (
+    SM2_FIRST_INTERVAL_DAYS, SM2_SECOND_INTERVAL_DAYS, SM2_MAX_INTERVAL_DAYS, SM2_MIN_EASE,
+    answer_quality, sm2_next, _state_params
+)
+
+
+def test_first_intervals():
+    state = sm2_next(None, 4)
+    assert state[:2] == (1, float(SM2_FIRST_INTERVAL_DAYS))
+    state = sm2_next(state, 4)
+    assert state[:2] == (2, float(SM2_SECOND_INTERVAL_DAYS))
+
+
+def test_incorrect_answer_resets_repetitions():
+    state = None
+    for _ in range(4):
+        state = sm2_next(state, 5)
+    repetitions, interval_days, ease_factor, lapses = sm2_next(state, 1)
+    assert repetitions == 0
+    assert interval_days == SM2_FIRST_INTERVAL_DAYS
+    assert lapses == 1
+    assert ease_factor >= SM2_MIN_EASE
+
+
+def test_long_correct_streak_is_capped():
+    """正解が続いても間隔は上限で止まり、次回日時が datetime の範囲に収まる"""
+    reviewed_at = datetime(2024, 1, 1)
+    for quality in (5, 4, 3):
+        state = None
+        for _ in range(100):
+            state = sm2_next(state, quality)
+            params = _state_params(1, state, reviewed_at)
+            assert state[1] <= SM2_MAX_INTERVAL_DAYS
+        assert state[1] == SM2_MAX_INTERVAL_DAYS
+        due_at = datetime.strptime(params["due_at"], "%Y-%m-%d %H:%M:%S.%f")
+        assert due_at == reviewed_at + timedelta(days=SM2_MAX_INTERVAL_DAYS)
+
+
+def test_due_at_clamped_to_datetime_range():
+    state = (30, float(SM2_MAX_INTERVAL_DAYS), 2.5, 0)
+    params = _state_params(1, state, datetime(9990, 1, 1))
+    assert params["due_at"].startswith("9999-12-31")
+
+
+def test_answer_quality():
+    assert answer_quality(False, 10) == 1
+    assert answer_quality(True, 10) == 5
+    assert answer_quality(True, 60) == 4
+    assert answer_quality(True, 300) == 3
+    assert answer_quality(True, None) == 4
+
+
+def test_count_review_questions_matches_review_filters(data_manager, add_questions):
+    question_ids = add_questions(2) + add_questions(1, category="ストラテジ", start=3)
+    session = data_manager.db.get_session()
+    try:
+        choice_ids = dict(session.query(Choice.question_id, Choice.id).filter(Choice.choice_number == 1))
+    finally:
+        data_manager.db.close_session(session)
+    data_manager.record_answers([
+        data_manager.prepare_answer(qid, choice_ids[qid], "s1", 5) for qid in question_ids
+    ])
+    technology_id = next(cat.id for cat in data_manager.get_categories() if cat.name == "テクノロジ")
+    
+    later = datetime.utcnow() + timedelta(days=SM2_FIRST_INTERVAL_DAYS + 1)
+    assert data_manager.count_review_questions(due_before=later) == 3
+    assert data_manager.count_review_questions(category_ids=[technology_id], due_before=later) == 2
+    # 回答直後は復習期限が来ていない
+    assert data_manager.count_review_questions(due_before=datetime.utcnow()) == 0
+    assert data_manager.count_review_questions(category_ids=[technology_id]) == len(
+        data_manager.get_review_question_ids(count=10, category_ids=[technology_id])
+    )
@@ -0,0 +1,51 @@
+"""
+全体統計のテスト
+"""
+
+from src.core.statistics import StatisticsEngine
+from src.db import StudySession
+
+
+def test_overall_stats_counts_sessions_with_answers(data_manager, add_questions):
+    question = data_manager.get_questions_by_ids(add_questions(1))[0]
+    session = data_manager.db.get_session()
+    try:
+        session.add_all([
+            StudySession(session_id="answered", mode="random", total_questions=1),
+            StudySession(session_id="empty", mode="random", total_questions=1),
+        ])
+        session.commit()
+    finally:
+        data_manager.db.close_session(session)
+    
+    choice_id = question.choices[0].id
+    data_manager.record_answers([
+        data_manager.prepare_answer(question.id, choice_id, "answered", 10),
+        data_manager.prepare_answer(question.id, choice_id, "answered", 20),
+    ])
+    engine = StatisticsEngine()
+    engine.db = data_manager.db
+    stats = engine.get_overall_stats()
+    assert stats["study_sessions"] == 1
+    assert stats["total_questions_answered"] == 2
+    assert stats["total_study_time"] == 30
+
+
+def test_all_category_statistics_in_one_query(data_manager, add_questions):
+    question = data_manager.get_questions_by_ids(add_questions(1, category="ストラテジ"))[0]
+    add_questions(1, category="テクノロジ")
+    correct, wrong = sorted(question.choices, key=lambda c: not c.is_correct)[:2]
+    data_manager.record_answers([
+        data_manager.prepare_answer(question.id, correct.id, "s1"),
+        data_manager.prepare_answer(question.id, correct.id, "s1"),
+        data_manager.prepare_answer(question.id, wrong.id, "s1"),
+    ])
+    
+    results = data_manager.get_all_category_statistics()
+    assert [name for name, _ in results] == [c.name for c in data_manager.get_categories()]
+    by_name = dict(results)
+    assert by_name["ストラテジ"]["total"] == 3
+    assert by_name["ストラテジ"]["correct"] == 2
+    assert by_name["テクノロジ"] == {"total": 0, "correct": 0, "rate": 0}
+    for category in data_manager.get_categories():
+        assert by_name[category.name] == data_manager.get_category_statistics(category.id)
@@ -0,0 +1,94 @@
+"""
+エイリアス表と弱点重み付きサンプラーのテスト
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.utils.weighted_sampler import (
+    AliasTable, WeightedQuestionSampler, WEIGHT_FRESH, WEIGHT_FLOOR
+)
+
+
+def _implied_probabilities(table: AliasTable) -> np.ndarray:
+    """エイリアス表が表す各要素の抽出確率"""
+    probabilities = table.prob.copy()
+    np.add.at(probabilities, table.alias, 1.0 - table.prob)
+    return probabilities / table.size
+
+
+@pytest.mark.parametrize("weights", [
+    [1.0, 1.0, 1.0, 1.0],
+    [5.0, 1.0, 0.0, 2.0],
+    [0.1, 10.0, 0.5, 3.0, 3.0, 0.01, 7.0],
+    np.random.default_rng(0).exponential(size=1000),
+])
+def test_alias_table_matches_weights(weights):
+    weights = np.asarray(weights, dtype=np.float64)
+    table = AliasTable(weights)
+    assert np.all((table.prob >= 0.0) & (table.prob <= 1.0))
+    np.testing.assert_allclose(_implied_probabilities(table), weights / weights.sum(), atol=1e-12)
+
+
+def test_alias_table_sampling_frequencies():
+    weights = np.array([1.0, 2.0, 3.0, 4.0])
+    counts = np.bincount(
+        AliasTable(weights).sample(np.random.default_rng(1), 200000), minlength=4
+    )
+    np.testing.assert_allclose(counts / counts.sum(), weights / weights.sum(), atol=0.01)
+
+
+def test_alias_table_empty_and_zero_weights():
+    assert AliasTable(np.array([])).size == 0
+    table = AliasTable(np.zeros(3))
+    np.testing.assert_allclose(_implied_probabilities(table), [1 / 3] * 3)
+
+
+def _sampler(count, answered=()):
+    """count 問（ID 1..count）のサンプラー（answered の問題は 30 日前に1回誤答）"""
+    long_ago = (datetime.utcnow() - timedelta(days=30)).timestamp()
+    rows = [
+        (qid, 1, 0, long_ago) if qid in answered else (qid, 0, 0, None)
+        for qid in range(1, count + 1)
+    ]
+    return WeightedQuestionSampler(rows)
+
+
+def test_sampler_returns_unique_candidates():
+    sampler = _sampler(500)
+    cases = [(10, None), (10, list(range(100, 400, 3))), (40, [5, 7, 9]), (50, [1, 2])]
+    for key, (count, candidates) in enumerate(cases):
+        chosen = sampler.sample(count, candidates, cache_key=(key,), seed=3)
+        assert len(chosen) == len(set(chosen)) == min(count, len(candidates or range(500)))
+        if candidates is not None:
+            assert set(chosen) <= set(candidates)
+    assert sampler.sample(10, seed=7) == sampler.sample(10, seed=7)
+    assert sampler.sample(10, [9999], cache_key=("missing",)) == []
+
+
+def test_sampler_prefers_wrong_answers():
+    sampler = _sampler(100, answered={1, 2})
+    weights = sampler._current_weights()
+    assert weights[0] > WEIGHT_FRESH == weights[50]
+    
+    picks = np.bincount(
+        [qid for seed in range(2000) for qid in sampler.sample(1, seed=seed)], minlength=101
+    )
+    assert min(picks[1], picks[2]) > 2 * picks[3:].mean()
+
+
+def test_apply_answers_updates_weights():
+    sampler = _sampler(10)
+    sampler.sample(3, seed=0)
+    answered_at = datetime.utcnow()
+    sampler.apply_answers([
+        {"question_id": 4, "is_correct": True, "answered_at": answered_at},
+        {"question_id": 999, "is_correct": False, "answered_at": answered_at},
+    ])
+    assert sampler.attempts[3] == 1 and sampler.correct[3] == 1
+    # 直後に回答した問題は重みが最低値付近まで下がる
+    assert sampler._current_weights()[3] == pytest.approx(WEIGHT_FLOOR, abs=1e-3)
+    since = (answered_at - timedelta(seconds=1)).timestamp()
+    assert sampler.answered_since(since).tolist() == [4]